@@ -2,6 +2,7 @@ import os
 import json
 import openai
 import re
+import sys
 import asyncio
 from typing import Dict, List, Any, Tuple, Optional
 
@@ -191,7 +192,8 @@ class EntityExtractor:
                 
             entity_type_marker = parts[0].strip().strip('"')
             entity_name = parts[1].strip().strip('"')
-            entity_type = parts[2].strip().strip('"')
+            # Types come from a small vocabulary and key many dicts downstream, so share one string per type
+            entity_type = sys.intern(parts[2].strip().strip('"'))
             
             attributes = {}
             
@@ -249,7 +251,7 @@ class EntityExtractor:
             rel_type_marker = parts[0].strip().strip('"')
             source_entity = parts[1].strip().strip('"')
             target_entity = parts[2].strip().strip('"')
-            relationship_type = parts[3].strip().strip('"')
+            relationship_type = sys.intern(parts[3].strip().strip('"'))
             description = parts[4].strip().strip('"')
             
             strength_part = parts[5].strip()
@@ -1,13 +1,28 @@
 import os
 import requests
 import json
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Tuple
+
+from workspace_kg.utils.embedding_cache import EmbeddingCache
+from workspace_kg.config.configuration import EMBEDDING_CACHE_PATH
+
+# One cache per file, shared by every provider in the process (the pipeline and the systematic merger)
+_shared_caches: Dict[str, EmbeddingCache] = {}
 
 class InferenceProvider:
     def __init__(self):
         self.model_name = os.getenv("OLLAMA_EMBEDDING_MODEL")
         self.base_url = os.getenv("OLLAMA_BASE_URL")
         self.api_endpoint = f"{self.base_url}/api/embeddings"
+        self.batch_endpoint = f"{self.base_url}/api/embed"
+        self.cache = None
+        if EMBEDDING_CACHE_PATH:
+            try:
+                if EMBEDDING_CACHE_PATH not in _shared_caches:
+                    _shared_caches[EMBEDDING_CACHE_PATH] = EmbeddingCache(EMBEDDING_CACHE_PATH)
+                self.cache = _shared_caches[EMBEDDING_CACHE_PATH]
+            except Exception as e:
+                print(f"Warning: Embedding cache disabled, failed to open {EMBEDDING_CACHE_PATH}: {e}")
         
     def embed_text(self, text: str) -> List[float]:
         """
@@ -16,7 +31,20 @@ class InferenceProvider:
         """
         if not text or not isinstance(text, str):
             return []
-            
+
+        if not self.cache:
+            return self._request_embedding(text)
+
+        cache_key = self.cache.make_key(self.model_name, text)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached
+        embedding = self._request_embedding(text)
+        if embedding:
+            self.cache.put(cache_key, embedding)
+        return embedding
+
+    def _request_embedding(self, text: str) -> List[float]:
         try:
             payload = {
                 "model": self.model_name,
@@ -50,10 +78,78 @@ class InferenceProvider:
             print(f"Unexpected error in embed_text: {e}")
             return []
 
+    def embed_texts(self, texts: List[str]) -> List[List[float]]:
+        """
+        Generates embeddings for several texts with a single Ollama request.
+        Falls back to one request per text if the batch endpoint is unavailable.
+        """
+        if not texts:
+            return []
+
+        # Serve repeats from the cache and only send the misses to the model
+        results: List[List[float]] = [None] * len(texts)
+        keys = [None] * len(texts)
+        if self.cache:
+            for i, text in enumerate(texts):
+                keys[i] = self.cache.make_key(self.model_name, text)
+                results[i] = self.cache.get(keys[i])
+        # Texts repeated within the batch are sent to the model once
+        missing: Dict[str, List[int]] = {}
+        for i, vector in enumerate(results):
+            if vector is None:
+                missing.setdefault(texts[i], []).append(i)
+        if not missing:
+            return results
+
+        embeddings = self._embed_texts_uncached(list(missing))
+        for indices, embedding in zip(missing.values(), embeddings):
+            for i in indices:
+                results[i] = embedding
+            if self.cache and embedding:
+                self.cache.put(keys[indices[0]], embedding)
+        return results
+
+    def _embed_texts_uncached(self, texts: List[str]) -> List[List[float]]:
+        try:
+            payload = {
+                "model": self.model_name,
+                "input": texts
+            }
+
+            response = requests.post(
+                self.batch_endpoint,
+                json=payload,
+                headers={"Content-Type": "application/json"},
+                timeout=30 + len(texts),
+                verify=False  # Disable SSL verification for ngrok tunnels
+            )
+
+            response.raise_for_status()
+            embeddings = response.json().get("embeddings")
+            if isinstance(embeddings, list) and len(embeddings) == len(texts):
+                return embeddings
+            print("Warning: Unexpected batch embedding response, falling back to single requests")
+        except Exception as e:
+            print(f"Batch embedding failed, falling back to single requests: {e}")
+
+        return [self._request_embedding(text) for text in texts]
+
+    def embed_entities_batch(self, entities: List[Tuple[str, Dict[str, Any]]]) -> List[List[float]]:
+        """
+        Generates embeddings for a list of (entity_type, entity_data) pairs.
+        """
+        return self.embed_texts([self._entity_text(entity_type, entity_data) for entity_type, entity_data in entities])
+
     def embed_entity(self, entity_type: str, entity_data: Dict[str, Any]) -> List[float]:
         """
         Generates embeddings for an entity/node based on its type and attributes.
         """
+        return self.embed_text(self._entity_text(entity_type, entity_data))
+
+    def _entity_text(self, entity_type: str, entity_data: Dict[str, Any]) -> str:
+        """
+        Builds the text representation of an entity used for embedding.
+        """
         # Create a text representation of the entity
         text_parts = [entity_type]
         
@@ -73,13 +169,24 @@ class InferenceProvider:
             if attr in entity_data and entity_data[attr]:
                 text_parts.append(f"{attr.title()}: {entity_data[attr]}")
         
-        entity_text = ". ".join(text_parts)
-        return self.embed_text(entity_text)
+        return ". ".join(text_parts)
 
     def embed_relation(self, relation_data: Dict[str, Any]) -> List[float]:
         """
         Generates embeddings for a relation based on its properties.
         """
+        return self.embed_text(self._relation_text(relation_data))
+
+    def embed_relations_batch(self, relations: List[Dict[str, Any]]) -> List[List[float]]:
+        """
+        Generates embeddings for a list of relation property dicts.
+        """
+        return self.embed_texts([self._relation_text(relation_data) for relation_data in relations])
+
+    def _relation_text(self, relation_data: Dict[str, Any]) -> str:
+        """
+        Builds the text representation of a relation used for embedding.
+        """
         # Create a text representation of the relation
         text_parts = []
         
@@ -97,8 +204,7 @@ class InferenceProvider:
         if 'strength' in relation_data:
             text_parts.append(f"Strength: {relation_data['strength']}")
         
-        relation_text = ". ".join(text_parts) if text_parts else "Generic relation"
-        return self.embed_text(relation_text)
+        return ". ".join(text_parts) if text_parts else "Generic relation"
 
     def test_connection(self) -> bool:
         """
@@ -12,19 +12,59 @@ Implements the systematic grouping approach:
 
 import asyncio
 import logging
-from typing import Dict, Any, List, Optional, Tuple
+import orjson
+from typing import Dict, Any, List, Optional, Set, Tuple, Callable, Awaitable
 from dataclasses import dataclass
-from collections import defaultdict
+from functools import lru_cache
+from collections import defaultdict, ChainMap
 import hashlib
 import difflib
 
 from workspace_kg.utils.entity_config import entity_config
+from workspace_kg.utils.id_hashing import identity_digest, legacy_identity_digest, uses_legacy_ids
+from workspace_kg.config.configuration import LEGACY_ID_FALLBACK, ENTITY_WRITE_CONCURRENCY
 from workspace_kg.components.ollama_embedder import InferenceProvider
 # DB batch sizes available if needed for future optimization
 # from workspace_kg.config.configuration import DB_ENTITY_BATCH_SIZE, DB_RELATION_BATCH_SIZE
 
 logger = logging.getLogger(__name__)
 
+# Fields whose change warrants regenerating the embedding
+_ENTITY_SEMANTIC_FIELDS = frozenset({'name', 'rawDescriptions', 'title', 'description'})
+_RELATION_SEMANTIC_FIELDS = frozenset({'description', 'relationTag', 'strength'})
+
+def _relation_key(source_id: str, target_id: str, rel_type: str) -> bytes:
+    return b'::'.join((source_id.encode('utf-8'), rel_type.encode('utf-8'), target_id.encode('utf-8')))
+
+# The same (source, target, type) triples recur across batches, so relation IDs are memoized
+@lru_cache(maxsize=100_000)
+def _relation_identity(source_id: str, target_id: str, rel_type: str) -> str:
+    return identity_digest(_relation_key(source_id, target_id, rel_type))
+
+@lru_cache(maxsize=100_000)
+def _legacy_relation_identity(source_id: str, target_id: str, rel_type: str) -> str:
+    return legacy_identity_digest(_relation_key(source_id, target_id, rel_type))
+
+def _hashable(value: Any) -> Any:
+    # Set key for array items; unhashable items (dicts, lists) are keyed by their canonical JSON
+    try:
+        hash(value)
+        return value
+    except TypeError:
+        return orjson.dumps(value, option=orjson.OPT_SORT_KEYS, default=str)
+
+def _append_unique(merged_attributes: Dict[str, Any], field: str, values: List[Any], seen: Dict[str, set]):
+    """Append values not yet in merged_attributes[field], tracking membership in a per-field set"""
+    target = merged_attributes.setdefault(field, [])
+    known = seen.get(field)
+    if known is None:
+        known = seen[field] = {_hashable(value) for value in target}
+    for value in values:
+        key = _hashable(value)
+        if key not in known:
+            known.add(key)
+            target.append(value)
+
 @dataclass
 class EntityItem:
     """Represents an entity with batch ID"""
@@ -49,8 +89,13 @@ class EntityGroup:
 class SystematicMergeProvider:
     """Systematic entity merge provider with N×N comparison and proper grouping"""
     
-    def __init__(self, kuzu_db_handler):
+    def __init__(self, kuzu_db_handler, write_concurrency: int = ENTITY_WRITE_CONCURRENCY,
+                 relation_writer: Optional[Callable[[List[tuple]], Awaitable[List[str]]]] = None):
         self.db_handler = kuzu_db_handler
+        # Bulk relation creation; the pipeline passes a writer that coalesces concurrent batches
+        self.relation_writer = relation_writer
+        # Bounds concurrent per-group DB lookups and writes
+        self._db_semaphore = asyncio.Semaphore(write_concurrency)
         try:
             self.inference_provider = InferenceProvider()
         except Exception as e:
@@ -152,7 +197,7 @@ class SystematicMergeProvider:
     async def process_entities_systematic(self, entities_batch: List[Dict[str, Any]]) -> Dict[str, List[EntityGroup]]:
         """
         Step 1: Assign batch IDs to entities
-        Step 2: Perform N×N comparison to find similarities
+        Step 2: Compare entities that share a blocking key
         Step 3: Group entities with transitive closure
         Step 4: Match groups against database
         """
@@ -174,55 +219,24 @@ class SystematicMergeProvider:
                 )
                 entity_items.append(item)
         
-        logger.info(f"🔢 Step 1: Assigned IDs to {len(entity_items)} entities")
-        
-        # Step 2: N×N comparison to find matching pairs
-        entity_groups_by_type = defaultdict(list)
-        processed_items = set()
+        logger.info("🔢 Step 1: Assigned IDs to %d entities", len(entity_items))
         
-        for i, item1 in enumerate(entity_items):
-            if i in processed_items:
-                continue
-            
-            # Start new group with this item
-            group = EntityGroup(
-                group_id=f"group_{item1.entity_type}_{i}",
-                entity_type=item1.entity_type,
-                items=[item1]
-            )
-            processed_items.add(i)
-            
-            # Compare with all other items of same type
-            for j, item2 in enumerate(entity_items):
-                if j <= i or j in processed_items or item1.entity_type != item2.entity_type:
-                    continue
-                
-                matches, confidence, reason = self._entities_match(item1, item2)
-                if matches:
-                    group.add_item(item2)
-                    processed_items.add(j)
-                    logger.debug(f"✅ Matched {item1.entity_name} with {item2.entity_name} ({reason}, {confidence:.2f})")
-            
-            entity_groups_by_type[item1.entity_type].append(group)
-        
-        # Step 3: Apply transitive closure to merge overlapping groups
-        for entity_type in entity_groups_by_type:
-            entity_groups_by_type[entity_type] = self._apply_transitive_closure_systematic(
-                entity_groups_by_type[entity_type]
-            )
+        # Step 2-3: Compare entities that share a blocking key and group the matches transitively
+        entity_groups_by_type = self._group_entities(entity_items)
         
         # Log initial grouping results
         total_groups = sum(len(groups) for groups in entity_groups_by_type.values())
         # total_items_in_groups = sum(len(item.items) for groups in entity_groups_by_type.values() for item in groups)
         
-        logger.info(f"🔄 Step 2-3: Created {total_groups} groups from {len(entity_items)} entities")
-        for entity_type, groups in entity_groups_by_type.items():
-            multi_item_groups = [g for g in groups if len(g.items) > 1]
-            if multi_item_groups:
-                logger.info(f"   {entity_type}: {len(multi_item_groups)} groups with duplicates")
-                for group in multi_item_groups:
-                    names = [item.entity_name for item in group.items]
-                    logger.info(f"      Group: {names}")
+        logger.info("🔄 Step 2-3: Created %d groups from %d entities", total_groups, len(entity_items))
+        # Per-group detail walks every group, so it is only built when DEBUG is on
+        if logger.isEnabledFor(logging.DEBUG):
+            for entity_type, groups in entity_groups_by_type.items():
+                multi_item_groups = [g for g in groups if len(g.items) > 1]
+                if multi_item_groups:
+                    logger.debug("   %s: %d groups with duplicates", entity_type, len(multi_item_groups))
+                    for group in multi_item_groups:
+                        logger.debug("      Group: %s", [item.entity_name for item in group.items])
         
         # Step 4: Match groups against database
         try:
@@ -236,87 +250,105 @@ class SystematicMergeProvider:
         
         return dict(entity_groups_by_type)
     
-    def _apply_transitive_closure_systematic(self, groups: List[EntityGroup]) -> List[EntityGroup]:
-        """Apply transitive closure - if A matches B and B matches C, then A, B, C should be in same group"""
-        if len(groups) <= 1:
-            return groups
-        
-        # Check for overlaps and merge
-        merged_groups = []
-        processed = set()
-        
-        for i, group1 in enumerate(groups):
-            if i in processed:
-                continue
-            
-            # Find all groups that should merge with this one
-            to_merge = [group1]
-            to_merge_indices = {i}
-            
-            # Keep checking for new overlaps until no more found
-            changed = True
-            while changed:
-                changed = False
-                for j, group2 in enumerate(groups):
-                    if j in to_merge_indices or j in processed:
+    def _blocking_keys(self, item: EntityItem) -> Set[tuple]:
+        """
+        Keys two entities must share for _entities_match to succeed.
+        Every rule is an equality on normalized values, so blocking on those values loses no matches.
+        """
+        matching_rules = entity_config.get_systematic_merge_rules(item.entity_type)
+        attrs = item.attributes
+        if not matching_rules:
+            name = self._normalize_string(attrs.get('name', ''))
+            return {("name", name)} if name else set()
+
+        keys = set()
+        for rule_index, rule in enumerate(matching_rules):
+            rule_type = rule.get("rule", "")
+            match_field = rule.get("match", "")
+            db_field = rule.get("db", match_field)
+            if rule_type == "exact":
+                value = self._normalize_string(str(attrs.get(match_field, '')))
+                if value:
+                    keys.add((rule_index, value))
+            elif rule_type == "search" and rule.get("type", "string") == "list":
+                # A search matches on value-in-list or list overlap; both share one of these values
+                values = attrs.get(db_field) if isinstance(attrs.get(db_field), list) else []
+                for value in [attrs.get(match_field, '')] + values:
+                    value = self._normalize_string(str(value))
+                    if value:
+                        keys.add((rule_index, value))
+        return keys
+
+    def _group_entities(self, entity_items: List[EntityItem]) -> Dict[str, List[EntityGroup]]:
+        """Group matching entities (connected components of the match graph) using blocked candidate pairs"""
+        parent = list(range(len(entity_items)))
+
+        def find(i: int) -> int:
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        # Only entities sharing a blocking key are compared, instead of all N×N pairs
+        buckets: Dict[tuple, List[int]] = defaultdict(list)
+        for i, item in enumerate(entity_items):
+            for key in self._blocking_keys(item):
+                buckets[(item.entity_type, key)].append(i)
+
+        compared = set()
+        for members in buckets.values():
+            for x, i in enumerate(members):
+                for j in members[x + 1:]:
+                    root_i, root_j = find(i), find(j)
+                    if root_i == root_j or (i, j) in compared:
                         continue
-                    
-                    # Check if any items in group2 match any items in our merged groups
-                    should_merge = False
-                    for merge_group in to_merge:
-                        for item1 in merge_group.items:
-                            for item2 in group2.items:
-                                matches, _, _ = self._entities_match(item1, item2)
-                                if matches:
-                                    should_merge = True
-                                    break
-                            if should_merge:
-                                break
-                        if should_merge:
-                            break
-                    
-                    if should_merge:
-                        to_merge.append(group2)
-                        to_merge_indices.add(j)
-                        changed = True
-            
-            # Merge all groups into one
-            if len(to_merge) > 1:
-                merged_group = EntityGroup(
-                    group_id=f"merged_{groups[0].entity_type}_{i}",
-                    entity_type=group1.entity_type,
+                    compared.add((i, j))
+                    matches, confidence, reason = self._entities_match(entity_items[i], entity_items[j])
+                    if matches:
+                        # Lower index stays root so the group keeps its first item as representative
+                        parent[max(root_i, root_j)] = min(root_i, root_j)
+                        logger.debug("✅ Matched %s with %s (%s, %.2f)", entity_items[i].entity_name,
+                                     entity_items[j].entity_name, reason, confidence)
+
+        entity_groups_by_type = defaultdict(list)
+        groups_by_root: Dict[int, EntityGroup] = {}
+        for i, item in enumerate(entity_items):
+            root = find(i)
+            group = groups_by_root.get(root)
+            if group is None:
+                group = groups_by_root[root] = EntityGroup(
+                    group_id=f"group_{item.entity_type}_{root}",
+                    entity_type=item.entity_type,
                     items=[]
                 )
-                for group in to_merge:
-                    merged_group.items.extend(group.items)
-                merged_groups.append(merged_group)
-            else:
-                merged_groups.append(group1)
-            
-            processed.update(to_merge_indices)
-        
-        return merged_groups
+                entity_groups_by_type[item.entity_type].append(group)
+            group.add_item(item)
+        return entity_groups_by_type
     
     async def _match_groups_with_database(self, entity_groups_by_type: Dict[str, List[EntityGroup]]):
         """Step 4: Match each group against existing database entities"""
         
-        for entity_type, groups in entity_groups_by_type.items():
-            for group in groups:
-                # Use the first item in group to search for database matches
-                representative_item = group.items[0]
-                
-                # Try to find existing entity using systematic rules
+        async def match_group(entity_type: str, group: EntityGroup):
+            # Use the first item in group to search for database matches
+            representative_item = group.items[0]
+
+            # Try to find existing entity using systematic rules
+            async with self._db_semaphore:
                 existing_entity = await self._find_existing_entity_systematic(
                     entity_type, representative_item.attributes
                 )
-                
-                if existing_entity:
-                    # Get the correct primary key field value (now always 'name')
-                    group.primary_entity_id = existing_entity.get('name')
-                    group.primary_entity_data = existing_entity
-                    logger.debug(f"🔗 Group {group.group_id} matched with existing entity {group.primary_entity_id}")
-                else:
-                    logger.debug(f"🆕 Group {group.group_id} will create new entity")
+
+            if existing_entity:
+                # Get the correct primary key field value (now always 'name')
+                group.primary_entity_id = existing_entity.get('name')
+                group.primary_entity_data = existing_entity
+                logger.debug("🔗 Group %s matched with existing entity %s", group.group_id, group.primary_entity_id)
+            else:
+                logger.debug("🆕 Group %s will create new entity", group.group_id)
+
+        # Each group only touches its own fields, so lookups run concurrently
+        await asyncio.gather(*(match_group(entity_type, group)
+                               for entity_type, groups in entity_groups_by_type.items() for group in groups))
     
     async def _find_existing_entity_systematic(self, entity_type: str, attributes: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """Find existing entity using the same systematic rules"""
@@ -338,7 +370,7 @@ class SystematicMergeProvider:
             
             # Skip if the database field doesn't exist in the schema
             if db_field not in entity_schema:
-                logger.debug(f"Skipping rule for {entity_type}.{db_field} - field not in schema")
+                logger.debug("Skipping rule for %s.%s - field not in schema", entity_type, db_field)
                 continue
             
             if rule_type == "exact":
@@ -352,6 +384,10 @@ class SystematicMergeProvider:
                         escaped_entity_type = entity_type.replace("'", "\\'")
                         query = f"MATCH (e:Nodes) WHERE e.type = '{escaped_entity_type}' AND ANY(x IN e.emails WHERE toLower(x) = toLower('{escaped_value}')) RETURN e"
                         params = {}
+                    elif db_field == "name":
+                        # Compare against the stored lowercase shadow instead of lowering every row
+                        query = "MATCH (e:Nodes) WHERE e.type = $entity_type AND e.name_lc = $value RETURN e"
+                        params = {"entity_type": entity_type, "value": value.lower()}
                     else:
                         query = f"MATCH (e:Nodes) WHERE e.type = $entity_type AND toLower(e.{db_field}) = toLower($value) RETURN e"
                         params = {"entity_type": entity_type, "value": value}
@@ -371,7 +407,7 @@ class SystematicMergeProvider:
                 field_type_def = field_schema.get('type', '') if isinstance(field_schema, dict) else str(field_schema)
                 
                 if not field_type_def.endswith('[]'):
-                    logger.debug(f"Skipping array search for {entity_type}.{db_field} - not an array field")
+                    logger.debug("Skipping array search for %s.%s - not an array field", entity_type, db_field)
                     continue
                 
                 search_value = attributes.get(match_field, '').strip()
@@ -397,7 +433,8 @@ class SystematicMergeProvider:
         """
         Step 5: Merge groups to database with proper array field handling
         Returns mapping of entity_name -> entity_info for relation processing
-        MODIFIED: Process entities one at a time to avoid 413 payload errors from large embeddings
+        Groups are written with one UNWIND per entity type; groups sharing a target node fall back to
+        one entity per request, in batch order
         """
 
         processed_entities = {}  # entity_name -> {entity_id, entity_type}
@@ -408,21 +445,26 @@ class SystematicMergeProvider:
             "groups_processed": 0
         }
 
-        # Process each entity type separately
+        # Build every group's payload first so all embeddings go out as one batch request
+        prepared_groups = await self._prepare_groups(entity_groups_by_type, source_item_id)
+
+        # Write every group concurrently, still one entity per request to avoid payload size issues
+        outcomes = await self._write_groups(entity_groups_by_type, source_item_id, prepared_groups)
+
+        # Mappings are applied in group order so later groups win, as in the serial loop
         for entity_type, groups in entity_groups_by_type.items():
-            logger.info(f"🔄 Processing {len(groups)} groups for entity type {entity_type}")
+            logger.info("🔄 Processing %d groups for entity type %s", len(groups), entity_type)
 
-            # Process each group individually to avoid payload size issues
             for group_idx, group in enumerate(groups):
                 stats["groups_processed"] += 1
-                logger.debug(f"📦 Processing group {group_idx + 1}/{len(groups)} for {entity_type}")
+                logger.debug("📦 Processing group %s/%s for %s", group_idx + 1, len(groups), entity_type)
 
                 try:
+                    outcome, error = outcomes[group.group_id]
+                    if error is not None:
+                        raise error
                     if group.primary_entity_id:
-                        # Merge all items into existing entity - process one group at a time
-                        merged_entity_id = await self._merge_group_into_existing_single(
-                            group, source_item_id
-                        )
+                        merged_entity_id = outcome
                         if merged_entity_id:
                             stats["entities_merged"] += len(group.items)
 
@@ -458,7 +500,7 @@ class SystematicMergeProvider:
                                     'primary_name': final_name
                                 }
 
-                            logger.info(f"✅ Merged {len(group.items)} entities into existing {actual_db_entity_id}")
+                            logger.debug("✅ Merged %d entities into existing %s", len(group.items), actual_db_entity_id)
                         else:
                             logger.error(f"❌ Failed to merge group {group.group_id}: merge returned None")
                             # Add fallback mapping using the existing entity ID if available
@@ -487,10 +529,7 @@ class SystematicMergeProvider:
                                 self._add_fallback_entity_mapping(group, processed_entities)
 
                     else:
-                        # Create new entity from group - process one group at a time
-                        new_entity_id = await self._create_entity_from_group_single(
-                            group, source_item_id
-                        )
+                        new_entity_id = outcome
                         if new_entity_id:
                             stats["entities_created"] += 1
                             stats["entities_processed"] += len(group.items)
@@ -513,9 +552,9 @@ class SystematicMergeProvider:
                                     'is_alias': item.entity_name != primary_name,
                                     'primary_name': primary_name
                                 }
-                                logger.debug(f"📝 Mapped entity: {item.entity_name} -> {entity_type}:{primary_name}")
+                                logger.debug("📝 Mapped entity: %s -> %s:%s", item.entity_name, entity_type, primary_name)
 
-                            logger.info(f"✅ Created new entity {new_entity_id} from {len(group.items)} items")
+                            logger.debug("✅ Created new entity %s from %d items", new_entity_id, len(group.items))
                         else:
                             logger.error(f"❌ Failed to create entity from group {group.group_id}: create returned None")
                             # Don't add fallback mapping for failed entities as this causes relation failures
@@ -545,7 +584,113 @@ class SystematicMergeProvider:
                         self._add_fallback_entity_mapping(group, processed_entities)
 
         return processed_entities, stats
+
+    async def _write_groups(self, entity_groups_by_type: Dict[str, List[EntityGroup]], source_item_id: str,
+                            prepared_groups: Dict[str, Any]) -> Dict[str, Tuple[Optional[str], Optional[Exception]]]:
+        """Write all groups, returning group_id -> (written entity id, exception)"""
+        # Groups that write the same node are chained so their writes keep batch order
+        chains: Dict[Any, List[EntityGroup]] = defaultdict(list)
+        for entity_type, groups in entity_groups_by_type.items():
+            for group in groups:
+                prepared = prepared_groups.get(group.group_id)
+                if group.primary_entity_id:
+                    target = (entity_type, group.primary_entity_id)
+                else:
+                    target = (entity_type, prepared[0] if prepared else group.group_id)
+                chains[target].append(group)
+
+        outcomes: Dict[str, Tuple[Optional[str], Optional[Exception]]] = {}
+
+        # Prepared groups that are the only writer of their node go out as one UNWIND per type
+        creates_by_type: Dict[str, List[EntityGroup]] = defaultdict(list)
+        updates_by_type: Dict[str, List[EntityGroup]] = defaultdict(list)
+        serial_chains = []
+        for chain in chains.values():
+            group = chain[0]
+            if len(chain) > 1 or group.group_id not in prepared_groups:
+                serial_chains.append(chain)
+            elif group.primary_entity_id:
+                updates_by_type[group.entity_type].append(group)
+            else:
+                creates_by_type[group.entity_type].append(group)
+
+        async def write_bulk(entity_type: str, creates: List[EntityGroup], updates: List[EntityGroup]):
+            async with self._db_semaphore:
+                created = set(await self.db_handler.create_entities_bulk(
+                    entity_type, [prepared_groups[group.group_id][1] for group in creates]
+                )) if creates else set()
+                updated = set(await self.db_handler.update_entities_bulk(
+                    entity_type, {group.primary_entity_id: prepared_groups[group.group_id] for group in updates}
+                )) if updates else set()
+            for group in creates:
+                entity_id = prepared_groups[group.group_id][0]
+                outcomes[group.group_id] = (entity_id if entity_id in created else None, None)
+            for group in updates:
+                outcomes[group.group_id] = (group.primary_entity_id if group.primary_entity_id in updated else None, None)
+
+        async def write_chain(chain: List[EntityGroup]):
+            for group in chain:
+                try:
+                    async with self._db_semaphore:
+                        if group.primary_entity_id:
+                            written = await self._merge_group_into_existing_single(
+                                group, source_item_id, prepared_groups.get(group.group_id)
+                            )
+                        else:
+                            written = await self._create_entity_from_group_single(
+                                group, source_item_id, prepared_groups.get(group.group_id)
+                            )
+                    outcomes[group.group_id] = (written, None)
+                except Exception as e:
+                    outcomes[group.group_id] = (None, e)
+
+        await asyncio.gather(
+            *(write_bulk(entity_type, creates_by_type.get(entity_type, []), updates_by_type.get(entity_type, []))
+              for entity_type in creates_by_type.keys() | updates_by_type.keys()),
+            *(write_chain(chain) for chain in serial_chains)
+        )
+        return outcomes
     
+    async def _prepare_groups(self, entity_groups_by_type: Dict[str, List[EntityGroup]],
+                              source_item_id: str) -> Dict[str, Any]:
+        """
+        Pass 1 of merge_groups_to_database: build create/merge payloads for every group
+        and attach embeddings generated with a single batched inference call.
+        """
+        prepared = {}
+        embedding_targets = []  # (payload attributes, entity_type, embedding input)
+        for entity_type, groups in entity_groups_by_type.items():
+            for group in groups:
+                try:
+                    if group.primary_entity_id:
+                        update_attributes = self._prepare_group_merge(group, source_item_id)
+                        prepared[group.group_id] = update_attributes
+                        embedding_input = self._merge_embedding_input(group, update_attributes)
+                        if embedding_input is not None:
+                            embedding_targets.append((update_attributes, entity_type, embedding_input))
+                    else:
+                        entity_id, merged_attributes = self._prepare_group_create(group, source_item_id)
+                        prepared[group.group_id] = (entity_id, merged_attributes)
+                        if self.inference_provider:
+                            embedding_targets.append((merged_attributes, entity_type, merged_attributes))
+                except Exception as e:
+                    # Leave the group unprepared; pass 2 will build it on its own
+                    logger.error(f"❌ Failed to prepare group {group.group_id}: {e}")
+
+        if embedding_targets:
+            try:
+                embeddings = await asyncio.to_thread(
+                    self.inference_provider.embed_entities_batch,
+                    [(entity_type, embedding_input) for _, entity_type, embedding_input in embedding_targets]
+                )
+                for (attributes, _, _), embedding in zip(embedding_targets, embeddings):
+                    if embedding:
+                        attributes['embedding'] = embedding
+            except Exception as e:
+                logger.warning(f"Failed to generate batch embeddings for {len(embedding_targets)} entities: {e}")
+
+        return prepared
+
     def _add_fallback_entity_mapping(self, group: EntityGroup, processed_entities: Dict[str, Dict[str, Any]]):
         """Add fallback entity mapping when creation/merge fails to allow relationship processing"""
         entity_type = group.entity_type
@@ -557,20 +702,52 @@ class SystematicMergeProvider:
                 'entity_id': fallback_entity_id,
                 'entity_type': entity_type
             }
-            logger.debug(f"Added fallback mapping: {item.entity_name} -> {fallback_entity_id}")
+            logger.debug("Added fallback mapping: %s -> %s", item.entity_name, fallback_entity_id)
     
-    async def _merge_group_into_existing_single(self, group: EntityGroup, source_item_id: str) -> str:
+    async def _merge_group_into_existing_single(self, group: EntityGroup, source_item_id: str,
+                                                update_attributes: Optional[Dict[str, Any]] = None) -> str:
         """
         Merge all items in group into existing primary entity - SINGLE ENTITY VERSION
         This version processes entities one at a time to avoid 413 payload errors
         """
-        return await self._merge_group_into_existing(group, source_item_id)
+        return await self._merge_group_into_existing(group, source_item_id, update_attributes)
 
-    async def _merge_group_into_existing(self, group: EntityGroup, source_item_id: str) -> str:
+    async def _merge_group_into_existing(self, group: EntityGroup, source_item_id: str,
+                                         update_attributes: Optional[Dict[str, Any]] = None) -> str:
         """Merge all items in group into existing primary entity"""
+        primary_entity_id = group.primary_entity_id
+
+        if update_attributes is None:
+            update_attributes = self._prepare_group_merge(group, source_item_id)
+            embedding_input = self._merge_embedding_input(group, update_attributes)
+            if embedding_input is not None:
+                try:
+                    embedding = self.inference_provider.embed_entity(group.entity_type, embedding_input)
+                    if embedding:
+                        update_attributes['embedding'] = embedding
+                except Exception as e:
+                    logger.debug("Failed to generate embedding for entity %s:%s: %s", group.entity_type, primary_entity_id, e)
         
+        # Update the entity using the primary key field value
+        result = await self.db_handler.update_entity(group.entity_type, primary_entity_id, update_attributes)
+        if result:
+            return primary_entity_id
+        else:
+            logger.error(f"Failed to update entity {primary_entity_id} in database")
+            return None
+
+    def _merge_embedding_input(self, group: EntityGroup, update_attributes: Dict[str, Any]):
+        """Entity data to embed for a merge, or None if no significant content changed"""
+        if not self.inference_provider:
+            return None
+        if update_attributes and not _ENTITY_SEMANTIC_FIELDS.isdisjoint(update_attributes):
+            primary_entity = group.primary_entity_data
+            return ChainMap(update_attributes, primary_entity) if primary_entity else update_attributes
+        return None
+
+    def _prepare_group_merge(self, group: EntityGroup, source_item_id: str) -> Dict[str, Any]:
+        """Build the attribute updates for merging a group into its existing primary entity"""
         primary_entity = group.primary_entity_data
-        primary_entity_id = group.primary_entity_id
         
         # Collect all attributes from all items in group
         merged_attributes = {}
@@ -595,9 +772,9 @@ class SystematicMergeProvider:
                 if field_type_def.endswith('[]'):
                     valid_array_fields.append(field)
                 else:
-                    logger.debug(f"Skipping {group.entity_type}.{field} - not an array field in schema")
+                    logger.debug("Skipping %s.%s - not an array field in schema", group.entity_type, field)
             else:
-                logger.debug(f"Skipping {group.entity_type}.{field} - field not in database schema")
+                logger.debug("Skipping %s.%s - field not in database schema", group.entity_type, field)
         
         for field in valid_array_fields:
             try:
@@ -630,6 +807,9 @@ class SystematicMergeProvider:
         # Filter array fields to only those that exist in the entity schema
         # valid_array_fields = [field for field in config_array_fields if field in entity_schema]
         
+        # Membership sets per array field, so appends stay linear in the list sizes
+        seen: Dict[str, set] = {}
+
         # Merge attributes from all items
         for item in group.items:
             # Transform LLM attributes to database fields
@@ -647,71 +827,68 @@ class SystematicMergeProvider:
                             # Add to aliases if the entity schema supports aliases field
                             entity_schema = self.db_handler.entity_schemas.get(group.entity_type, {})
                             if 'aliases' in entity_schema:
-                                if 'aliases' not in merged_attributes:
-                                    merged_attributes['aliases'] = []
-                                if attrs[field] not in merged_attributes['aliases']:
-                                    merged_attributes['aliases'].append(attrs[field])
+                                _append_unique(merged_attributes, 'aliases', [attrs[field]], seen)
                 
                 # Handle array fields - append unique values
                 for field in valid_array_fields:
                     if field in attrs and attrs[field]:
-                        if field not in merged_attributes:
-                            merged_attributes[field] = []
-                        if isinstance(attrs[field], list):
-                            for value in attrs[field]:
-                                if value and value not in merged_attributes[field]:
-                                    merged_attributes[field].append(value)
-                        elif attrs[field] not in merged_attributes[field]:
-                            merged_attributes[field].append(attrs[field])
+                        values = attrs[field]
+                        _append_unique(merged_attributes, field, [v for v in values if v] if isinstance(values, list) else [values], seen)
                 
                 # Add descriptions using field mapping
                 if 'description' in attrs and attrs['description']:
-                    target_field = entity_config.get_target_field(group.entity_type, 'description')
-                    if target_field not in merged_attributes:
-                        merged_attributes[target_field] = []
-                        
+                    target_field = entity_config.get_field_plan(group.entity_type).target_field('description')
                     desc = attrs['description']
-                    if isinstance(desc, list):
-                        for d in desc:
-                            if d and d not in merged_attributes[target_field]:
-                                merged_attributes[target_field].append(d)
-                    elif desc not in merged_attributes[target_field]:
-                        merged_attributes[target_field].append(desc)
+                    _append_unique(merged_attributes, target_field, [d for d in desc if d] if isinstance(desc, list) else [desc], seen)
         
         # Remove primary key fields from updates as they cannot be changed
-        update_attributes = merged_attributes.copy()
+        update_attributes = merged_attributes
         # Primary key is name for all entities
         update_attributes.pop('name', None)
-        
-        # Generate embedding for updated entity if significant content has changed
-        if update_attributes and any(field in update_attributes for field in ['name', 'rawDescriptions', 'title', 'description']):
-            try:
-                if self.inference_provider:
-                    # Create combined entity data for embedding
-                    combined_data = {**primary_entity, **update_attributes} if primary_entity else update_attributes
-                    embedding = self.inference_provider.embed_entity(group.entity_type, combined_data)
-                    if embedding:
-                        update_attributes['embedding'] = embedding
-            except Exception as e:
-                logger.debug(f"Failed to generate embedding for entity {group.entity_type}:{primary_entity_id}: {e}")
-        
-        # Update the entity using the primary key field value
-        result = await self.db_handler.update_entity(group.entity_type, primary_entity_id, update_attributes)
-        if result:
-            return primary_entity_id
-        else:
-            logger.error(f"Failed to update entity {primary_entity_id} in database")
-            return None
+        return update_attributes
     
-    async def _create_entity_from_group_single(self, group: EntityGroup, source_item_id: str) -> str:
+    async def _create_entity_from_group_single(self, group: EntityGroup, source_item_id: str,
+                                               prepared: Optional[Tuple[str, Dict[str, Any]]] = None) -> str:
         """
         Create new entity by merging all items in group - SINGLE ENTITY VERSION
         This version processes entities one at a time to avoid 413 payload errors
         """
-        return await self._create_entity_from_group(group, source_item_id)
+        return await self._create_entity_from_group(group, source_item_id, prepared)
 
-    async def _create_entity_from_group(self, group: EntityGroup, source_item_id: str) -> str:
+    async def _create_entity_from_group(self, group: EntityGroup, source_item_id: str,
+                                        prepared: Optional[Tuple[str, Dict[str, Any]]] = None) -> str:
         """Create new entity by merging all items in group"""
+        if prepared is None:
+            entity_id, merged_attributes = self._prepare_group_create(group, source_item_id)
+            # Generate embedding for new entity
+            try:
+                if self.inference_provider:
+                    embedding = self.inference_provider.embed_entity(group.entity_type, merged_attributes)
+                    if embedding:
+                        merged_attributes['embedding'] = embedding
+            except Exception as e:
+                logger.debug("Failed to generate embedding for entity %s:%s: %s", group.entity_type, entity_id, e)
+        else:
+            entity_id, merged_attributes = prepared
+        
+        # Create the entity
+        logger.debug("🏗️ Creating entity %s with ID: %s", group.entity_type, entity_id)
+        logger.debug("   Merged attributes: %s", merged_attributes)
+        
+        try:
+            result = await self.db_handler.create_entity(group.entity_type, merged_attributes)
+            if result:
+                logger.debug("✅ Successfully created entity %s:%s", group.entity_type, entity_id)
+                return entity_id
+            else:
+                logger.error(f"❌ Failed to create entity {entity_id} in database - create_entity returned None")
+                return None
+        except Exception as e:
+            logger.error(f"❌ Exception while creating entity {entity_id}: {e}")
+            return None
+
+    def _prepare_group_create(self, group: EntityGroup, source_item_id: str) -> Tuple[str, Dict[str, Any]]:
+        """Build the entity ID and attributes for creating a new entity from a group"""
         
         # Use first item as base
         base_item = group.items[0]
@@ -736,7 +913,7 @@ class SystematicMergeProvider:
             if item.entity_name != primary_entity_name and item.entity_name not in merged_attributes['aliases']:
                 merged_attributes['aliases'].append(item.entity_name)
         
-        logger.debug(f"🔑 Setting {group.entity_type} name: {entity_id}, aliases: {merged_attributes.get('aliases', [])}")
+        logger.debug("🔑 Setting %s name: %s, aliases: %s", group.entity_type, entity_id, merged_attributes.get('aliases', []))
         
         # Initialize array fields from configuration
         try:
@@ -776,6 +953,9 @@ class SystematicMergeProvider:
         # Filter array fields to only those that exist in the entity schema
         # valid_array_fields = [field for field in config_array_fields if field in entity_schema]
         
+        # Membership sets per array field, so appends stay linear in the list sizes
+        seen: Dict[str, set] = {}
+
         # Merge attributes from all items
         for item in group.items[1:]:  # Skip first item as it's the base
             # Transform LLM attributes to database fields
@@ -793,61 +973,21 @@ class SystematicMergeProvider:
                             # Add to aliases if the entity schema supports aliases field
                             entity_schema = self.db_handler.entity_schemas.get(group.entity_type, {})
                             if 'aliases' in entity_schema:
-                                if 'aliases' not in merged_attributes:
-                                    merged_attributes['aliases'] = []
-                                if attrs[field] not in merged_attributes['aliases']:
-                                    merged_attributes['aliases'].append(attrs[field])
+                                _append_unique(merged_attributes, 'aliases', [attrs[field]], seen)
             
             # Handle array fields - append unique values
             for field in config_array_fields:
                 if field in attrs and attrs[field]:
-                    if field not in merged_attributes:
-                        merged_attributes[field] = []
-                    if isinstance(attrs[field], list):
-                        for value in attrs[field]:
-                            if value and value not in merged_attributes[field]:
-                                merged_attributes[field].append(value)
-                    elif attrs[field] not in merged_attributes[field]:
-                        merged_attributes[field].append(attrs[field])
+                    values = attrs[field]
+                    _append_unique(merged_attributes, field, [v for v in values if v] if isinstance(values, list) else [values], seen)
             
             # Add descriptions using field mapping
             if 'description' in attrs and attrs['description']:
-                target_field = entity_config.get_target_field(group.entity_type, 'description')
-                if target_field not in merged_attributes:
-                    merged_attributes[target_field] = []
-                    
+                target_field = entity_config.get_field_plan(group.entity_type).target_field('description')
                 desc = attrs['description']
-                if isinstance(desc, list):
-                    for d in desc:
-                        if d and d not in merged_attributes[target_field]:
-                            merged_attributes[target_field].append(d)
-                elif desc not in merged_attributes[target_field]:
-                    merged_attributes[target_field].append(desc)
-        
-        # Generate embedding for new entity
-        try:
-            if self.inference_provider:
-                embedding = self.inference_provider.embed_entity(group.entity_type, merged_attributes)
-                if embedding:
-                    merged_attributes['embedding'] = embedding
-        except Exception as e:
-            logger.debug(f"Failed to generate embedding for entity {group.entity_type}:{entity_id}: {e}")
+                _append_unique(merged_attributes, target_field, [d for d in desc if d] if isinstance(desc, list) else [desc], seen)
         
-        # Create the entity
-        logger.debug(f"🏗️ Creating entity {group.entity_type} with ID: {entity_id}")
-        logger.debug(f"   Merged attributes: {merged_attributes}")
-        
-        try:
-            result = await self.db_handler.create_entity(group.entity_type, merged_attributes)
-            if result:
-                logger.debug(f"✅ Successfully created entity {group.entity_type}:{entity_id}")
-                return entity_id
-            else:
-                logger.error(f"❌ Failed to create entity {entity_id} in database - create_entity returned None")
-                return None
-        except Exception as e:
-            logger.error(f"❌ Exception while creating entity {entity_id}: {e}")
-            return None
+        return entity_id, merged_attributes
     
     def _generate_entity_id(self, entity_type: str, attributes: Dict[str, Any]) -> str:
         """Generate consistent entity ID based on primary key field"""
@@ -862,7 +1002,8 @@ class SystematicMergeProvider:
             elif 'email' in attributes and attributes['email']:
                 return f"User_{attributes['email'].split('@')[0]}"
             else:
-                return f"{entity_type}_{hash(str(sorted(attributes.items())))}"
+                fallback_key = orjson.dumps(attributes, option=orjson.OPT_SORT_KEYS, default=str)
+                return f"{entity_type}_{hashlib.blake2b(fallback_key, digest_size=8).hexdigest()}"
     
     def _transform_attributes_for_database(self, entity_type: str, llm_attributes: Dict[str, Any]) -> Dict[str, Any]:
         """Transform LLM extracted attributes to database schema fields"""
@@ -875,9 +1016,12 @@ class SystematicMergeProvider:
             db_fields = entity_config.get_db_fields(entity_type)
             if not db_fields:
                 # If no mapping exists, return attributes as-is
-                logger.debug(f"No database field mappings found for entity type {entity_type}, using original attributes")
+                logger.debug("No database field mappings found for entity type %s, using original attributes", entity_type)
                 return llm_attributes.copy()
             
+            # Field mappings are resolved from the cached per-type plan rather than scanned per field
+            plan = entity_config.get_field_plan(entity_type)
+
             # Transform each LLM field to its corresponding database field(s)
             for llm_field, value in llm_attributes.items():
                 if value is None:
@@ -885,7 +1029,7 @@ class SystematicMergeProvider:
                 
                 try:
                     # Get target database field for this LLM field
-                    target_field = entity_config.get_target_field(entity_type, llm_field)
+                    target_field = plan.target_field(llm_field)
                     
                     # Transform the value according to the field configuration
                     transformed_value = entity_config.transform_value(entity_type, llm_field, value, target_field)
@@ -934,7 +1078,7 @@ class SystematicMergeProvider:
         """
         
         # Log summary of entity mapping
-        logger.info(f"🗂️ Processing relations with {len(entity_mapping)} entities in mapping")
+        logger.info("🗂️ Processing relations with %d entities in mapping", len(entity_mapping))
         
         relations_processed = 0
         relation_groups = defaultdict(list)  # (source_id, target_id, type) -> [relations]
@@ -959,7 +1103,7 @@ class SystematicMergeProvider:
                 
                 # Show some entity names to help debug
                 available_entities = list(entity_mapping.keys())[:5]  # Show first 5
-                logger.debug(f"Sample available entities: {available_entities}...")
+                logger.debug("Sample available entities: %s...", available_entities)
                 continue
             
             # CRITICAL FIX: Use canonical entity names for grouping to prevent duplicates
@@ -972,9 +1116,9 @@ class SystematicMergeProvider:
             
             # Log the mapping for debugging
             if canonical_source_name != source_name:
-                logger.debug(f"🔄 Mapping source: {source_name} -> {canonical_source_name}")
+                logger.debug("🔄 Mapping source: %s -> %s", source_name, canonical_source_name)
             if canonical_target_name != target_name:
-                logger.debug(f"🔄 Mapping target: {target_name} -> {canonical_target_name}")
+                logger.debug("🔄 Mapping target: %s -> %s", target_name, canonical_target_name)
             
             # Use canonical names for grouping to ensure relations with same canonical entities are grouped together
             group_key = (canonical_source_name, canonical_target_name, rel_type)
@@ -988,10 +1132,32 @@ class SystematicMergeProvider:
             
             relation_groups[group_key].append(rel_data_with_canonical)
         
-        # Step 2: Process each relation group using canonical names
+        # Step 2: Pre-fetch all existing relations for this batch in a single query
+        relation_ids = {
+            group_key: self._generate_relation_id(*group_key) for group_key in relation_groups
+        }
+        existing_relations = await self.db_handler.get_relations_bulk(list(relation_ids.values()))
+
+        # Relations stored under legacy IDs keep being updated in place rather than duplicated
+        if LEGACY_ID_FALLBACK and not uses_legacy_ids():
+            legacy_ids = {
+                group_key: self._generate_legacy_relation_id(*group_key)
+                for group_key, relation_id in relation_ids.items() if relation_id not in existing_relations
+            }
+            if legacy_ids:
+                legacy_relations = await self.db_handler.get_relations_bulk(list(legacy_ids.values()))
+                for group_key, legacy_id in legacy_ids.items():
+                    if legacy_id in legacy_relations:
+                        relation_ids[group_key] = legacy_id
+                        existing_relations[legacy_id] = legacy_relations[legacy_id]
+
+        # Step 3: Merge each relation group using canonical names; writes are buffered
+        pending_creates = []
+        pending_updates = []
+        embedding_targets = []  # (properties to receive the embedding, relation data to embed)
         for (canonical_source_name, canonical_target_name, rel_type), relations in relation_groups.items():
-            # Generate relation ID using canonical names to ensure uniqueness
-            relation_id = self._generate_relation_id(canonical_source_name, canonical_target_name, rel_type)
+            # Relation ID is derived from canonical names to ensure uniqueness
+            relation_id = relation_ids[(canonical_source_name, canonical_target_name, rel_type)]
             
             # Merge all relation data
             merged_descriptions = []
@@ -1025,172 +1191,127 @@ class SystematicMergeProvider:
                 max_strength = max(max_strength, float(strength))
             
             # Check if relation exists
-            existing_relation = await self.db_handler.get_relation(relation_id)
-            
-            # Generate embedding for the relation
-            relation_embedding = None
-            if self.inference_provider:
-                try:
-                    # Create relation data dictionary for embedding
-                    relation_data_for_embedding = {
-                        "type": rel_type,
-                        "relationTag": merged_relation_tags,
-                        "description": merged_descriptions,
-                        "strength": max_strength
-                    }
-                    
-                    # Generate embedding using the inference provider's embed_relation method
-                    relation_embedding = self.inference_provider.embed_relation(relation_data_for_embedding)
-                    if relation_embedding:
-                        logger.debug(f"Generated embedding for relation {canonical_source_name} -> {canonical_target_name} ({rel_type})")
-                except Exception as e:
-                    logger.warning(f"Failed to generate embedding for relation {canonical_source_name} -> {canonical_target_name}: {e}")
-            
-            relation_properties = {
-                "relation_id": relation_id,
-                "description": merged_descriptions,
-                "relationTag": merged_relation_tags,
-                "type": rel_type,
-                "strength": max_strength,
-                "permissions": merged_permissions,
-                "sources": merged_sources,
-                "createdAt": existing_relation.get('createdAt') if existing_relation else "",
-                "lastUpdated": "",
-                "embedding": relation_embedding if relation_embedding else []
-            }
+            existing_relation = existing_relations.get(relation_id)
             
             if existing_relation:
-                # Merge with existing relation
-                existing_descriptions = existing_relation.get('description', [])
-                existing_tags = existing_relation.get('relationTag', [])
-                existing_permissions = existing_relation.get('permissions', [])
-                existing_sources = existing_relation.get('sources', [])
+                # Merge with existing relation, only emitting fields that actually change
+                existing_descriptions = existing_relation.get('description') or []
+                existing_tags = existing_relation.get('relationTag') or []
+                existing_permissions = existing_relation.get('permissions') or []
+                existing_sources = existing_relation.get('sources') or []
+                existing_strength = existing_relation.get('strength') or 0.0
                 
-                # Merge arrays
-                for desc in merged_descriptions:
-                    if desc not in existing_descriptions:
-                        existing_descriptions.append(desc)
-                
-                for tag in merged_relation_tags:
-                    if tag not in existing_tags:
-                        existing_tags.append(tag)
-                
-                for perm in merged_permissions:
-                    if perm not in existing_permissions:
-                        existing_permissions.append(perm)
+                updates = {}
+                for field, existing_values, new_values in (
+                    ("description", existing_descriptions, merged_descriptions),
+                    ("relationTag", existing_tags, merged_relation_tags),
+                    ("permissions", existing_permissions, merged_permissions),
+                ):
+                    seen = set(existing_values)
+                    added = [value for value in new_values if value not in seen]
+                    if added:
+                        updates[field] = existing_values + added
                 
+                # update_relation appends sources, so only send the new one
                 if source_item_id not in existing_sources:
-                    existing_sources.append(source_item_id)
+                    updates["sources"] = [source_item_id]
                 
-                updates = {
-                    "description": existing_descriptions,
-                    "relationTag": existing_tags,
-                    "permissions": existing_permissions,
-                    "sources": existing_sources,
-                    "strength": max(existing_relation.get('strength', 0), max_strength)
-                }
+                if max_strength > existing_strength:
+                    updates["strength"] = max_strength
                 
-                # Generate embedding for updated relation if significant content has changed
-                if any(field in updates for field in ['description', 'relationTag', 'strength']):
-                    try:
-                        if self.inference_provider:
-                            # Create combined relation data for embedding
-                            updated_relation_data = {
-                                "type": rel_type,
-                                "relationTag": existing_tags,
-                                "description": existing_descriptions,
-                                "strength": updates['strength']
-                            }
-                            
-                            # Generate new embedding
-                            relation_embedding = self.inference_provider.embed_relation(updated_relation_data)
-                            if relation_embedding:
-                                updates['embedding'] = relation_embedding
-                                logger.debug(f"Updated embedding for relation {canonical_source_name} -> {canonical_target_name} ({rel_type})")
-                    except Exception as e:
-                        logger.warning(f"Failed to generate embedding for updated relation {canonical_source_name} -> {canonical_target_name}: {e}")
+                if not updates:
+                    relations_processed += 1
+                    continue
                 
-                await self.db_handler.update_relation(relation_id, updates)
-                relations_processed += 1
+                # Regenerate the embedding only if significant content has changed
+                if self.inference_provider and not _RELATION_SEMANTIC_FIELDS.isdisjoint(updates):
+                    embedding_targets.append((updates, {
+                        "type": rel_type,
+                        "relationTag": updates.get("relationTag", existing_tags),
+                        "description": updates.get("description", existing_descriptions),
+                        "strength": updates.get("strength", existing_strength)
+                    }))
+                pending_updates.append((relation_id, updates, canonical_source_name, canonical_target_name, rel_type))
             else:
                 # Create new relation using canonical names
                 # Get entity info from the first relation in the group (they all have same canonical entities)
                 first_relation = relations[0]
-                original_source_name = first_relation['original_source']
-                original_target_name = first_relation['original_target']
-                
-                source_info = entity_mapping[original_source_name]
-                target_info = entity_mapping[original_target_name]
-                source_type = source_info['entity_type']
-                target_type = target_info['entity_type']
+                source_type = entity_mapping[first_relation['original_source']]['entity_type']
+                target_type = entity_mapping[first_relation['original_target']]['entity_type']
                 
-                # Use the canonical names directly (already computed in grouping step)
-                source_id = canonical_source_name
-                target_id = canonical_target_name
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("🔗 Creating relation with canonical names: %s -> %s (%s)", canonical_source_name, canonical_target_name, rel_type)
+                    logger.debug("   Grouped %s relations from original entities", len(relations))
+                    for rel in relations:
+                        logger.debug("     %s -> %s", rel['original_source'], rel['original_target'])
                 
-                logger.debug(f"🔗 Creating relation with canonical names: {source_id} -> {target_id} ({rel_type})")
-                logger.debug(f"   Grouped {len(relations)} relations from original entities")
-                for rel in relations:
-                    logger.debug(f"     {rel['original_source']} -> {rel['original_target']}")
-                
-                # Validate that both entities exist in the database before creating relation
-                try:
-                    # Use canonical names for entity lookup
-                    source_lookup_id = canonical_source_name
-                    target_lookup_id = canonical_target_name
-                    
-                    # Add debug logging for troubleshooting
-                    logger.debug(f"🔍 Validating entities for relation {canonical_source_name} -> {canonical_target_name}")
-                    logger.debug(f"   Source: {source_type}:{source_lookup_id}")
-                    logger.debug(f"   Target: {target_type}:{target_lookup_id}")
-                    
-                    # Try entity lookup with error handling
-                    source_exists = None
-                    target_exists = None
-                    
-                    try:
-                        source_exists = await self.db_handler.get_entity(source_type, source_lookup_id)
-                    except Exception as e:
-                        logger.warning(f"❌ Error looking up source entity {source_type}:{source_lookup_id}: {e}")
-                    
-                    try:
-                        target_exists = await self.db_handler.get_entity(target_type, target_lookup_id)
-                    except Exception as e:
-                        logger.warning(f"❌ Error looking up target entity {target_type}:{target_lookup_id}: {e}")
-                    
-                    # Skip validation if entity lookup fails - proceed with relation creation
-                    # This handles cases where entities were just created and might not be immediately available
-                    if source_exists is False:  # Explicitly False, not None (which indicates lookup error)
-                        logger.warning(f"❌ Skipping relation: source entity {canonical_source_name} ({source_lookup_id}) does not exist in database")
-                        continue
-                    
-                    if target_exists is False:  # Explicitly False, not None (which indicates lookup error)
-                        logger.warning(f"❌ Skipping relation: target entity {canonical_target_name} ({target_lookup_id}) does not exist in database")
-                        continue
-                    
-                    # Create the relation
-                    logger.debug(f"🔗 Creating relation: {source_type}:{source_id} -> {target_type}:{target_id} ({rel_type})")
-                    
-                    result = await self.db_handler.create_relation(
-                        source_type, source_id, target_type, target_id, relation_properties
-                    )
-                    if result:
-                        relations_processed += 1
-                        logger.debug(f"✅ Created relation: {canonical_source_name} -> {canonical_target_name} ({rel_type})")
-                        logger.debug(f"   Consolidated {len(relations)} duplicate relations")
-                    else:
-                        logger.warning(f"❌ Failed to create relation: {canonical_source_name} -> {canonical_target_name} ({rel_type})")
-                        logger.warning(f"   Original entities: {[f"{r['original_source']} -> {r['original_target']}" for r in relations]}")
-                except Exception as e:
-                    logger.error(f"❌ Error creating relation {canonical_source_name} -> {canonical_target_name}: {e}")
-                    logger.error(f"   Original entities: {[f"{r['original_source']} -> {r['original_target']}" for r in relations]}")
-                    # Continue processing other relations even if this one fails
-                    continue
+                relation_properties = {
+                    "relation_id": relation_id,
+                    "description": merged_descriptions,
+                    "relationTag": merged_relation_tags,
+                    "type": rel_type,
+                    "strength": max_strength,
+                    "permissions": merged_permissions,
+                    "sources": merged_sources,
+                    "createdAt": "",
+                    "lastUpdated": "",
+                    "embedding": []
+                }
+                if self.inference_provider:
+                    embedding_targets.append((relation_properties, {
+                        "type": rel_type,
+                        "relationTag": merged_relation_tags,
+                        "description": merged_descriptions,
+                        "strength": max_strength
+                    }))
+                # Endpoints are matched inside the bulk MERGE, so a missing entity simply yields no row
+                pending_creates.append(((source_type, canonical_source_name, target_type, canonical_target_name, relation_properties), relations))
         
-        logger.info(f"✅ Processed {relations_processed} unique relations from {len(relations_list)} raw relations")
+        # Step 4: Embed every new or changed relation in one batched inference call
+        if embedding_targets:
+            try:
+                embeddings = await asyncio.to_thread(
+                    self.inference_provider.embed_relations_batch,
+                    [relation_data for _, relation_data in embedding_targets]
+                )
+                for (properties, _), embedding in zip(embedding_targets, embeddings):
+                    if embedding:
+                        properties['embedding'] = embedding
+            except Exception as e:
+                logger.warning(f"Failed to generate batch embeddings for {len(embedding_targets)} relations: {e}")
+        
+        # Step 5: Apply updates to existing relations; each relation is updated once, so they run concurrently
+        async def apply_update(relation_id: str, updates: Dict[str, Any]):
+            async with self._db_semaphore:
+                await self.db_handler.update_relation(relation_id, updates)
+
+        await asyncio.gather(*(apply_update(relation_id, updates) for relation_id, updates, *_ in pending_updates))
+        relations_processed += len(pending_updates)
+        
+        # Step 6: Create all new relations with one UNWIND query per property layout
+        if pending_creates:
+            try:
+                write_relations = self.relation_writer or self.db_handler.create_relations_bulk
+                created = set(await write_relations([relation for relation, _ in pending_creates]))
+            except Exception as e:
+                logger.error(f"❌ Error creating {len(pending_creates)} relations: {e}")
+                created = set()
+            for (source_type, source_id, target_type, target_id, relation_properties), relations in pending_creates:
+                if relation_properties["relation_id"] in created:
+                    relations_processed += 1
+                    logger.debug("✅ Created relation: %s -> %s (%s)", source_id, target_id, relation_properties["type"])
+                    logger.debug("   Consolidated %s duplicate relations", len(relations))
+                else:
+                    logger.warning(f"❌ Failed to create relation: {source_id} -> {target_id} ({relation_properties['type']})")
+                    logger.warning(f"   Original entities: {[f"{r['original_source']} -> {r['original_target']}" for r in relations]}")
+        
+        logger.info("✅ Processed %d unique relations from %d raw relations", relations_processed, len(relations_list))
         return relations_processed
     
     def _generate_relation_id(self, source_id: str, target_id: str, rel_type: str) -> str:
         """Generate consistent relation ID"""
-        unique_str = f"{source_id}::{rel_type}::{target_id}"
-        return hashlib.sha256(unique_str.encode('utf-8')).hexdigest()
+        return _relation_identity(source_id, target_id, rel_type)
+
+    def _generate_legacy_relation_id(self, source_id: str, target_id: str, rel_type: str) -> str:
+        """Relation ID as written before the ID hash migration"""
+        return _legacy_relation_identity(source_id, target_id, rel_type)
@@ -8,12 +8,32 @@ BATCH_SIZE = int(os.getenv('BATCH_SIZE', '5'))                   # Number of doc
 # Database Configuration with environment variable fallbacks
 DB_ENTITY_BATCH_SIZE = int(os.getenv('DB_ENTITY_BATCH_SIZE', '1'))   # Process entities one at a time to avoid 413 payload errors
 DB_RELATION_BATCH_SIZE = int(os.getenv('DB_RELATION_BATCH_SIZE', '1')) # Process relations one at a time to avoid 413 payload errors
+ENTITY_WRITE_CONCURRENCY = int(os.getenv('ENTITY_WRITE_CONCURRENCY', '16'))  # Concurrent entity lookups/writes within a merge batch
+MAX_ENTITY_SOURCES = int(os.getenv('MAX_ENTITY_SOURCES', '256'))       # Keep only the most recent N source ids per entity
+KUZU_BATCH_TRANSACTIONS = os.getenv('KUZU_BATCH_TRANSACTIONS', 'false').lower() == 'true'  # Wrap each merge batch in one transaction and checkpoint once per run; uses one connection and needs an API server that keeps transactions per connection
+BATCH_CONCURRENCY = int(os.getenv('BATCH_CONCURRENCY', '1'))          # Merge batches in flight at once; entity merges still run one batch at a time (forced to 1 with batch transactions)
+RELATION_FLUSH_INTERVAL = float(os.getenv('RELATION_FLUSH_INTERVAL', '0.05'))  # Seconds relation writes from concurrent batches are coalesced before one bulk write
+RELATION_FLUSH_ROWS = int(os.getenv('RELATION_FLUSH_ROWS', '5000'))            # Coalesced relation rows that trigger an immediate flush
+FILE_CONCURRENCY = int(os.getenv('FILE_CONCURRENCY', '1'))            # Extraction files merged at once by process_directory; entity merges still run one batch at a time (forced to 1 with batch transactions)
+
+# Embedding Configuration
+EMBED_BATCH_SIZE = int(os.getenv('EMBED_BATCH_SIZE', '64'))    # Entities embedded per inference request
+EMBED_QUEUE_SIZE = int(os.getenv('EMBED_QUEUE_SIZE', '128'))   # Embedded entities buffered ahead of DB writes
+EMBEDDING_CACHE_PATH = os.getenv('EMBEDDING_CACHE_PATH', '')   # SQLite file for a persistent embedding cache; unset disables it
+
+# ID Hashing Configuration
+ID_HASH_ALGORITHM = os.getenv('ID_HASH_ALGORITHM', 'sha256').lower()        # sha256 (IDs already in the graph), or blake2b / blake3 (requires the blake3 package) for new databases
+LEGACY_ID_FALLBACK = os.getenv('LEGACY_ID_FALLBACK', 'true').lower() == 'true'  # Also resolve relations stored under legacy sha256 IDs
 
 # Timeout Configuration
 DEFAULT_REQUEST_TIMEOUT = int(os.getenv('DEFAULT_REQUEST_TIMEOUT', '120'))  # Default timeout in seconds
 CONNECTION_TIMEOUT = int(os.getenv('CONNECTION_TIMEOUT', '10'))              # Connection timeout in seconds
 READ_TIMEOUT = int(os.getenv('READ_TIMEOUT', '30'))                         # Read timeout in seconds
 
+# Kuzu HTTP connection pool
+KUZU_POOL_SIZE = int(os.getenv('KUZU_POOL_SIZE', '32'))                      # Max (and kept-alive) connections to the Kuzu API server
+KUZU_KEEPALIVE_EXPIRY = float(os.getenv('KUZU_KEEPALIVE_EXPIRY', '30'))     # Seconds an idle pooled connection is kept open
+
 # Database URL Configuration
 KUZU_DB_URL = os.getenv('KUZU_DB_URL', 'http://localhost:7000')
 
@@ -27,12 +47,32 @@ def validate_configuration() -> Optional[str]:
         return "DB_ENTITY_BATCH_SIZE must be greater than 0"
     if DB_RELATION_BATCH_SIZE <= 0:
         return "DB_RELATION_BATCH_SIZE must be greater than 0"
+    if ENTITY_WRITE_CONCURRENCY <= 0:
+        return "ENTITY_WRITE_CONCURRENCY must be greater than 0"
+    if BATCH_CONCURRENCY <= 0:
+        return "BATCH_CONCURRENCY must be greater than 0"
+    if RELATION_FLUSH_INTERVAL < 0:
+        return "RELATION_FLUSH_INTERVAL must be 0 or greater"
+    if RELATION_FLUSH_ROWS <= 0:
+        return "RELATION_FLUSH_ROWS must be greater than 0"
+    if FILE_CONCURRENCY <= 0:
+        return "FILE_CONCURRENCY must be greater than 0"
+    if MAX_ENTITY_SOURCES <= 0:
+        return "MAX_ENTITY_SOURCES must be greater than 0"
+    if EMBED_BATCH_SIZE <= 0:
+        return "EMBED_BATCH_SIZE must be greater than 0"
+    if EMBED_QUEUE_SIZE <= 0:
+        return "EMBED_QUEUE_SIZE must be greater than 0"
+    if ID_HASH_ALGORITHM not in ('blake2b', 'sha256', 'blake3'):
+        return "ID_HASH_ALGORITHM must be one of blake2b, sha256, blake3"
     if DEFAULT_REQUEST_TIMEOUT <= 0:
         return "DEFAULT_REQUEST_TIMEOUT must be greater than 0"
     if CONNECTION_TIMEOUT <= 0:
         return "CONNECTION_TIMEOUT must be greater than 0"
     if READ_TIMEOUT <= 0:
         return "READ_TIMEOUT must be greater than 0"
+    if KUZU_POOL_SIZE <= 0:
+        return "KUZU_POOL_SIZE must be greater than 0"
     
     return None  # No errors
 
@@ -240,6 +240,7 @@ class VespaEmailPipelineConfig:
         self.vespa_schema = os.getenv('VESPA_SCHEMA', 'mail')
         self.vespa_namespace = os.getenv('VESPA_NAMESPACE', 'namespace')
         self.vespa_cluster = os.getenv('VESPA_CLUSTER', 'my_content')
+        self.vespa_visit_slices = int(os.getenv('VESPA_VISIT_SLICES', '1'))
         
         # Processing configuration
         self.batch_size = BATCH_SIZE
@@ -269,6 +270,7 @@ class VespaEmailPipelineConfig:
             'vespa_schema': self.vespa_schema,
             'vespa_namespace': self.vespa_namespace,
             'vespa_cluster': self.vespa_cluster,
+            'vespa_visit_slices': self.vespa_visit_slices,
             'batch_size': self.batch_size,
             'max_emails': self.max_emails,
             'parallel_extractions': self.parallel_extractions,
@@ -330,7 +332,8 @@ class VespaEmailPipeline:
                 endpoint=self.config.vespa_endpoint,
                 application_name="unstructured_data",
                 schema_name=self.config.vespa_schema,
-                namespace=self.config.vespa_namespace
+                namespace=self.config.vespa_namespace,
+                visit_slices=self.config.vespa_visit_slices
             )
             self.vespa_connector = VespaConnector(vespa_config)
             
@@ -343,7 +346,8 @@ class VespaEmailPipeline:
             
             # Initialize merge pipeline
             self.merge_pipeline = MergePipeline(self.config.kuzu_url)
-            await self.merge_pipeline.initialize()
+            if not await self.merge_pipeline.initialize():
+                raise RuntimeError("Merge pipeline could not initialize the database")
             
             logger.info("✅ Pipeline initialization completed")
             
@@ -97,6 +97,8 @@ class KuzuSchemaManager:
         # Add the type field to distinguish entity types
         all_fields['type'] = 'STRING'
         all_fields['name'] = 'STRING PRIMARY KEY'
+        # Lowercased name for case-insensitive lookups
+        all_fields['name_lc'] = 'STRING'
         
         # Collect all fields from all entity schemas
         for entity_type, attributes in self.entity_schemas.items():
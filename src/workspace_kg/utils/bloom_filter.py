@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Scalable Bloom filter
+Set-membership sketch with no false negatives, used to skip existence probes
+for keys that are definitely not in the database. Capacity grows by adding
+layers with tighter error rates, so the overall false positive rate stays bounded.
+"""
+
+import hashlib
+import math
+from typing import List
+
+
+class BloomFilter:
+    """Fixed-capacity Bloom filter using double hashing over a blake2b digest"""
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, key: str):
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class ScalableBloomFilter:
+    """Bloom filter that adds larger layers as it fills up"""
+
+    def __init__(self, initial_capacity: int = 100000, error_rate: float = 0.001, growth: int = 2, tightening: float = 0.9):
+        self.error_rate = error_rate
+        self.growth = growth
+        self.tightening = tightening
+        self.layers: List[BloomFilter] = [BloomFilter(initial_capacity, error_rate * (1 - tightening))]
+
+    def add(self, key: str):
+        if key in self:
+            return
+        layer = self.layers[-1]
+        if layer.count >= layer.capacity:
+            layer = BloomFilter(layer.capacity * self.growth, layer.error_rate * self.tightening)
+            self.layers.append(layer)
+        layer.add(key)
+
+    def __contains__(self, key: str) -> bool:
+        return any(key in layer for layer in reversed(self.layers))
+
+    def __len__(self) -> int:
+        return sum(layer.count for layer in self.layers)
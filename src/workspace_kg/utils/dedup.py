@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+In-batch entity pre-deduplication
+Collapses entities of one extraction batch that differ only by case, width or
+surrounding whitespace (or share a caller-supplied identity key), and points
+relations at the surviving spelling, so the duplicates never reach embedding
+or the database.
+"""
+
+import unicodedata
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+class EntityDeduplicator:
+    """Exact-match dedup over (entity type, normalized name) or (entity type, identity key)"""
+
+    @staticmethod
+    def normalize(s: str) -> str:
+        return unicodedata.normalize('NFKC', s).strip().casefold()
+
+    @staticmethod
+    def _merge_attributes(kept: Dict[str, Any], duplicate: Dict[str, Any]) -> Dict[str, Any]:
+        # Later scalars win as they would in a sequential write; descriptions and lists accumulate
+        merged = {**kept, **duplicate}
+        if 'name' in kept:
+            merged['name'] = kept['name']
+        for field, value in duplicate.items():
+            previous = kept.get(field)
+            if field == 'description' and previous and value and previous != value:
+                previous = previous if isinstance(previous, list) else [previous]
+                merged[field] = previous + [v for v in (value if isinstance(value, list) else [value]) if v not in previous]
+            elif isinstance(previous, list) and isinstance(value, list):
+                merged[field] = previous + [v for v in value if v not in previous]
+        return merged
+
+    def deduplicate(self, entities: List[Dict[str, Any]], relations: List[Dict[str, Any]],
+                    identity: Optional[Callable[[str, Dict[str, Any]], Optional[str]]] = None
+                    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], Dict[str, str]]:
+        """
+        Return the collapsed entities, the relations rewritten onto them, and the alias map.
+        `identity(entity_type, attributes)` replaces the normalized name as the dedup key;
+        entities it returns None for are kept as they are.
+        """
+        kept: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        alias_map: Dict[str, str] = {}
+        for entity_raw in entities:
+            entity_type = entity_raw.get('entity_type') or entity_raw.get('type')
+            entity_name = entity_raw.get('entity_name') or entity_raw.get('name')
+            if not entity_type or not isinstance(entity_name, str):
+                kept[(id(entity_raw), '')] = entity_raw
+                continue
+            if identity is None:
+                key = (entity_type, self.normalize(entity_name))
+            else:
+                identity_key = identity(entity_type, entity_raw.get('attributes', {}))
+                if identity_key is None:
+                    kept[(id(entity_raw), '')] = entity_raw
+                    continue
+                key = (entity_type, identity_key)
+            first = kept.get(key)
+            if first is None:
+                kept[key] = entity_raw
+                continue
+            canonical_name = first.get('entity_name') or first.get('name')
+            if entity_name != canonical_name:
+                alias_map[entity_name] = canonical_name
+            # Copy rather than mutate the caller's entity dict
+            kept[key] = {**first, 'attributes': self._merge_attributes(first.get('attributes', {}),
+                                                                      entity_raw.get('attributes', {}))}
+
+        if not alias_map:
+            return list(kept.values()), relations, alias_map
+
+        rewritten = []
+        for rel_raw in relations:
+            rel = dict(rel_raw)
+            for field in ('source_entity', 'source', 'target_entity', 'target'):
+                if rel.get(field) in alias_map:
+                    rel[field] = alias_map[rel[field]]
+            rewritten.append(rel)
+        return list(kept.values()), rewritten, alias_map
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Persistent embedding cache
+Content-addressed store for embeddings keyed by model name and the exact text
+that was embedded, backed by an in-process LRU and a SQLite table on disk.
+Vectors are held as packed float32, the precision the graph stores them in
+(FLOAT[] columns), both in memory and on disk.
+"""
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+from array import array
+from collections import OrderedDict
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingCache:
+    """Two-level (memory LRU + SQLite) cache of text embeddings"""
+
+    def __init__(self, path: str, memory_size: int = 10000):
+        self.path = path
+        self.memory_size = memory_size
+        self._memory: "OrderedDict[str, array]" = OrderedDict()
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        # Embeddings are computed in worker threads, so the connection is shared under a lock
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS embeddings_f32 (key TEXT PRIMARY KEY, vector BLOB NOT NULL)")
+        self._conn.commit()
+        # Caches written before the float32 switch keep float64 rows in `embeddings`; they are read as a fallback
+        self._has_legacy_table = self._conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'embeddings'").fetchone() is not None
+
+    @staticmethod
+    def make_key(model_name: str, text: str) -> str:
+        """Cache key over the model name and embedded text, so model changes invalidate entries"""
+        return hashlib.blake2b(f"{model_name}\x00{text}".encode('utf-8'), digest_size=16).hexdigest()
+
+    def get(self, key: str) -> Optional[List[float]]:
+        with self._lock:
+            packed = self._memory.get(key)
+            if packed is not None:
+                self._memory.move_to_end(key)
+                return packed.tolist()
+            row = self._conn.execute("SELECT vector FROM embeddings_f32 WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                packed = array('f', row[0])
+            elif self._has_legacy_table:
+                row = self._conn.execute("SELECT vector FROM embeddings WHERE key = ?", (key,)).fetchone()
+                if row is None:
+                    return None
+                packed = array('f', array('d', row[0]))
+            else:
+                return None
+            self._remember(key, packed)
+            return packed.tolist()
+
+    def put(self, key: str, vector: List[float]):
+        if not vector:
+            return
+        packed = array('f', vector)
+        with self._lock:
+            self._remember(key, packed)
+            try:
+                self._conn.execute("INSERT OR REPLACE INTO embeddings_f32 (key, vector) VALUES (?, ?)",
+                                   (key, packed.tobytes()))
+                self._conn.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Failed to persist embedding to cache: {e}")
+
+    def _remember(self, key: str, packed: array):
+        self._memory[key] = packed
+        self._memory.move_to_end(key)
+        if len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -4,7 +4,8 @@ Centralized Entity Configuration for Knowledge Graph
 Defines entity schemas, LLM prompt templates, field mappings, and merge strategies.
 """
 
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, FrozenSet
+from dataclasses import dataclass
 from enum import Enum
 import yaml
 import os
@@ -18,6 +19,20 @@ class MergeStrategy(Enum):
     REPLACE_ALWAYS = "replace_always"           # Always use new value
     AGENT_ONLY = "agent_only"                   # Only set by cleanup agents
 
+@dataclass(frozen=True)
+class FieldPlan:
+    """Per-entity-type field lookups, precomputed from the mappings"""
+    target_fields: Dict[str, str]               # LLM field -> database field
+    agent_only_fields: FrozenSet[str]           # Fields only cleanup agents may set
+    merge_strategies: Dict[str, MergeStrategy]  # Database field -> merge strategy
+    array_fields: FrozenSet[str]                # Database fields stored as arrays
+
+    def target_field(self, llm_field: str) -> str:
+        return self.target_fields.get(llm_field, llm_field)
+
+    def merge_strategy(self, field_name: str) -> MergeStrategy:
+        return self.merge_strategies.get(field_name, MergeStrategy.REPLACE_IF_BETTER)
+
 class EntityConfig:
     """Centralized configuration for entities, fields, and merge strategies"""
     
@@ -26,6 +41,7 @@ class EntityConfig:
         self.entity_schemas: Dict[str, Dict[str, Any]] = {}
         self.field_mappings: Dict[str, Any] = {}
         self.systematic_merge: Dict[str, Any] = {}
+        self._field_plans: Dict[str, FieldPlan] = {}
         self.load_config()
     
     def load_config(self):
@@ -36,6 +52,7 @@ class EntityConfig:
                 self.entity_schemas = config_data.get("entity_schemas", {})
                 self.field_mappings = config_data.get("field_mappings", {})
                 self.systematic_merge = config_data.get("systematic_merge", {})
+            self._field_plans.clear()
         else:
             raise FileNotFoundError(f"Entity config file not found: {self.config_file}")
     
@@ -99,6 +116,28 @@ class EntityConfig:
         
         return True
     
+    def get_field_plan(self, entity_type: str) -> FieldPlan:
+        """Precomputed field lookups for an entity type, cached until the config is reloaded"""
+        plan = self._field_plans.get(entity_type)
+        if plan is None:
+            mappings = self.get_db_fields(entity_type) or {}
+            target_fields = {}
+            merge_strategies = {}
+            for db_field, config in mappings.items():
+                config = config or {}
+                if config.get("mapping"):
+                    # First mapping wins, matching get_target_field
+                    target_fields.setdefault(config["mapping"], db_field)
+                merge_strategies[db_field] = MergeStrategy(config.get("merge_strategy", "replace_if_better"))
+            plan = FieldPlan(
+                target_fields=target_fields,
+                agent_only_fields=frozenset(f for f, strategy in merge_strategies.items() if strategy == MergeStrategy.AGENT_ONLY),
+                merge_strategies=merge_strategies,
+                array_fields=frozenset(self.get_entity_array_fields(entity_type))
+            )
+            self._field_plans[entity_type] = plan
+        return plan
+
     def get_array_fields(self, entity_type: str = None) -> List[str]:
         """Get list of array fields"""
         if entity_type:
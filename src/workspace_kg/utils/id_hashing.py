@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Identity hashing for entity and relation IDs
+IDs are internal, non-cryptographic identifiers, so the digest algorithm is
+configurable. SHA-256 stays the default because existing graphs are keyed by
+it; the shorter digests are meant for new databases until IDs are migrated.
+"""
+
+import hashlib
+from typing import Callable
+
+from workspace_kg.config.configuration import ID_HASH_ALGORITHM
+
+LEGACY_ID_HASH_ALGORITHM = "sha256"
+
+
+def _blake2b_hex(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def _sha256_hex(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _blake3_hex(data: bytes) -> str:
+    import blake3  # optional, only required when ID_HASH_ALGORITHM=blake3
+    return blake3.blake3(data).hexdigest(length=16)
+
+
+_HASHERS: dict[str, Callable[[bytes], str]] = {
+    "blake2b": _blake2b_hex,
+    "sha256": _sha256_hex,
+    "blake3": _blake3_hex,
+}
+
+
+def identity_digest(data: bytes) -> str:
+    """Hex digest of canonical identity bytes using the configured algorithm"""
+    return _HASHERS[ID_HASH_ALGORITHM](data)
+
+
+def legacy_identity_digest(data: bytes) -> str:
+    """Hex digest using the pre-migration algorithm, for fallback lookups"""
+    return _HASHERS[LEGACY_ID_HASH_ALGORITHM](data)
+
+
+def uses_legacy_ids() -> bool:
+    """True when the configured algorithm already produces legacy IDs"""
+    return ID_HASH_ALGORITHM == LEGACY_ID_HASH_ALGORITHM
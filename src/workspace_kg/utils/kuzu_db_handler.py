@@ -1,24 +1,36 @@
 import asyncio
 import json
 import httpx
+import orjson
+from contextlib import asynccontextmanager
+from functools import lru_cache
 from typing import Dict, Any, List, Optional
 from datetime import datetime, timezone
 import logging
 import yaml
 import os
-from workspace_kg.config.configuration import DEFAULT_REQUEST_TIMEOUT, CONNECTION_TIMEOUT, READ_TIMEOUT
+from workspace_kg.config.configuration import (
+    DEFAULT_REQUEST_TIMEOUT, CONNECTION_TIMEOUT, READ_TIMEOUT, MAX_ENTITY_SOURCES, KUZU_POOL_SIZE, KUZU_KEEPALIVE_EXPIRY
+)
 
 logger = logging.getLogger(__name__)
 
+@lru_cache(maxsize=1024)
+def _encoded_query(query: str) -> bytes:
+    # The pipeline reuses a fixed set of query strings, so their JSON encoding is cached
+    return b'{"query":' + orjson.dumps(query)
+
 class KuzuDBHandler:
-    def __init__(self, api_url: str = "http://localhost:7000", schema_file: str = 'schema.yaml'):
+    def __init__(self, api_url: str = "http://localhost:7000", schema_file: str = 'schema.yaml', pool_size: int = KUZU_POOL_SIZE):
         self.api_url = api_url
         # Disable httpx logging
         httpx_logger = logging.getLogger("httpx")
         httpx_logger.setLevel(logging.WARNING)
         # Use configurable timeouts for better flexibility
-        # Set connection limits to avoid overwhelming the server
-        limits = httpx.Limits(max_keepalive_connections=5, max_connections=10)
+        # One pooled client for the handler's lifetime; every connection may stay alive so
+        # concurrent batches reuse sockets instead of reconnecting
+        limits = httpx.Limits(max_keepalive_connections=pool_size, max_connections=pool_size,
+                              keepalive_expiry=KUZU_KEEPALIVE_EXPIRY)
         self.client = httpx.AsyncClient(
             base_url=api_url, 
             timeout=httpx.Timeout(
@@ -28,6 +40,8 @@ class KuzuDBHandler:
             ),
             limits=limits
         )
+        # Set inside batch_transaction; a retried request could land on a new connection outside it
+        self._in_transaction = False
         self.schema_file = schema_file
         self.entity_schemas: Dict[str, Any] = {}
         self.relationship_schemas: Dict[str, Any] = {}
@@ -80,16 +94,19 @@ class KuzuDBHandler:
 
     async def execute_cypher(self, query: str, params: Dict[str, Any] = None, max_retries: int = 3) -> Dict[str, Any]:
         """Execute a Cypher query against Kuzu API with retry logic"""
-        payload = {"query": query}
+        # The Kuzu API server has no client-visible prepare step; reuse the encoded query text
+        # and serialize params (embeddings included) with orjson
+        payload = _encoded_query(query)
         if params:
-            payload["params"] = params
+            payload += b',"params":' + orjson.dumps(params)
+        payload += b'}'
         
         last_error = None
         for attempt in range(max_retries):
             try:
-                response = await self.client.post("/cypher", json=payload)
+                response = await self.client.post("/cypher", content=payload, headers={"Content-Type": "application/json"})
                 response.raise_for_status()
-                return response.json()
+                return orjson.loads(response.content)
             except httpx.HTTPStatusError as e:
                 last_error = e
                 if e.response.status_code == 413:
@@ -109,13 +126,13 @@ class KuzuDBHandler:
                     raise
             except (httpx.ConnectTimeout, httpx.ReadTimeout, httpx.ConnectError) as e:
                 last_error = e
-                if attempt < max_retries - 1:
+                if attempt < max_retries - 1 and not self._in_transaction:
                     wait_time = (attempt + 1) * 2
                     logger.warning(f"Connection error, retrying in {wait_time}s (attempt {attempt + 1}/{max_retries}): {e}")
                     await asyncio.sleep(wait_time)
                     continue
                 else:
-                    logger.error(f"Connection failed after {max_retries} attempts: {e}")
+                    logger.error(f"Connection failed after {attempt + 1} attempts: {e}")
                     raise
             except asyncio.CancelledError:
                 # Don't retry cancelled operations
@@ -135,13 +152,12 @@ class KuzuDBHandler:
     async def health_check(self) -> bool:
         """Check if the database is healthy and responsive"""
         try:
-            # Simple query to test connection with minimal timeout
-            timeout = httpx.Timeout(5.0)
-            async with httpx.AsyncClient(base_url=self.api_url, timeout=timeout) as client:
-                response = await client.post("/cypher", json={"query": "RETURN 1 as test"})
-                response.raise_for_status()
-                result = response.json()
-                return result is not None and ('data' in result or 'rows' in result)
+            # Simple query to test connection with minimal timeout, over a pooled keep-alive connection
+            response = await self.client.post("/cypher", json={"query": "RETURN 1 as test"},
+                                              timeout=httpx.Timeout(5.0))
+            response.raise_for_status()
+            result = response.json()
+            return result is not None and ('data' in result or 'rows' in result)
         except Exception as e:
             logger.warning(f"Database health check failed: {e}")
             return False
@@ -150,6 +166,56 @@ class KuzuDBHandler:
         """Close the HTTP client"""
         await self.client.aclose()
 
+    @asynccontextmanager
+    async def batch_transaction(self):
+        """
+        Run the enclosed writes in one explicit transaction, committing once at the end.
+        Each statement is its own HTTP request, so this is only correct with a single-connection
+        client (pool_size=1) against an API server that keeps a transaction open per connection.
+        """
+        await self.execute_cypher("BEGIN TRANSACTION")
+        self._in_transaction = True
+        try:
+            try:
+                yield
+            except BaseException:
+                try:
+                    await self.execute_cypher("ROLLBACK")
+                except Exception as e:
+                    logger.error(f"Failed to roll back batch transaction: {e}")
+                raise
+            await self.execute_cypher("COMMIT")
+        finally:
+            self._in_transaction = False
+
+    async def set_auto_checkpoint(self, enabled: bool) -> bool:
+        """Toggle Kuzu's automatic checkpointing for the server's database."""
+        try:
+            await self.execute_cypher(f"CALL auto_checkpoint={'true' if enabled else 'false'}")
+            return True
+        except Exception as e:
+            logger.warning(f"Failed to set auto_checkpoint={enabled}: {e}")
+            return False
+
+    async def checkpoint(self) -> bool:
+        """Force a checkpoint, flushing the WAL into the database files."""
+        try:
+            await self.execute_cypher("CHECKPOINT")
+            return True
+        except Exception as e:
+            logger.error(f"Checkpoint failed: {e}")
+            return False
+
+    async def ensure_lowercase_name_column(self) -> bool:
+        """Add the lowercased-name shadow column to older databases and backfill it."""
+        try:
+            await self.execute_cypher("ALTER TABLE Nodes ADD IF NOT EXISTS name_lc STRING")
+            await self.execute_cypher("MATCH (n:Nodes) WHERE n.name_lc IS NULL SET n.name_lc = toLower(n.name)")
+            return True
+        except Exception as e:
+            logger.error(f"Failed to prepare name_lc column: {e}")
+            return False
+
     def _validate_and_filter_properties(self, entity_type: str, properties: Dict[str, Any]) -> Dict[str, Any]:
         """Validate and filter properties against the schema."""
         if entity_type not in self.entity_schemas:
@@ -167,20 +233,14 @@ class KuzuDBHandler:
         
         return validated_props
 
-    async def create_entity(self, entity_type: str, properties: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        """
-        Create a new entity (node) in the database.
-        Properties must include 'name'.
-        """
+    def _prepare_entity_properties(self, entity_type: str, properties: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Validate entity properties and normalize array fields for a node write."""
         if entity_type not in self.entity_schemas:
             logger.error(f"Unknown entity type: {entity_type}")
             return None
-        
-        # All entity types now use 'name' as primary key
-        primary_key_field = 'name'
-        
-        if primary_key_field not in properties:
-            logger.error(f"Missing '{primary_key_field}' for entity type {entity_type}")
+
+        if 'name' not in properties:
+            logger.error(f"Missing 'name' for entity type {entity_type}")
             return None
 
         # Validate properties against schema
@@ -192,6 +252,9 @@ class KuzuDBHandler:
 
         # Add the type field to distinguish entity types
         validated_properties['type'] = entity_type
+        # Lowercased shadow of the primary key for case-insensitive equality lookups
+        if isinstance(validated_properties.get('name'), str):
+            validated_properties['name_lc'] = validated_properties['name'].lower()
 
         # Ensure rawDescriptions is an array
         if 'rawDescriptions' in validated_properties and not isinstance(validated_properties['rawDescriptions'], list):
@@ -218,6 +281,20 @@ class KuzuDBHandler:
         if 'createdAt' in validated_properties:
             del validated_properties['createdAt']
 
+        return validated_properties
+
+    async def create_entity(self, entity_type: str, properties: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Create a new entity (node) in the database.
+        Properties must include 'name'.
+        """
+        # All entity types now use 'name' as primary key
+        primary_key_field = 'name'
+
+        validated_properties = self._prepare_entity_properties(entity_type, properties)
+        if validated_properties is None:
+            return None
+
         # Generate current timestamp
         current_time = datetime.now(timezone.utc).isoformat()
 
@@ -257,10 +334,10 @@ class KuzuDBHandler:
         """
         
         try:
-            logger.debug(f"Executing query: {query}")
-            logger.debug(f"With params: {params}")
+            logger.debug("Executing query: %s", query)
+            logger.debug("With params: %s", params)
             result = await self.execute_cypher(query, params)
-            logger.debug(f"Query result: {result}")
+            logger.debug("Query result: %s", result)
             if result and (result.get('data') or result.get('rows')):
                 # Handle both response formats
                 data = result.get('data') or result.get('rows')
@@ -291,28 +368,19 @@ class KuzuDBHandler:
             logger.error(f"Failed to retrieve entity {entity_type}:{entity_id}: {e}")
             return None
 
-    async def update_entity(self, entity_type: str, entity_id: str, updates: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        """Update properties of an existing entity."""
-        if not updates:
-            return await self.get_entity(entity_type, entity_id)
-
-        # All entity types now use 'name' as primary key
-        primary_key_field = 'name'
-
-        # Get schema to identify array fields
+    def _split_entity_updates(self, entity_type: str, updates: Dict[str, Any]) -> tuple[Dict[str, list], Dict[str, Any]]:
+        """Split updates into array fields (appended uniquely) and fields that are set directly."""
         entity_schema = self.entity_schemas.get(entity_type, {})
-        
-        # Identify array fields that should be appended rather than replaced
         array_fields_to_append = {}
         non_array_updates = {}
-        
+
         for key, value in updates.items():
             if key == 'lastUpdated':
                 continue  # Skip - will handle automatically
-                
+
             field_schema = entity_schema.get(key, {})
             field_type = field_schema.get('type', '') if isinstance(field_schema, dict) else str(field_schema)
-            
+
             # Check if this is an array field that should be appended
             if field_type.endswith('[]'):
                 # Ensure value is a list
@@ -322,6 +390,40 @@ class KuzuDBHandler:
             else:
                 non_array_updates[key] = value
 
+        return array_fields_to_append, non_array_updates
+
+    def _merge_array_values(self, current_entity: Dict[str, Any], array_fields_to_append: Dict[str, list]) -> Dict[str, list]:
+        """Append new array values onto the entity's current ones without duplicates."""
+        merged = {}
+        for field_name, values_to_add in array_fields_to_append.items():
+            existing_values = current_entity.get(field_name, []) or []
+            if not isinstance(existing_values, list):
+                existing_values = [existing_values] if existing_values else []
+
+            # Merge and deduplicate
+            merged_values = list(existing_values)
+            for value in values_to_add:
+                if value is not None and value not in merged_values:
+                    merged_values.append(value)
+
+            # Keep only the most recent sources so the row stays bounded
+            if field_name == 'sources':
+                merged_values = merged_values[-MAX_ENTITY_SOURCES:]
+
+            merged[field_name] = merged_values
+        return merged
+
+    async def update_entity(self, entity_type: str, entity_id: str, updates: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Update properties of an existing entity."""
+        if not updates:
+            return await self.get_entity(entity_type, entity_id)
+
+        # All entity types now use 'name' as primary key
+        primary_key_field = 'name'
+
+        # Identify array fields that should be appended rather than replaced
+        array_fields_to_append, non_array_updates = self._split_entity_updates(entity_type, updates)
+
         # Generate current timestamp
         current_time = datetime.now(timezone.utc).isoformat()
 
@@ -331,19 +433,7 @@ class KuzuDBHandler:
             # Fetch current entity to get existing array values
             current_entity = await self.get_entity(entity_type, entity_id)
             if current_entity:
-                for field_name, values_to_add in array_fields_to_append.items():
-                    existing_values = current_entity.get(field_name, []) or []
-                    if not isinstance(existing_values, list):
-                        existing_values = [existing_values] if existing_values else []
-                    
-                    # Merge and deduplicate
-                    merged_values = list(existing_values)
-                    for value in values_to_add:
-                        if value is not None and value not in merged_values:
-                            merged_values.append(value)
-                    
-                    # Add to non_array_updates to be set directly
-                    non_array_updates[field_name] = merged_values
+                non_array_updates.update(self._merge_array_values(current_entity, array_fields_to_append))
 
         # Build SET clauses for all fields (now including merged array fields)
         set_clauses = []
@@ -375,6 +465,99 @@ class KuzuDBHandler:
             logger.error(f"Failed to update entity {entity_type}:{entity_id}: {e}")
             return None
 
+    async def create_entities_bulk(self, entity_type: str, rows: List[Dict[str, Any]]) -> List[str]:
+        """
+        Create or merge many entities of one type with UNWIND, one query per property layout.
+        Same MERGE semantics as create_entity. Returns the names that were written.
+        """
+        # Rows with the same property set share a query so it is planned once
+        groups: Dict[tuple, List[Dict[str, Any]]] = {}
+        for properties in rows:
+            validated_properties = self._prepare_entity_properties(entity_type, properties)
+            if validated_properties:
+                groups.setdefault(tuple(sorted(validated_properties)), []).append(validated_properties)
+
+        has_sources = 'sources' in self.entity_schemas.get(entity_type, {})
+        current_time = datetime.now(timezone.utc).isoformat()
+        written = []
+        for keys, group_rows in groups.items():
+            create_set_clauses = [f"n.{key} = r.{key}" for key in keys if key != 'name']
+            match_set_clauses = [f"n.{key} = r.{key}" for key in keys if key not in ('name', 'rawDescriptions', 'sources')]
+            create_set_clauses.append("n.lastUpdated = $current_time")
+            match_set_clauses.append("n.lastUpdated = $current_time")
+            match_set_clauses.append("n.rawDescriptions = n.rawDescriptions + r.rawDescriptions")
+            if has_sources:
+                match_set_clauses.append("n.sources = n.sources + r.sources")
+
+            query = f"""
+            UNWIND $rows AS r
+            MERGE (n:Nodes {{name: r.name}})
+            ON CREATE SET {", ".join(create_set_clauses)}
+            ON MATCH SET {", ".join(match_set_clauses)}
+            RETURN n.name AS name
+            """
+            try:
+                result = await self.execute_cypher(query, {"rows": group_rows, "current_time": current_time})
+                data = (result.get('data') or result.get('rows')) if result else None
+                written.extend(item['name'] for item in data or [])
+            except Exception as e:
+                logger.error(f"Failed to bulk create {len(group_rows)} {entity_type} entities: {e}")
+        return written
+
+    async def update_entities_bulk(self, entity_type: str, updates_by_id: Dict[str, Dict[str, Any]]) -> List[str]:
+        """
+        Apply update_entity semantics to many entities of one type with UNWIND.
+        Returns the entity IDs that were updated.
+        """
+        if not updates_by_id:
+            return []
+
+        split_updates = {entity_id: self._split_entity_updates(entity_type, updates)
+                         for entity_id, updates in updates_by_id.items()}
+
+        # Array fields are merged with the current values, fetched in one query
+        current_by_id: Dict[str, Dict[str, Any]] = {}
+        ids_with_arrays = [entity_id for entity_id, (array_fields, _) in split_updates.items() if array_fields]
+        if ids_with_arrays:
+            query = "MATCH (n:Nodes) WHERE n.type = $entity_type AND n.name IN $entity_ids RETURN n"
+            try:
+                result = await self.execute_cypher(query, {"entity_type": entity_type, "entity_ids": ids_with_arrays})
+                data = (result.get('data') or result.get('rows')) if result else None
+                current_by_id = {item['n']['name']: item['n'] for item in data or [] if item.get('n')}
+            except Exception as e:
+                logger.error(f"Failed to fetch {len(ids_with_arrays)} {entity_type} entities for update: {e}")
+
+        groups: Dict[tuple, List[Dict[str, Any]]] = {}
+        for entity_id, (array_fields, row) in split_updates.items():
+            row = dict(row)
+            current_entity = current_by_id.get(entity_id)
+            if array_fields and current_entity:
+                row.update(self._merge_array_values(current_entity, array_fields))
+            row.pop('entity_id', None)
+            keys = tuple(sorted(row))
+            row['entity_id'] = entity_id
+            groups.setdefault(keys, []).append(row)
+
+        current_time = datetime.now(timezone.utc).isoformat()
+        updated = []
+        for keys, group_rows in groups.items():
+            set_clauses = [f"n.{key} = r.{key}" for key in keys]
+            set_clauses.append("n.lastUpdated = $current_time")
+            query = f"""
+            UNWIND $rows AS r
+            MATCH (n:Nodes) WHERE n.type = $entity_type AND n.name = r.entity_id
+            SET {", ".join(set_clauses)}
+            RETURN n.name AS name
+            """
+            params = {"rows": group_rows, "entity_type": entity_type, "current_time": current_time}
+            try:
+                result = await self.execute_cypher(query, params)
+                data = (result.get('data') or result.get('rows')) if result else None
+                updated.extend(item['name'] for item in data or [])
+            except Exception as e:
+                logger.error(f"Failed to bulk update {len(group_rows)} {entity_type} entities: {e}")
+        return updated
+
     async def delete_entity(self, entity_type: str, entity_id: str) -> bool:
         """Delete an entity and its associated relationships."""
         # All entity types now use 'name' as primary key
@@ -476,6 +659,57 @@ class KuzuDBHandler:
             logger.error(f"Failed to create/update relation {relation_properties['relation_id']}: {e}")
             return None
 
+    async def create_relations_bulk(self, relations: List[tuple]) -> List[str]:
+        """
+        Create or merge many relations with UNWIND, one query per property layout.
+        Each item is (from_entity_type, from_entity_id, to_entity_type, to_entity_id, relation_properties),
+        with the same MERGE semantics as create_relation. Returns the relation IDs that were written.
+        """
+        groups: Dict[tuple, List[Dict[str, Any]]] = {}
+        for from_entity_type, from_entity_id, to_entity_type, to_entity_id, relation_properties in relations:
+            if 'relation_id' not in relation_properties or 'relationTag' not in relation_properties:
+                logger.error("Missing 'relation_id' or 'relationTag' for relation creation.")
+                continue
+            properties = {k: v for k, v in relation_properties.items() if k not in ('createdAt', 'lastUpdated')}
+            if not isinstance(properties.get('sources', []), list):
+                properties['sources'] = [properties['sources']]
+            properties.setdefault('sources', [])
+            keys = tuple(sorted(properties))
+            groups.setdefault(keys, []).append({
+                **properties,
+                "from_entity_type": from_entity_type,
+                "from_entity_id": from_entity_id,
+                "to_entity_type": to_entity_type,
+                "to_entity_id": to_entity_id
+            })
+
+        current_time = datetime.now(timezone.utc).isoformat()
+        written = []
+        for keys, group_rows in groups.items():
+            create_set_clauses = [f"r.{key} = row.{key}" for key in keys if key != 'relation_id']
+            match_set_clauses = [f"r.{key} = row.{key}" for key in keys if key not in ('relation_id', 'sources')]
+            create_set_clauses.append("r.lastUpdated = $current_time")
+            match_set_clauses.append("r.lastUpdated = $current_time")
+            match_set_clauses.append("r.sources = r.sources + row.sources")
+
+            query = f"""
+            UNWIND $rows AS row
+            MATCH (a:Nodes), (b:Nodes)
+            WHERE a.type = row.from_entity_type AND a.name = row.from_entity_id
+              AND b.type = row.to_entity_type AND b.name = row.to_entity_id
+            MERGE (a)-[r:Relation {{relation_id: row.relation_id}}]->(b)
+            ON CREATE SET {", ".join(create_set_clauses)}
+            ON MATCH SET {", ".join(match_set_clauses)}
+            RETURN r.relation_id AS relation_id
+            """
+            try:
+                result = await self.execute_cypher(query, {"rows": group_rows, "current_time": current_time})
+                data = (result.get('data') or result.get('rows')) if result else None
+                written.extend(item['relation_id'] for item in data or [])
+            except Exception as e:
+                logger.error(f"Failed to bulk create {len(group_rows)} relations: {e}")
+        return written
+
     async def get_relation(self, relation_id: str) -> Optional[Dict[str, Any]]:
         """Retrieve a relation by its ID."""
         query = f"MATCH ()-[r:Relation]->() WHERE r.relation_id = $relation_id RETURN r"
@@ -491,6 +725,22 @@ class KuzuDBHandler:
             logger.error(f"Failed to retrieve relation {relation_id}: {e}")
             return None
 
+    async def get_relations_bulk(self, relation_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Retrieve many relations in one query, keyed by relation_id."""
+        if not relation_ids:
+            return {}
+        query = "MATCH ()-[r:Relation]->() WHERE r.relation_id IN $relation_ids RETURN r"
+        params = {"relation_ids": list(relation_ids)}
+        try:
+            result = await self.execute_cypher(query, params)
+            data = (result.get('data') or result.get('rows')) if result else None
+            if not data:
+                return {}
+            return {item['r']['relation_id']: item['r'] for item in data if item.get('r')}
+        except Exception as e:
+            logger.error(f"Failed to bulk retrieve {len(relation_ids)} relations: {e}")
+            return {}
+
     async def get_relations_between_entities(self, 
                                              from_entity_type: str, 
                                              from_entity_id: str, 
@@ -6,33 +6,122 @@ and merging according to established rules.
 """
 
 import asyncio
-import json
 import logging
+import mmap
+import ijson
+import orjson
 import os
-import hashlib
+import time
+from collections import deque, defaultdict, OrderedDict
+from contextlib import nullcontext
+from functools import lru_cache
+from itertools import islice
 from datetime import datetime
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Union, AsyncIterator, Iterable
 from pathlib import Path
 
 from workspace_kg.utils.kuzu_db_handler import KuzuDBHandler
 from workspace_kg.utils.entity_config import entity_config, MergeStrategy
+from workspace_kg.utils.minhash_lsh import MinHashLSH
+from workspace_kg.utils.id_hashing import identity_digest
+from workspace_kg.utils.bloom_filter import ScalableBloomFilter
+from workspace_kg.utils.dedup import EntityDeduplicator
 from workspace_kg.components.ollama_embedder import InferenceProvider
 from workspace_kg.components.systematic_merge_provider import SystematicMergeProvider
-from workspace_kg.config.configuration import DB_ENTITY_BATCH_SIZE, DB_RELATION_BATCH_SIZE
+from workspace_kg.config.configuration import (
+    DB_ENTITY_BATCH_SIZE, DB_RELATION_BATCH_SIZE, MAX_ENTITY_SOURCES, EMBED_BATCH_SIZE, EMBED_QUEUE_SIZE,
+    KUZU_BATCH_TRANSACTIONS, ENTITY_WRITE_CONCURRENCY, BATCH_CONCURRENCY, FILE_CONCURRENCY, KUZU_POOL_SIZE,
+    RELATION_FLUSH_INTERVAL, RELATION_FLUSH_ROWS
+)
 
 logger = logging.getLogger(__name__)
 
+# Identity key specs per entity type: (label, fields, require non-empty), first satisfiable spec wins
+_ID_KEY_SPECS = {
+    "Person": [("email", ("emails",), True), ("name_worksAt", ("name", "worksAt"), False), ("name", ("name",), False)],
+    "Organization": [("domain", ("domain",), False), ("name", ("name",), False)],
+}
+_DEFAULT_ID_KEY_SPECS = [("name", ("name",), False)]
+# Primary key of the shared Nodes table (schema.yaml)
+_PRIMARY_KEY_FIELD = "name"
+# Long-form legal suffixes folded to their short form, so "Cera Limited" and "Cera Ltd" share q-grams
+_ORG_SUFFIXES = {
+    "limited": "ltd", "incorporated": "inc", "corporation": "corp", "company": "co",
+    "l.t.d.": "ltd", "ltd.": "ltd", "inc.": "inc", "corp.": "corp", "co.": "co", "llc.": "llc",
+}
+# Entries kept in the canonical-id cache before the oldest half is dropped
+_CANONICAL_CACHE_LIMIT = 1_000_000
+# Node rows kept in the LRU entity cache
+_ENTITY_CACHE_SIZE = 50_000
+
+def _id_key_value(value: Any) -> str:
+    # List-valued keys (emails) identify by their first entry
+    if isinstance(value, list):
+        value = value[0]
+    return value.lower()
+
+def _dedup_key(item: Any) -> Any:
+    # Hashable stand-in for list items so APPEND_UNIQUE can dedup with a set
+    if isinstance(item, (str, int, float, bool, tuple)) or item is None:
+        return item
+    return orjson.dumps(item, option=orjson.OPT_SORT_KEYS, default=str)
+
+def _merge_string_lists(existing: List[str], incoming: List[str]) -> List[str]:
+    # All-string fast path for APPEND_UNIQUE: C-level set/dict dedup, no per-item key building
+    seen = set(existing)
+    return existing + [item for item in dict.fromkeys(incoming) if item not in seen]
+
+@lru_cache(maxsize=100_000)
+def _hash_identity(unique: Union[str, bytes]) -> str:
+    return identity_digest(unique if isinstance(unique, bytes) else unique.encode('utf-8'))
+
+@lru_cache(maxsize=100_000)
+def _hash_relation_identity(from_entity_id: str, relation_type: str, relation_tag: str, to_entity_id: str) -> str:
+    unique_bytes = b'::'.join((from_entity_id.encode('utf-8'), relation_type.encode('utf-8'),
+                               relation_tag.encode('utf-8'), to_entity_id.encode('utf-8')))
+    return identity_digest(unique_bytes)
+
+async def _stream_json_items(f, prefix: str) -> AsyncIterator[Dict[str, Any]]:
+    """Yield the items under `prefix` of a JSON file one at a time, parsing off the event loop"""
+    items = ijson.items(f, prefix, use_float=True)
+    sentinel = object()
+    while True:
+        item = await asyncio.to_thread(next, items, sentinel)
+        if item is sentinel:
+            break
+        yield item
+
+def _first_top_level_key(f) -> Optional[str]:
+    """First key of the file's top-level JSON object, reading only as far as that key"""
+    for _, event, value in ijson.parse(f):
+        if event == 'map_key':
+            return value
+        if event != 'start_map':
+            return None
+    return None
+
+async def _as_async_iter(batches) -> AsyncIterator[Dict[str, Any]]:
+    if hasattr(batches, '__aiter__'):
+        async for batch in batches:
+            yield batch
+    else:
+        for batch in batches:
+            yield batch
+
 class MergePipeline:
-    def __init__(self, kuzu_api_url: str = "http://localhost:7000", schema_file: str = 'schema.yaml', use_systematic_merge: bool = True):
-        self.db_handler = KuzuDBHandler(kuzu_api_url, schema_file)
-        self.stats = {
-            "total_batches": 0,
-            "total_entities_processed": 0,
-            "total_relations_processed": 0,
-            "errors": 0,
-            "start_time": None,
-            "end_time": None
-        }
+    def __init__(self, kuzu_api_url: str = "http://localhost:7000", schema_file: str = 'schema.yaml', use_systematic_merge: bool = True,
+                 lsh_snapshot_path: Optional[str] = None, use_transactions: bool = KUZU_BATCH_TRANSACTIONS,
+                 batch_concurrency: int = BATCH_CONCURRENCY, pool_size: int = KUZU_POOL_SIZE,
+                 file_concurrency: int = FILE_CONCURRENCY):
+        # BEGIN, a batch's writes and COMMIT must travel over the same server connection, so the
+        # transactional mode gets a single-connection client and every request queues on it
+        self.db_handler = KuzuDBHandler(kuzu_api_url, schema_file, pool_size=1 if use_transactions else pool_size)
+        self.use_transactions = use_transactions
+        # Explicit transactions are bound to one request stream, so batches then run one at a time
+        self.batch_concurrency = 1 if use_transactions else batch_concurrency
+        self.file_concurrency = 1 if use_transactions else file_concurrency
+        # Statistics of the most recently completed process_batches run
+        self.stats = self._new_stats()
         try:
             self.inference_provider = InferenceProvider()
         except Exception as e:
@@ -41,143 +130,341 @@ class MergePipeline:
         
         self.use_systematic_merge = use_systematic_merge
         if use_systematic_merge:
-            self.systematic_merge_provider = SystematicMergeProvider(self.db_handler)
+            # Transactions pin the batch to one request stream, so group writes are serialized there too
+            self.systematic_merge_provider = SystematicMergeProvider(
+                self.db_handler, write_concurrency=1 if use_transactions else ENTITY_WRITE_CONCURRENCY,
+                relation_writer=self._write_relations
+            )
         else:
             self.systematic_merge_provider = None
+        # Relation writes from concurrent batches waiting to go out as one bulk write
+        self._pending_relations: List[tuple] = []
+        self._relation_flush: Optional[asyncio.Task] = None
+        # Only concurrent batches or files have writes to share; otherwise the flush window is pure latency
+        self._coalesce_relations = self.batch_concurrency > 1 or self.file_concurrency > 1
+        # Held from entity lookup to entity write, so batches and files in flight never merge against stale nodes
+        self._entity_lock = asyncio.Lock()
+        # auto_checkpoint is a server-wide setting, so cleanup() turns it back on if initialize() disabled it
+        self._auto_checkpoint_disabled = False
+
+        # Resolved once so the per-batch path skips the systematic-merge check
+        self._process_one = self.process_batch_systematic if use_systematic_merge else self.process_batch
+
+        # Near-duplicate index over entity names, keyed by entity type
+        self.lsh_index = MinHashLSH(threshold=0.85, num_perm=128, q=3)
+        self.lsh_snapshot_path = lsh_snapshot_path
+        if lsh_snapshot_path and self.lsh_index.load(lsh_snapshot_path):
+            logger.info(f"📂 Loaded MinHash-LSH snapshot from {lsh_snapshot_path}")
+
+        # Names known to exist in the DB; only trusted once warm-loaded by the first process_batch
+        self.known_entities = ScalableBloomFilter(initial_capacity=1_000_000, error_rate=0.001)
+        self.known_entities_ready = False
+        self._known_entities_load: Optional[asyncio.Task] = None
+
+        self.deduplicator = EntityDeduplicator()
+
+        # (type, lowercased entity name) -> primary key of the node it resolved to, reused across batches
+        self._canonical_by_key: Dict[tuple, str] = {}
+        # LRU of (type, primary key) -> node row without its embedding, written through on every successful
+        # entity write. Writes from other processes are not seen, so rows can go stale while the pipeline runs
+        self._entity_cache: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+
+    @staticmethod
+    def _new_stats() -> Dict[str, Any]:
+        return {
+            "total_batches": 0,
+            "total_entities_processed": 0,
+            "total_relations_processed": 0,
+            "errors": 0,
+            "start_time": None,
+            "end_time": None
+        }
 
     # Methods from MergeHandler
+    def _identity_key(self, entity_type: str, attributes: Dict[str, Any]) -> Optional[str]:
+        """ID from the first satisfiable identity key spec, or None if only the attribute fallback applies"""
+        for label, fields, non_empty in _ID_KEY_SPECS.get(entity_type, _DEFAULT_ID_KEY_SPECS):
+            if all(field in attributes for field in fields) and (not non_empty or all(attributes[field] for field in fields)):
+                values = "::".join(_id_key_value(attributes[field]) for field in fields)
+                return _hash_identity(f"{entity_type}::{label}::{values}")
+        return None
+
     def _generate_entity_id(self, entity_type: str, attributes: Dict[str, Any]) -> str:
-        unique_str = f"{entity_type}"
-        if entity_type == "Person":
-            if "emails" in attributes and attributes["emails"]:
-                unique_str += f"::email::{attributes['emails'][0].lower()}"
-            elif "name" in attributes and "worksAt" in attributes:
-                unique_str += f"::name_worksAt::{attributes['name'].lower()}::{attributes['worksAt'].lower()}"
-            elif "name" in attributes:
-                unique_str += f"::name::{attributes['name'].lower()}"
-            else:
-                unique_str += f"::fallback::{json.dumps(attributes, sort_keys=True)}"
-        elif entity_type == "Organization":
-            if "domain" in attributes:
-                unique_str += f"::domain::{attributes['domain'].lower()}"
-            elif "name" in attributes:
-                unique_str += f"::name::{attributes['name'].lower()}"
-            else:
-                unique_str += f"::fallback::{json.dumps(attributes, sort_keys=True)}"
-        else:
-            if "name" in attributes:
-                unique_str += f"::name::{attributes['name'].lower()}"
-            else:
-                unique_str += f"::fallback::{json.dumps(attributes, sort_keys=True)}"
-        return hashlib.sha256(unique_str.encode('utf-8')).hexdigest()
+        identity = self._identity_key(entity_type, attributes)
+        if identity is not None:
+            return identity
+        canonical = orjson.dumps(attributes, option=orjson.OPT_SORT_KEYS)
+        return _hash_identity(f"{entity_type}::fallback::".encode('utf-8') + canonical)
 
     def _generate_relation_id(self, from_entity_id: str, to_entity_id: str, relation_type: str, relation_tag: str) -> str:
-        unique_str = f"{from_entity_id}::{relation_type}::{relation_tag}::{to_entity_id}"
-        return hashlib.sha256(unique_str.encode('utf-8')).hexdigest()
-
-    async def _find_existing_entity(self, entity_type: str, entity_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        generated_id = self._generate_entity_id(entity_type, entity_data.get('attributes', {}))
-        existing_entity = await self.db_handler.get_entity(entity_type, generated_id)
-        if existing_entity:
-            return existing_entity
-        
+        return _hash_relation_identity(from_entity_id, relation_type, relation_tag, to_entity_id)
+
+    def _lsh_text(self, entity_type: str, entity_name: str, attributes: Dict[str, Any]) -> str:
+        """Normalized name concatenated with the key attributes used for identity"""
+        parts = [entity_name]
+        if entity_type == "Person" and isinstance(attributes.get("worksAt"), str):
+            parts.append(attributes["worksAt"])
+        elif entity_type == "Organization" and isinstance(attributes.get("domain"), str):
+            parts.append(attributes["domain"])
+        text = " ".join(" ".join(part.lower().replace(",", " ").split()) for part in parts if part)
+        if entity_type == "Organization":
+            text = " ".join(_ORG_SUFFIXES.get(token, token) for token in text.split())
+        return text
+
+    async def _warm_load_known_entities(self, page_size: int = 50000):
+        """Load every (type, name) key from the DB into the Bloom filter"""
+        # Keyset paging on the primary key, so no page re-sorts and skips the rows before it
+        query = "MATCH (n:Nodes) WHERE n.name > $last RETURN n.type AS type, n.name AS name ORDER BY n.name LIMIT $limit"
+        last = ""
+        try:
+            while True:
+                result = await self.db_handler.execute_cypher(query, {"last": last, "limit": page_size})
+                rows = (result.get('data') or result.get('rows') or []) if result else []
+                for row in rows:
+                    self.known_entities.add(f"{row['type']}::{row['name'].lower()}")
+                if len(rows) < page_size:
+                    break
+                last = rows[-1]['name']
+            self.known_entities_ready = True
+            logger.info(f"🌸 Loaded {len(self.known_entities)} entity keys into Bloom filter")
+        except Exception as e:
+            logger.warning(f"Failed to warm-load entity Bloom filter, existence probes stay unfiltered: {e}")
+
+    @staticmethod
+    def _name_key(entity_type: str, entity_name: Optional[str]) -> Optional[tuple]:
+        # (type, lowercased name), computed once per entity and reused for every canonical-cache access
+        return (entity_type, entity_name.lower()) if isinstance(entity_name, str) else None
+
+    def _remember_canonical(self, name_key: Optional[tuple], canonical: str):
+        if name_key is None:
+            return
+        self._canonical_by_key[name_key] = canonical
+        if len(self._canonical_by_key) > _CANONICAL_CACHE_LIMIT:
+            # Dicts keep insertion order, so this evicts the oldest entries
+            for key in list(islice(self._canonical_by_key, _CANONICAL_CACHE_LIMIT // 2)):
+                del self._canonical_by_key[key]
+
+    def _cached_canonical(self, name_key: Optional[tuple]) -> Optional[str]:
+        return self._canonical_by_key.get(name_key) if name_key is not None else None
+
+    def _cache_entity(self, entity_type: str, row: Dict[str, Any]):
+        # Merges only need to know whether a node has an embedding, so the vector itself is not kept
+        has_embedding = bool(row.get('embedding') or row.get('has_embedding'))
+        row = {field: value for field, value in row.items() if field != 'embedding'}
+        row['has_embedding'] = has_embedding
+        key = (entity_type, row[_PRIMARY_KEY_FIELD])
+        self._entity_cache[key] = row
+        self._entity_cache.move_to_end(key)
+        if len(self._entity_cache) > _ENTITY_CACHE_SIZE:
+            self._entity_cache.popitem(last=False)
+
+    def _cached_entity(self, entity_type: str, entity_id: Optional[str]) -> Optional[Dict[str, Any]]:
+        row = self._entity_cache.get((entity_type, entity_id))
+        if row is not None:
+            self._entity_cache.move_to_end((entity_type, entity_id))
+        return row
+
+    def _forget_entity(self, entity_type: str, name_key: Optional[tuple], entity_id: str):
+        self._entity_cache.pop((entity_type, entity_id), None)
+        self._canonical_by_key.pop(name_key, None)
+
+    def _may_exist(self, entity_type: str, name_lc: Optional[str]) -> bool:
+        # Filter keys are stored lowercased; probes pass hex IDs or name_lc values, which already are
+        return name_lc is not None and f"{entity_type}::{name_lc}" in self.known_entities
+
+    async def _prefetch_existing_entities(self, entities_list: List[Dict[str, Any]]) -> tuple:
+        """
+        Resolve exact identifier matches for a whole batch with one UNWIND query per entity type.
+        Returns the matched rows and the name keys of the batch, both by entity index.
+        """
+        rows_by_type: Dict[str, List[Dict[str, Any]]] = {}
+        existing_by_index: Dict[int, Dict[str, Any]] = {}
+        name_keys: Dict[int, Optional[tuple]] = {}
+        for index, entity_raw in enumerate(entities_list):
+            entity_type = entity_raw.get('entity_type') or entity_raw.get('type')
+            if not entity_type:
+                continue
+            attributes = entity_raw.get('attributes', {})
+            is_person = entity_type == "Person"
+            name_key = name_keys[index] = self._name_key(entity_type, entity_raw.get('entity_name') or entity_raw.get('name'))
+            row = {
+                "idx": index,
+                "generated_id": self._generate_entity_id(entity_type, attributes),
+                # Names already resolved in earlier batches (including LSH aliases) are probed by their PK
+                "canonical": self._cached_canonical(name_key),
+                "email": attributes.get('email') if is_person else None,
+                "name_lc": attributes['name'].lower() if is_person and "worksAt" in attributes and isinstance(attributes.get('name'), str) else None,
+                "worksAt": attributes.get('worksAt') if is_person else None
+            }
+            # Names resolved to a cached node need no probe at all
+            cached = self._cached_entity(entity_type, row["canonical"])
+            if cached is not None:
+                existing_by_index[index] = cached
+                continue
+            # Name-based probes can be skipped when the Bloom filter rules the name out
+            if (self.known_entities_ready and row["email"] is None and row["canonical"] is None
+                    and not self._may_exist(entity_type, row["generated_id"])
+                    and not self._may_exist(entity_type, row["name_lc"])):
+                continue
+            rows_by_type.setdefault(entity_type, []).append(row)
+
+        query = """
+        UNWIND $rows AS r
+        MATCH (p:Nodes)
+        WHERE p.type = $entity_type
+          AND (p.name = r.generated_id
+               OR (r.canonical IS NOT NULL AND p.name = r.canonical)
+               OR (r.email IS NOT NULL AND r.email IN p.emails)
+               OR (r.name_lc IS NOT NULL AND p.name_lc = r.name_lc AND p.worksAt = r.worksAt))
+        RETURN r.idx AS idx, p,
+               CASE WHEN p.name = r.generated_id OR p.name = r.canonical THEN 0
+                    WHEN r.email IS NOT NULL AND r.email IN p.emails THEN 1
+                    ELSE 2 END AS priority
+        """
+        for entity_type, rows in rows_by_type.items():
+            try:
+                result = await self.db_handler.execute_cypher(query, {"rows": rows, "entity_type": entity_type})
+            except Exception as e:
+                logger.error(f"Failed to prefetch existing {entity_type} entities: {e}")
+                continue
+            best_priority: Dict[int, int] = {}
+            for row in (result.get('data') or result.get('rows') or []) if result else []:
+                index, priority = row['idx'], row.get('priority', 0)
+                if index not in best_priority or priority < best_priority[index]:
+                    best_priority[index] = priority
+                    existing_by_index[index] = row['p']
+            for index in best_priority:
+                existing = existing_by_index[index]
+                self._cache_entity(entity_type, existing)
+                # Matched nodes join the LSH index, so later spelling variants of them are found too
+                self.lsh_index.insert(entity_type, existing[_PRIMARY_KEY_FIELD],
+                                      self._lsh_text(entity_type, existing[_PRIMARY_KEY_FIELD], existing))
+            # A cached node that no longer matches was merged away or deleted
+            for row in rows:
+                if row["canonical"] is not None and row["idx"] not in existing_by_index:
+                    self._canonical_by_key.pop(name_keys[row["idx"]], None)
+        return existing_by_index, name_keys
+
+    async def _find_similar_entity(self, entity_type: str, entity_data: Dict[str, Any],
+                                   name_key: Optional[tuple]) -> Optional[Dict[str, Any]]:
+        """Fall back to near-duplicate candidates from the MinHash-LSH index"""
         attributes = entity_data.get('attributes', {})
-        if entity_type == "Person":
-            if "email" in attributes:
-                query = f"MATCH (p:Nodes) WHERE p.type = $entity_type AND $email IN p.emails RETURN p"
-                params = {"email": attributes['email'], "entity_type": entity_type}
-                result = await self.db_handler.execute_cypher(query, params)
-                if result and result.get('data'):
-                    return result['data'][0]['p']
-            if "name" in attributes and "worksAt" in attributes:
-                query = f"MATCH (p:Nodes) WHERE p.type = $entity_type AND p.name = $name AND p.worksAt = $worksAt RETURN p"
-                params = {"name": attributes['name'], "worksAt": attributes['worksAt'], "entity_type": entity_type}
-                result = await self.db_handler.execute_cypher(query, params)
-                if result and result.get('data'):
-                    return result['data'][0]['p']
+        entity_name = entity_data.get('entity_name') or entity_data.get('name')
+        if entity_name:
+            candidate = self.lsh_index.query(entity_type, self._lsh_text(entity_type, entity_name, attributes))
+            if candidate:
+                existing_entity = await self.db_handler.get_entity(entity_type, candidate)
+                if existing_entity:
+                    logger.debug("🔍 LSH matched '%s' to existing %s '%s'", entity_name, entity_type, candidate)
+                    self._remember_canonical(name_key, candidate)
+                    self._cache_entity(entity_type, existing_entity)
+                    return existing_entity
         return None
 
     def _process_attributes(self, entity_type: str, attributes: Dict[str, Any], source_item_id: str, entity_name: str, is_from_agent: bool = False) -> Dict[str, Any]:
-        processed = {}
-        processed['rawDescriptions'] = []
-        entity_array_fields = entity_config.get_entity_array_fields(entity_type)
-        if 'sources' in entity_array_fields:
-            processed['sources'] = []
+        plan = entity_config.get_field_plan(entity_type)
+        entity_array_fields = plan.array_fields
+        # Array fields start empty and scalars are wrapped on assignment, so no normalization pass is needed
+        processed = {field: [] for field in entity_array_fields}
+        processed.setdefault('rawDescriptions', [])
         
         for llm_field, value in attributes.items():
-            if not entity_config.should_merge_field(entity_type, llm_field, is_from_agent):
+            if not is_from_agent and llm_field in plan.agent_only_fields:
                 continue
             
-            target_field = entity_config.get_target_field(entity_type, llm_field)
-            transformed_value = entity_config.transform_value(entity_type, llm_field, value, target_field)
-            
+            # transform_value only reshapes descriptions, so other fields skip the call
             if llm_field == "description":
+                transformed_value = entity_config.transform_value(entity_type, llm_field, value)
                 if transformed_value and isinstance(transformed_value, list):
                     processed['rawDescriptions'].extend(transformed_value)
                 elif transformed_value:
                     processed['rawDescriptions'].append(transformed_value)
             else:
-                processed[target_field] = transformed_value
+                target_field = plan.target_field(llm_field)
+                if target_field in entity_array_fields and not isinstance(value, list):
+                    value = [value]
+                processed[target_field] = value
         
         if 'sources' in processed and source_item_id not in processed['sources']:
             processed['sources'].append(source_item_id)
-
-        for field in entity_array_fields:
-            if field in processed and not isinstance(processed[field], list):
-                processed[field] = [processed[field]]
-            elif field not in processed:
-                processed[field] = []
         
         return processed
 
     def _merge_attributes(self, entity_type: str, existing_entity: Dict[str, Any], new_attributes: Dict[str, Any]) -> Dict[str, Any]:
+        plan = entity_config.get_field_plan(entity_type)
         updates = {}
         for field, new_value in new_attributes.items():
-            strategy_str = entity_config.get_merge_strategy(entity_type, field)
-            strategy = MergeStrategy(strategy_str)
+            strategy = plan.merge_strategy(field)
             existing_value = existing_entity.get(field)
-            
+
+            if field == 'sources':
+                # Bounded ring of the most recent sources so popular entities don't grow without limit
+                existing_list = existing_value if isinstance(existing_value, list) else []
+                recent = deque(existing_list, maxlen=MAX_ENTITY_SOURCES)
+                seen = set(recent)
+                new_sources = new_value if isinstance(new_value, list) else [new_value]
+                for source in new_sources:
+                    if source not in seen:
+                        recent.append(source)
+                        seen.add(source)
+                if len(recent) != len(existing_list) or list(recent) != existing_list:
+                    updates[field] = list(recent)
+                continue
+
             if strategy == MergeStrategy.PRESERVE_EXISTING:
                 if not existing_value:
                     updates[field] = new_value
             elif strategy == MergeStrategy.APPEND_UNIQUE:
+                existing_list = existing_value if isinstance(existing_value, list) else []
+                if isinstance(new_value, list) and all(type(item) is str for item in existing_list) \
+                        and all(type(item) is str for item in new_value):
+                    merged_list = _merge_string_lists(existing_list, new_value)
+                    if len(merged_list) != len(existing_list) or not isinstance(existing_value, list):
+                        updates[field] = merged_list
+                    continue
+                seen = {_dedup_key(item) for item in existing_list}
                 if isinstance(new_value, list):
-                    existing_list = existing_value if isinstance(existing_value, list) else []
                     merged_list = list(existing_list)
                     for item in new_value:
-                        if item not in merged_list:
+                        key = _dedup_key(item)
+                        if key not in seen:
+                            seen.add(key)
                             merged_list.append(item)
                     updates[field] = merged_list
-                else:
-                    existing_list = existing_value if isinstance(existing_value, list) else []
-                    if new_value not in existing_list:
-                        updates[field] = existing_list + [new_value]
+                elif _dedup_key(new_value) not in seen:
+                    updates[field] = existing_list + [new_value]
             elif strategy == MergeStrategy.REPLACE_ALWAYS:
                 updates[field] = new_value
             elif strategy == MergeStrategy.REPLACE_IF_BETTER:
-                if not existing_value or (isinstance(new_value, str) and len(new_value) > len(str(existing_value))):
+                if not existing_value:
                     updates[field] = new_value
+                elif isinstance(new_value, str):
+                    existing_len = len(existing_value) if isinstance(existing_value, str) else len(str(existing_value))
+                    if len(new_value) > existing_len:
+                        updates[field] = new_value
         return updates
 
     async def process_batch_systematic(self, batch_data: Dict[str, Any]) -> Dict[str, Any]:
         if not self.use_systematic_merge or not self.systematic_merge_provider:
             return await self.process_batch(batch_data)
-        
-        if 'entities' in batch_data and 'relations' in batch_data:
-            entities_list = batch_data['entities']
-            relations_list = batch_data['relations']
-            source_item_id = batch_data.get('source_item_id', 'unknown')
-        elif 'item_id' in batch_data:
-            entities_list = batch_data.get('entities', [])
-            relations_list = batch_data.get('relationships', [])
-            source_item_id = batch_data['item_id']
-        else:
+
+        split = self._split_batch(batch_data)
+        if split is None:
             return {"status": "error", "message": "Unknown batch data format"}
-        
+        entities_list, relations_list, source_item_id = split
+
         try:
-            entity_groups = await self.systematic_merge_provider.process_entities_systematic(entities_list)
-            entity_mapping, merge_stats = await self.systematic_merge_provider.merge_groups_to_database(entity_groups, source_item_id)
-            relations_processed = await self.systematic_merge_provider.process_relations_systematic(relations_list, entity_mapping, source_item_id)
+            # A failed batch is rolled back before falling back to process_batch
+            transaction = self.db_handler.batch_transaction() if self.use_transactions else nullcontext()
+            async with transaction:
+                # Group matching reads nodes that the group merge writes back, so it shares the batch path's lock
+                async with self._entity_lock:
+                    entity_groups = await self.systematic_merge_provider.process_entities_systematic(entities_list)
+                    entity_mapping, merge_stats = await self.systematic_merge_provider.merge_groups_to_database(entity_groups, source_item_id)
+                    # Systematic writes bypass the entity cache and Bloom filter, so neither matches the DB any more
+                    self._entity_cache.clear()
+                    self.known_entities_ready = False
+                relations_processed = await self.systematic_merge_provider.process_relations_systematic(relations_list, entity_mapping, source_item_id)
             
             return {
                 "status": "success",
@@ -188,72 +475,282 @@ class MergePipeline:
             }
         except Exception as e:
             logger.error(f"Systematic merge processing failed: {e}")
+            self._entity_cache.clear()
             return await self.process_batch(batch_data)
 
-    async def process_batch(self, batch_data: Dict[str, Any]) -> Dict[str, Any]:
-        if 'entities' in batch_data and 'relations' in batch_data:
-            entities_list = batch_data['entities']
-            relations_list = batch_data['relations']
-            source_item_id = batch_data.get('source_item_id', 'unknown')
-        elif 'item_id' in batch_data:
-            entities_list = batch_data.get('entities', [])
-            relations_list = batch_data.get('relationships', [])
-            source_item_id = batch_data['item_id']
-        else:
-            return {"status": "error", "message": "Unknown batch data format"}
-
-        processed_entities = {}
-        processed_relations = []
+    async def _embed_producer(self, entities_list: List[Dict[str, Any]], source_item_id: str, queue: asyncio.Queue):
+        """Prepare attributes and embeddings in chunks, feeding them to the DB writer"""
+        try:
+            for start in range(0, len(entities_list), EMBED_BATCH_SIZE):
+                # Attribute processing is CPU work, so it runs in a worker while the writer awaits DB I/O
+                chunk = await asyncio.to_thread(self._prepare_chunk, entities_list, start, source_item_id)
+                if chunk:
+                    await self._embed_chunk(chunk, queue)
+        except asyncio.CancelledError:
+            # Only cancelled once the writer has stopped, so nothing is left to read the end marker
+            raise
+        except BaseException:
+            await queue.put(None)
+            raise
+        await queue.put(None)
 
-        for entity_raw in entities_list:
+    def _prepare_chunk(self, entities_list: List[Dict[str, Any]], start: int, source_item_id: str) -> List[tuple]:
+        chunk = []
+        for index in range(start, min(start + EMBED_BATCH_SIZE, len(entities_list))):
+            entity_raw = entities_list[index]
             entity_type = entity_raw.get('entity_type') or entity_raw.get('type')
             entity_name = entity_raw.get('entity_name') or entity_raw.get('name')
             if not entity_type or not entity_name:
                 continue
-            attributes = entity_raw.get('attributes', {}).copy()
+            attributes = entity_raw.get('attributes', {})
             processed_attributes = self._process_attributes(entity_type, attributes, source_item_id, entity_name)
-            existing_entity = await self._find_existing_entity(entity_type, entity_raw)
-
-            if existing_entity:
-                entity_id = existing_entity['entity_id']
-                updates = self._merge_attributes(entity_type, existing_entity, processed_attributes)
-                if updates:
-                    await self.db_handler.update_entity(entity_type, entity_id, updates)
-                processed_entities[entity_name] = {'entity_id': entity_id, 'entity_type': entity_type}
+            chunk.append((index, entity_raw, entity_type, entity_name, processed_attributes))
+        return chunk
+
+    async def _embed_chunk(self, chunk: List[tuple], queue: asyncio.Queue):
+        embeddings = []
+        if self.inference_provider:
+            try:
+                embeddings = await asyncio.to_thread(
+                    self.inference_provider.embed_entities_batch,
+                    [(entity_type, processed_attributes) for _, _, entity_type, _, processed_attributes in chunk]
+                )
+            except Exception as e:
+                logger.warning(f"Failed to generate embeddings for {len(chunk)} entities: {e}")
+        for i, item in enumerate(chunk):
+            await queue.put((*item, embeddings[i] if i < len(embeddings) else None))
+
+    async def _entity_writer(self, queue: asyncio.Queue, prefetch: asyncio.Task,
+                             entity_id_by_name: Dict[str, str], entity_type_by_name: Dict[str, str]):
+        """Drain prepared entities from the queue, plan their merges concurrently and write them in bulk"""
+        existing_by_index, name_keys = await prefetch
+        # A single transaction must stay on one request stream, so lookups are serialized in that mode
+        semaphore = asyncio.Semaphore(1 if self.use_transactions else ENTITY_WRITE_CONCURRENCY)
+        tasks = []
+        while True:
+            item = await queue.get()
+            if item is None:
+                break
+            tasks.append(asyncio.create_task(self._plan_entity(item, existing_by_index, name_keys, semaphore)))
+
+        # Buffer writes per entity type in input order so later duplicates win, as in the serial loop
+        creates: Dict[str, Dict[str, Dict[str, Any]]] = defaultdict(dict)
+        updates: Dict[str, Dict[str, Dict[str, Any]]] = defaultdict(dict)
+        resolved: Dict[str, List[tuple]] = defaultdict(list)
+        for index, entity_raw, entity_name, entity_id, entity_type, action, payload in sorted(
+                (r for r in await asyncio.gather(*tasks) if r), key=lambda r: r[0]):
+            if action == "create":
+                key = entity_id
+                buffered = creates[entity_type].get(key)
+                # Same-name creates collapse the way the MERGE in create_entity would apply them
+                creates[entity_type][key] = self._fold_create(buffered, payload) if buffered else payload
+                resolved[entity_type].append((index, entity_name, entity_id, key, entity_raw))
             else:
-                entity_id = self._generate_entity_id(entity_type, processed_attributes)
-                processed_attributes['entity_id'] = entity_id
-                new_entity = await self.db_handler.create_entity(entity_type, processed_attributes)
-                if new_entity:
-                    processed_entities[entity_name] = {'entity_id': entity_id, 'entity_type': entity_type}
+                if payload:
+                    buffered = updates[entity_type].get(entity_id)
+                    updates[entity_type][entity_id] = self._fold_update(buffered, payload) if buffered else payload
+                resolved[entity_type].append((index, entity_name, entity_id, None, entity_raw))
+
+        for entity_type in resolved:
+            created = set(await self.db_handler.create_entities_bulk(entity_type, list(creates[entity_type].values())))
+            updated = set(await self.db_handler.update_entities_bulk(entity_type, updates[entity_type]))
+            for index, entity_name, entity_id, create_key, entity_raw in resolved[entity_type]:
+                if create_key is not None:
+                    if create_key not in created:
+                        continue
+                    self.known_entities.add(f"{entity_type}::{create_key.lower()}")
+                    attributes = entity_raw.get('attributes', {})
+                    self.lsh_index.insert(entity_type, entity_name, self._lsh_text(entity_type, entity_name, attributes))
+                    if (entity_type, create_key) not in self._entity_cache:
+                        self._cache_entity(entity_type, {**creates[entity_type][create_key], _PRIMARY_KEY_FIELD: create_key})
+                elif entity_id in updates[entity_type]:
+                    if entity_id not in updated:
+                        self._forget_entity(entity_type, name_keys.get(index), entity_id)
+                        continue
+                    # Write through so the next batch merges against the updated row; arrays are
+                    # unioned as update_entities_bulk appends them
+                    cached = self._entity_cache.get((entity_type, entity_id))
+                    if cached is not None:
+                        self._cache_entity(entity_type, self._fold_update(cached, updates[entity_type][entity_id]))
+                self._remember_canonical(name_keys.get(index), entity_id)
+                entity_id_by_name[entity_name] = entity_id
+                entity_type_by_name[entity_name] = entity_type
+
+    @staticmethod
+    def _fold_create(buffered: Dict[str, Any], payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Combine two create payloads for the same node: later scalars win, descriptions and sources accumulate"""
+        folded = {**buffered, **payload}
+        for field in ('rawDescriptions', 'sources'):
+            if field in buffered or field in payload:
+                folded[field] = list(buffered.get(field) or []) + list(payload.get(field) or [])
+        return folded
+
+    @staticmethod
+    def _fold_update(buffered: Dict[str, Any], payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Combine two updates for the same node: later scalars win, array values are unioned"""
+        folded = {**buffered, **payload}
+        for field, value in payload.items():
+            previous = buffered.get(field)
+            if isinstance(previous, list) and isinstance(value, list):
+                folded[field] = previous + [v for v in value if v not in previous]
+        return folded
+
+    async def _plan_entity(self, item: tuple, existing_by_index: Dict[int, Dict[str, Any]],
+                           name_keys: Dict[int, Optional[tuple]], semaphore: asyncio.Semaphore) -> Optional[tuple]:
+        """Resolve an entity against the database and return the write it needs"""
+        index, entity_raw, entity_type, entity_name, processed_attributes, embedding = item
+        async with semaphore:
+            try:
+                existing_entity = existing_by_index.get(index) or await self._find_similar_entity(
+                    entity_type, entity_raw, name_keys.get(index))
+
+                # Every entity type shares the Nodes table keyed by name, so writes address the PK directly
+                if existing_entity:
+                    entity_id = existing_entity[_PRIMARY_KEY_FIELD]
+                    updates = self._merge_attributes(entity_type, existing_entity, processed_attributes)
+                    if embedding and not (existing_entity.get('embedding') or existing_entity.get('has_embedding')):
+                        updates['embedding'] = embedding
+                    return (index, entity_raw, entity_name, entity_id, entity_type, "update", updates)
+
+                if embedding:
+                    processed_attributes['embedding'] = embedding
+                entity_id = processed_attributes.get(_PRIMARY_KEY_FIELD, entity_name)
+                return (index, entity_raw, entity_name, entity_id, entity_type, "create", processed_attributes)
+            except Exception as e:
+                logger.error(f"Failed to merge entity {entity_type}:{entity_name}: {e}")
+        return None
+
+    @staticmethod
+    def _split_batch(batch_data: Dict[str, Any]) -> Optional[tuple]:
+        """(entities, relations, source item id) of either batch format, or None if unrecognized"""
+        if 'entities' in batch_data and 'relations' in batch_data:
+            return batch_data['entities'], batch_data['relations'], batch_data.get('source_item_id', 'unknown')
+        if 'item_id' in batch_data:
+            return batch_data.get('entities', []), batch_data.get('relationships', []), batch_data['item_id']
+        return None
+
+    async def process_batch(self, batch_data: Dict[str, Any]) -> Dict[str, Any]:
+        split = self._split_batch(batch_data)
+        if split is None:
+            return {"status": "error", "message": "Unknown batch data format"}
+        entities_list, relations_list, source_item_id = split
+
+        # Normalizing and hashing every entity is CPU work, so it runs off the event loop
+        entities_list, relations_list = await asyncio.to_thread(self._prededuplicate, entities_list, relations_list)
+
+        # Only this path consults the Bloom filter, so it is filled on first use rather than in initialize()
+        if self._known_entities_load is None:
+            self._known_entities_load = asyncio.create_task(self._warm_load_known_entities())
+        await asyncio.shield(self._known_entities_load)
+
+        transaction = self.db_handler.batch_transaction() if self.use_transactions else nullcontext()
+        async with transaction:
+            return await self._write_batch(entities_list, relations_list, source_item_id)
+
+    def _prededuplicate(self, entities_list: List[Dict[str, Any]], relations_list: List[Dict[str, Any]]) -> tuple:
+        """
+        Collapse case and whitespace variants, then mentions sharing an identity key (e.g. the same email),
+        before any embedding or DB work, so each lookup and write happens once
+        """
+        entity_count = len(entities_list)
+        entities_list, relations_list, alias_map = self.deduplicator.deduplicate(entities_list, relations_list)
+        entities_list, relations_list, id_alias_map = self.deduplicator.deduplicate(
+            entities_list, relations_list, identity=self._identity_key)
+        if len(entities_list) < entity_count:
+            logger.debug("🧹 Pre-dedup collapsed %d of %d entities (%d aliases)",
+                         entity_count - len(entities_list), entity_count, len(alias_map) + len(id_alias_map))
+        return entities_list, relations_list
+
+    async def _write_batch(self, entities_list: List[Dict[str, Any]], relations_list: List[Dict[str, Any]], source_item_id: str) -> Dict[str, Any]:
+        entity_id_by_name: Dict[str, str] = {}
+        entity_type_by_name: Dict[str, str] = {}
+        processed_relations = []
+
+        # Embedding (producer) and DB writes (consumer) overlap through a bounded queue
+        queue = asyncio.Queue(maxsize=EMBED_QUEUE_SIZE)
+        producer = asyncio.create_task(self._embed_producer(entities_list, source_item_id, queue))
+        prefetch = None
+        try:
+            # Entity merges read nodes and write them back, so concurrent batches take turns from prefetch to write
+            async with self._entity_lock:
+                prefetch = asyncio.create_task(self._prefetch_existing_entities(entities_list))
+                await self._entity_writer(queue, prefetch, entity_id_by_name, entity_type_by_name)
+        except BaseException:
+            # Nothing drains the queue once the writer stops, so the producer would block on put forever
+            tasks = [task for task in (producer, prefetch) if task is not None]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        await producer
         
+        # Collapse duplicate (from, to, type) triples within the batch before touching the DB
+        relation_by_id: Dict[str, Dict[str, Any]] = {}
         for rel_raw in relations_list:
             source_entity_name = rel_raw.get('source_entity') or rel_raw.get('source')
             target_entity_name = rel_raw.get('target_entity') or rel_raw.get('target')
             relationship_type = rel_raw.get('relationship_type') or rel_raw.get('type')
             if not source_entity_name or not target_entity_name or not relationship_type:
                 continue
-            if source_entity_name not in processed_entities or target_entity_name not in processed_entities:
+            from_entity_id = entity_id_by_name.get(source_entity_name)
+            to_entity_id = entity_id_by_name.get(target_entity_name)
+            if from_entity_id is None or to_entity_id is None:
                 continue
 
-            from_entity_id = processed_entities[source_entity_name]['entity_id']
-            from_entity_type = processed_entities[source_entity_name]['entity_type']
-            to_entity_id = processed_entities[target_entity_name]['entity_id']
-            to_entity_type = processed_entities[target_entity_name]['entity_type']
             relation_tag = relationship_type
             relation_id = self._generate_relation_id(from_entity_id, to_entity_id, relationship_type, relation_tag)
-            relation_properties = {"relation_id": relation_id, "sources": [source_item_id]}
-            
-            await self.db_handler.create_relation(from_entity_type, from_entity_id, to_entity_type, to_entity_id, relation_properties)
-            processed_relations.append(relation_id)
+            merged = relation_by_id.get(relation_id)
+            if merged is None:
+                merged = relation_by_id[relation_id] = {
+                    "from_entity_type": entity_type_by_name[source_entity_name],
+                    "from_entity_id": from_entity_id,
+                    "to_entity_type": entity_type_by_name[target_entity_name],
+                    "to_entity_id": to_entity_id,
+                    "type": relationship_type,
+                    "relationTag": relation_tag,
+                    "descriptions": [],
+                    "strength": 0.0
+                }
+            description = rel_raw.get('description')
+            if description and description not in merged["descriptions"]:
+                merged["descriptions"].append(description)
+            try:
+                merged["strength"] = max(merged["strength"], float(rel_raw.get('strength', 1.0)))
+            except (TypeError, ValueError):
+                pass
 
-        return {"status": "success", "entities_processed": len(processed_entities), "relations_processed": len(processed_relations)}
+        # MERGE covers the existence check, so all relations go out in one UNWIND write
+        pending_relations = []
+        for relation_id, merged in relation_by_id.items():
+            relation_properties = {
+                "relation_id": relation_id,
+                "type": merged["type"],
+                "relationTag": [merged["relationTag"]],
+                "description": merged["descriptions"],
+                "strength": merged["strength"],
+                "sources": [source_item_id]
+            }
+            pending_relations.append((merged["from_entity_type"], merged["from_entity_id"],
+                                      merged["to_entity_type"], merged["to_entity_id"], relation_properties))
+        if pending_relations:
+            # create_relations_bulk logs and skips failed groups, so only the IDs it returns were written
+            created = set(await self._write_relations(pending_relations))
+            processed_relations = [relation_id for relation_id in relation_by_id if relation_id in created]
+
+        return {"status": "success", "entities_processed": len(entity_id_by_name), "relations_processed": len(processed_relations)}
 
     # Pipeline processing methods
     async def initialize(self):
         try:
             await self.db_handler.execute_cypher("RETURN 'connection_test' as status")
             logger.info("✅ Database connection established")
+            if self.use_transactions:
+                # Checkpoint once after all batches instead of after every commit
+                self._auto_checkpoint_disabled = await self.db_handler.set_auto_checkpoint(False)
+            # Exact-name matching and every node write use name_lc, so a missing column would silently duplicate entities
+            if not await self.db_handler.ensure_lowercase_name_column():
+                logger.error("❌ Nodes.name_lc could not be added or backfilled; refusing to merge without it")
+                return False
             return True
         except Exception as e:
             logger.error(f"❌ Failed to initialize database connection: {e}")
@@ -263,8 +760,17 @@ class MergePipeline:
         if not os.path.exists(file_path):
             return {"status": "error", "message": f"File not found: {file_path}"}
         try:
-            with open(file_path, 'r') as f:
-                data = json.load(f)
+            with open(file_path, 'rb') as f:
+                # Peeking at the first key picks the reader up front, so the file is only parsed once
+                if await asyncio.to_thread(_first_top_level_key, f) == 'results':
+                    f.seek(0)
+                    # Stream 'results' one batch at a time so large extraction dumps never sit in memory whole
+                    return await self.process_batches(_stream_json_items(f, 'results.item'))
+
+            # Map the file instead of copying it into a heap buffer; the kernel pages it in on demand
+            with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                with memoryview(mm) as view:
+                    data = orjson.loads(view)
             if 'results' in data:
                 batches = data['results']
             elif 'entities' in data and 'relations' in data:
@@ -275,31 +781,59 @@ class MergePipeline:
         except Exception as e:
             return {"status": "error", "message": f"Processing error: {e}"}
 
-    async def process_batches(self, batches: List[Dict[str, Any]]) -> Dict[str, Any]:
-        self.stats["start_time"] = datetime.now()
-        self.stats["total_batches"] = len(batches)
-        batch_results = []
-        for i, batch in enumerate(batches):
-            try:
-                result = await self.process_batch_systematic(batch)
-                batch_results.append(result)
-                if result.get("status") == "success":
-                    self.stats["total_entities_processed"] += result.get("entities_processed", 0)
-                    self.stats["total_relations_processed"] += result.get("relations_processed", 0)
-                else:
-                    self.stats["errors"] += 1
-            except Exception as e:
-                self.stats["errors"] += 1
-                batch_results.append({"status": "error", "message": str(e)})
-        self.stats["end_time"] = datetime.now()
-        processing_time = (self.stats["end_time"] - self.stats["start_time"]).total_seconds()
+    async def process_batches(self, batches: Union[Iterable[Dict[str, Any]], AsyncIterator[Dict[str, Any]]]) -> Dict[str, Any]:
+        started_at, t0 = time.time(), time.perf_counter()
+        # Stats are per run, since process_directory may run several files at once
+        stats = self._new_stats()
+        results: Dict[int, Dict[str, Any]] = {}
+        in_flight = set()
+
+        # Keep at most batch_concurrency batches running; new batches are pulled only as slots free up
+        try:
+            async for batch in _as_async_iter(batches):
+                # Empty batches need no DB work; record a success so results stay aligned with the input
+                if (('entities' in batch or 'item_id' in batch) and not batch.get('entities')
+                        and not batch.get('relations') and not batch.get('relationships')):
+                    results[stats["total_batches"]] = {"status": "success", "entities_processed": 0, "relations_processed": 0}
+                    stats["total_batches"] += 1
+                    continue
+                if len(in_flight) >= self.batch_concurrency:
+                    _, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                in_flight.add(asyncio.create_task(self._run_batch(stats["total_batches"], batch, results, stats)))
+                stats["total_batches"] += 1
+        finally:
+            # Started batches finish before the run returns, or before a stream error reaches the caller
+            if in_flight:
+                await asyncio.wait(in_flight)
+
+        if self.use_transactions:
+            await self.db_handler.checkpoint()
+        processing_time = time.perf_counter() - t0
+        # Timestamps are only formatted once per run, as ISO strings so stats serialize as-is
+        stats["start_time"] = datetime.fromtimestamp(started_at).isoformat()
+        stats["end_time"] = datetime.fromtimestamp(started_at + processing_time).isoformat()
+        self.stats = stats
         return {
             "status": "completed",
-            "statistics": self.stats,
-            "batch_results": batch_results,
+            "statistics": stats,
+            "batch_results": [results[i] for i in range(stats["total_batches"])],
             "processing_time_seconds": processing_time
         }
 
+    async def _run_batch(self, index: int, batch: Dict[str, Any], results: Dict[int, Dict[str, Any]],
+                         stats: Dict[str, Any]):
+        try:
+            result = await self._process_one(batch)
+            if result.get("status") == "success":
+                stats["total_entities_processed"] += result.get("entities_processed", 0)
+                stats["total_relations_processed"] += result.get("relations_processed", 0)
+            else:
+                stats["errors"] += 1
+        except Exception as e:
+            stats["errors"] += 1
+            result = {"status": "error", "message": str(e)}
+        results[index] = result
+
     async def process_directory(self, directory_path: str, pattern: str = "*.json") -> Dict[str, Any]:
         directory = Path(directory_path)
         if not directory.exists():
@@ -308,9 +842,16 @@ class MergePipeline:
         if not json_files:
             return {"status": "warning", "message": f"No files matching {pattern} found"}
         
+        # Files run their batches through this pipeline, so their entity merges share its entity lock
+        semaphore = asyncio.Semaphore(self.file_concurrency)
+
+        async def process_one_file(file_path: Path) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.process_extracted_file(str(file_path))
+
+        results = await asyncio.gather(*(process_one_file(file_path) for file_path in json_files))
         combined_stats = {"files_processed": 0, "total_entities": 0, "total_relations": 0, "total_errors": 0, "file_results": []}
-        for file_path in json_files:
-            result = await self.process_extracted_file(str(file_path))
+        for file_path, result in zip(json_files, results):
             combined_stats["files_processed"] += 1
             combined_stats["file_results"].append({"file": file_path.name, "result": result})
             if result.get("status") == "completed":
@@ -323,25 +864,79 @@ class MergePipeline:
 
     async def get_database_statistics(self) -> Dict[str, Any]:
         try:
-            stats = {}
-            for entity_type in self.db_handler.entity_schemas.keys():
-                query = f"MATCH (n:Nodes) WHERE n.type = $entity_type RETURN count(n) as count"
-                result = await self.db_handler.execute_cypher(query, {"entity_type": entity_type})
-                count = result.get('data', [{}])[0].get('count', 0) if result.get('data') else 0
-                stats[f"{entity_type}_count"] = count
-            query = "MATCH ()-[r:Relation]->() RETURN count(r) as count"
+            # Per-type node counts and the relation count come back from one grouped query
+            query = """
+            MATCH (n:Nodes) RETURN n.type AS type, count(n) AS count
+            UNION ALL
+            MATCH ()-[r:Relation]->() RETURN '' AS type, count(r) AS count
+            """
             result = await self.db_handler.execute_cypher(query)
-            stats["total_relations"] = result.get('data', [{}])[0].get('count', 0) if result.get('data') else 0
-            stats["total_entities"] = sum(v for k, v in stats.items() if k.endswith('_count'))
+            rows = (result.get('data') or result.get('rows') or []) if result else []
+            counts = {row.get('type'): row.get('count', 0) for row in rows}
+            entity_counts = {entity_type: counts.get(entity_type, 0) for entity_type in self.db_handler.entity_schemas}
+            stats = {f"{entity_type}_count": count for entity_type, count in entity_counts.items()}
+            stats["total_relations"] = counts.get('', 0)
+            stats["total_entities"] = sum(entity_counts.values())
             return stats
         except Exception as e:
             return {"error": str(e)}
 
+    async def _write_relations(self, relations: List[tuple]) -> List[str]:
+        """
+        Create relations through create_relations_bulk, coalescing the writes of concurrent batches
+        into one super-batch. Returns the relation IDs written by the shared call once it completes;
+        callers keep the ones they submitted.
+        """
+        # A transaction is bound to its own batch, so its writes cannot be shared (both limits are 1 then)
+        if not self._coalesce_relations or not relations:
+            return await self.db_handler.create_relations_bulk(relations)
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending_relations.append((relations, future))
+        if sum(len(rows) for rows, _ in self._pending_relations) >= RELATION_FLUSH_ROWS:
+            await self._flush_relations()
+        elif self._relation_flush is None:
+            self._relation_flush = asyncio.create_task(self._flush_relations_after(RELATION_FLUSH_INTERVAL))
+        return await future
+
+    async def _flush_relations_after(self, delay: float):
+        await asyncio.sleep(delay)
+        self._relation_flush = None
+        await self._flush_relations()
+
+    async def _flush_relations(self):
+        pending, self._pending_relations = self._pending_relations, []
+        if not pending:
+            return
+        try:
+            created = await self.db_handler.create_relations_bulk([row for rows, _ in pending for row in rows])
+        except Exception as e:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for _, future in pending:
+            if not future.done():
+                future.set_result(created)
+
     async def cleanup(self):
+        if self._relation_flush is not None:
+            await self._relation_flush
+        await self._flush_relations()
+        # The snapshot covers the whole index, so it is written once per run rather than after every batch
+        if self.lsh_snapshot_path:
+            try:
+                await asyncio.to_thread(self.lsh_index.save, self.lsh_snapshot_path)
+            except OSError as e:
+                logger.warning(f"Failed to persist MinHash-LSH snapshot: {e}")
+        if self._auto_checkpoint_disabled:
+            await self.db_handler.set_auto_checkpoint(True)
+            self._auto_checkpoint_disabled = False
         await self.db_handler.close()
 
-async def process_file(file_path: str, kuzu_url: str = "http://localhost:7000") -> Dict[str, Any]:
-    pipeline = MergePipeline(kuzu_url)
+async def process_file(file_path: str, kuzu_url: str = "http://localhost:7000", batch_concurrency: int = BATCH_CONCURRENCY,
+                       pool_size: int = KUZU_POOL_SIZE) -> Dict[str, Any]:
+    pipeline = MergePipeline(kuzu_url, batch_concurrency=batch_concurrency, pool_size=pool_size)
     try:
         if not await pipeline.initialize():
             return {"status": "error", "message": "Failed to initialize pipeline"}
@@ -352,8 +947,11 @@ async def process_file(file_path: str, kuzu_url: str = "http://localhost:7000")
     finally:
         await pipeline.cleanup()
 
-async def process_directory(directory_path: str, pattern: str = "*.json", kuzu_url: str = "http://localhost:7000") -> Dict[str, Any]:
-    pipeline = MergePipeline(kuzu_url)
+async def process_directory(directory_path: str, pattern: str = "*.json", kuzu_url: str = "http://localhost:7000",
+                            batch_concurrency: int = BATCH_CONCURRENCY, pool_size: int = KUZU_POOL_SIZE,
+                            file_concurrency: int = FILE_CONCURRENCY) -> Dict[str, Any]:
+    pipeline = MergePipeline(kuzu_url, batch_concurrency=batch_concurrency, pool_size=pool_size,
+                             file_concurrency=file_concurrency)
     try:
         if not await pipeline.initialize():
             return {"status": "error", "message": "Failed to initialize pipeline"}
@@ -364,21 +962,51 @@ async def process_directory(directory_path: str, pattern: str = "*.json", kuzu_u
     finally:
         await pipeline.cleanup()
 
+def _truncate_batch_results(result: Dict[str, Any], keep: int) -> None:
+    # Only the last `keep` batch results are printed; the full count is kept alongside
+    batch_results = result.get("batch_results")
+    if isinstance(batch_results, list) and len(batch_results) > keep:
+        result["batch_results"] = batch_results[-keep:]
+        result["batch_results_omitted"] = len(batch_results) - keep
+    for file_result in result.get("combined_statistics", {}).get("file_results", []):
+        _truncate_batch_results(file_result.get("result", {}), keep)
+
 async def main():
     import sys
     logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
-    if len(sys.argv) < 2:
-        print("Usage: python merge_pipeline.py <file_path_or_directory>")
+    args = sys.argv[1:]
+    verbose = "--verbose" in args
+    if verbose:
+        args.remove("--verbose")
+    options = {"--concurrency": BATCH_CONCURRENCY, "--pool-size": KUZU_POOL_SIZE, "--file-concurrency": FILE_CONCURRENCY}
+    for flag in options:
+        if flag in args:
+            position = args.index(flag)
+            options[flag] = int(args[position + 1])
+            del args[position:position + 2]
+    if not args:
+        print("Usage: python merge_pipeline.py <file_path_or_directory> [--concurrency N] [--pool-size N] [--file-concurrency N] [--verbose]")
         return
-    path = sys.argv[1]
+    path = args[0]
+    settings = {"batch_concurrency": options["--concurrency"], "pool_size": options["--pool-size"]}
     if os.path.isfile(path):
-        result = await process_file(path)
+        result = await process_file(path, **settings)
     elif os.path.isdir(path):
-        result = await process_directory(path)
+        result = await process_directory(path, file_concurrency=options["--file-concurrency"], **settings)
     else:
         print(f"Path not found: {path}")
         return
-    print(json.dumps(result, indent=2, default=str))
+    if not verbose:
+        _truncate_batch_results(result, keep=20)
+    # Bytes go straight to the binary buffer; flush the text layer first so output stays ordered
+    sys.stdout.flush()
+    sys.stdout.buffer.write(orjson.dumps(result, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE))
+    sys.stdout.flush()
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    try:
+        import uvloop  # optional, faster event loop where available (not on Windows)
+    except ImportError:
+        asyncio.run(main())
+    else:
+        uvloop.run(main())
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+MinHash-LSH index for near-duplicate entity lookup
+Maintains per-entity-type MinHash signatures over character q-grams and
+buckets them with banded LSH so candidate lookup avoids pairwise comparison.
+The i-th hash function is blake2b over the domain-separated input (i || g).
+"""
+
+import logging
+import orjson
+import os
+import hashlib
+from operator import eq
+from typing import Dict, List, Optional, Tuple
+from functools import lru_cache
+from collections import defaultdict
+
+logger = logging.getLogger(__name__)
+
+_MAX_HASH = (1 << 64) - 1
+
+
+def _optimal_bands(threshold: float, num_perm: int) -> Tuple[int, int]:
+    """Pick (bands, rows) whose S-curve threshold (1/b)^(1/r) is closest to the target"""
+    best = (1, num_perm)
+    best_error = float("inf")
+    for bands in range(1, num_perm + 1):
+        rows = num_perm // bands
+        if rows == 0:
+            break
+        error = abs((1.0 / bands) ** (1.0 / rows) - threshold)
+        if error < best_error:
+            best, best_error = (bands, rows), error
+    return best
+
+
+class MinHashLSH:
+    """Banded MinHash-LSH index keyed by entity type"""
+
+    def __init__(self, threshold: float = 0.85, num_perm: int = 128, q: int = 3):
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.q = q
+        self.bands, self.rows = _optimal_bands(threshold, num_perm)
+        # Pre-seeded hash states for each permutation; copying is cheaper than re-hashing the prefix
+        self._seeded = [hashlib.blake2b(i.to_bytes(4, 'big'), digest_size=8) for i in range(num_perm)]
+        # Entity names recur across batches, so memoize signatures per text
+        self._signature = lru_cache(maxsize=65536)(self._compute_signature)
+        self._buckets: Dict[str, List[Dict[Tuple[int, ...], List[str]]]] = {}
+        self._signatures: Dict[str, Dict[str, List[int]]] = defaultdict(dict)
+
+    def _qgrams(self, text: str) -> set:
+        """Byte-level q-grams of the normalized UTF-8 text"""
+        data = " ".join(text.lower().split()).encode('utf-8')
+        if len(data) <= self.q:
+            return {data} if data else set()
+        return {data[i:i + self.q] for i in range(len(data) - self.q + 1)}
+
+    def signature(self, text: str) -> List[int]:
+        """Compute the MinHash signature of the q-grams of `text`"""
+        return list(self._signature(text))
+
+    def _compute_signature(self, text: str) -> Tuple[int, ...]:
+        grams = self._qgrams(text)
+        if not grams:
+            return (_MAX_HASH,) * self.num_perm
+        from_bytes = int.from_bytes
+        signature = []
+        for seeded in self._seeded:
+            best = _MAX_HASH
+            for gram in grams:
+                h = seeded.copy()
+                h.update(gram)
+                value = from_bytes(h.digest(), 'big')
+                if value < best:
+                    best = value
+            signature.append(best)
+        return tuple(signature)
+
+    def _bands_of(self, signature: List[int]):
+        for band in range(self.bands):
+            start = band * self.rows
+            yield band, tuple(signature[start:start + self.rows])
+
+    @staticmethod
+    def jaccard(sig1: List[int], sig2: List[int]) -> float:
+        """Estimate Jaccard similarity from two signatures"""
+        if not sig1 or len(sig1) != len(sig2):
+            return 0.0
+        # map(eq, ...) compares the signatures element-wise without a Python-level loop body
+        return sum(map(eq, sig1, sig2)) / len(sig1)
+
+    def insert(self, entity_type: str, key: str, text: str):
+        """Index `key` (the entity's primary key) under the signature of `text`"""
+        if key in self._signatures[entity_type]:
+            return
+        signature = self.signature(text)
+        self._signatures[entity_type][key] = signature
+        buckets = self._buckets.setdefault(entity_type, [dict() for _ in range(self.bands)])
+        for band, band_key in self._bands_of(signature):
+            buckets[band].setdefault(band_key, []).append(key)
+
+    def query(self, entity_type: str, text: str) -> Optional[str]:
+        """Return the best candidate key whose estimated Jaccard is >= threshold"""
+        buckets = self._buckets.get(entity_type)
+        if not buckets:
+            return None
+        signature = self.signature(text)
+        candidates = set()
+        for band, band_key in self._bands_of(signature):
+            candidates.update(buckets[band].get(band_key, ()))
+
+        best_key, best_score = None, self.threshold
+        signatures = self._signatures[entity_type]
+        for key in candidates:
+            score = self.jaccard(signature, signatures[key])
+            if score >= best_score:
+                best_key, best_score = key, score
+        return best_key
+
+    def save(self, path: str):
+        """Snapshot all signatures to disk; buckets are rebuilt on load"""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        snapshot = {
+            "threshold": self.threshold,
+            "num_perm": self.num_perm,
+            "q": self.q,
+            "signatures": self._signatures
+        }
+        # Write beside the target and swap it in, so a crash mid-write keeps the previous snapshot
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(orjson.dumps(snapshot))
+        os.replace(tmp_path, path)
+
+    def load(self, path: str) -> bool:
+        """Restore signatures from a snapshot written by `save`"""
+        if not os.path.exists(path):
+            return False
+        try:
+            with open(path, 'rb') as f:
+                snapshot = orjson.loads(f.read())
+        except (OSError, orjson.JSONDecodeError) as e:
+            logger.warning(f"Failed to load MinHash-LSH snapshot {path}: {e}")
+            return False
+        if snapshot.get("num_perm") != self.num_perm or snapshot.get("q") != self.q:
+            logger.warning(f"Ignoring MinHash-LSH snapshot {path}: incompatible parameters")
+            return False
+        for entity_type, signatures in snapshot.get("signatures", {}).items():
+            buckets = self._buckets.setdefault(entity_type, [dict() for _ in range(self.bands)])
+            for key, signature in signatures.items():
+                self._signatures[entity_type][key] = signature
+                for band, band_key in self._bands_of(signature):
+                    buckets[band].setdefault(band_key, []).append(key)
+        return True
@@ -99,17 +99,15 @@ Extract the following information for each entity type (all attributes are optio
 ## These are only accepted entity types and attributes. Do not extract any other types or attributes.
 
 ---Email-Specific Instructions---
-2. **Person Entities**: **STRICT PERSON ENTITY REQUIREMENTS** - Only create Person entities when you have UNIQUE IDENTIFYING INFORMATION that enables merging:
+1. **Person Entities**: **STRICT PERSON ENTITY REQUIREMENTS** - Only create Person entities when you have UNIQUE IDENTIFYING INFORMATION that enables merging:
    - **REQUIRED**: Email address (preferred) OR specific role/title OR aliases OR other distinguishing attributes
    - **ALWAYS include email when available** for merging
    - **DO NOT create Person entities for names only** - if you only have a name without additional context, do not create the entity
    - **Include comprehensive descriptions** with organizational context, role, and work activities within the Person entity description
-3. **Workspace Focus**: Prioritize entities that represent work activities (projects, repositories, issues, teams)
-4. **Focus on Business Relationships**: Create meaningful business relationships between entities (AUTHORED, REVIEWED, etc.)
-5. **Business Context**: Extract information about code reviews, project work, organizational structure, and collaboration
-6. **Extract only entities found that are useful** - don't create entities for every mention, focus on meaningful business entities
-7. **Use specific names** - entity names should be descriptive and qualify the entity type
-8. **ONLY CREATE SIGNIFICANT ENTITIES** - Only create an entity if it represents something important or substantial. Avoid creating entities for minor mentions, casual references, or trivial items. Focus on entities that are central to the business context or have meaningful relationships.
+2. **Workspace Focus**: Prioritize entities that represent work activities (projects, repositories, issues, teams)
+3. **Focus on Business Relationships**: Create meaningful business relationships between entities (AUTHORED, REVIEWED, etc.)
+4. **Business Context**: Extract information about code reviews, project work, organizational structure, and collaboration
+5. **Extract only entities found that are useful** - don't create entities for every mention, focus on meaningful business entities
 
 ---MANDATORY OUTPUT FORMAT---
 For each entity, output ONE line in this exact format:
@@ -1,12 +1,27 @@
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from enum import Enum
 
 from .prompt import EMAIL_SYSTEM_PROMPT, ENTITY_EXTRACTION_PROMPT, DEFAULT_ENTITY_TYPES
 
+# Stand-in for the context while a template is pre-formatted; the real context is spliced in per call
+_CONTEXT_MARKER = "\x00context\x00"
+
 
 class DataType(Enum):
     EMAIL = "email"
     DOCUMENT = "document"
+    CODE = "code"
+    MEETING = "meeting"
+    CHAT = "chat"
+
+
+# Field names that identify each data type, checked in order; types without their own prompts use the email ones
+_DATA_TYPE_FIELDS = (
+    (frozenset({'from', 'to', 'subject', 'sender', 'recipient'}), DataType.EMAIL),
+    (frozenset({'repository', 'commit', 'pull_request', 'code', 'file_path'}), DataType.CODE),
+    (frozenset({'meeting_title', 'attendees', 'transcript', 'agenda'}), DataType.MEETING),
+    (frozenset({'channel', 'thread', 'message_thread', 'chat_id'}), DataType.CHAT),
+)
 
 
 class PromptFactory:
@@ -22,6 +37,8 @@ class PromptFactory:
             DataType.EMAIL: ENTITY_EXTRACTION_PROMPT,
             DataType.DOCUMENT: self._get_document_extraction_template(),
         }
+        # (data type, entity types) -> template formatted up to the context, split around it
+        self._specialized: Dict[tuple, Tuple[str, str]] = {}
     
     def get_system_prompt(self, data_type: DataType) -> str:
         """Get system prompt for the specified data type"""
@@ -36,14 +53,19 @@ class PromptFactory:
                                context: str, 
                                entity_types: List[str] = None) -> str:
         """Create formatted extraction prompt for specific data and entity types"""
-        if entity_types is None:
-            entity_types = DEFAULT_ENTITY_TYPES
-            
-        template = self.get_extraction_template(data_type)
-        return template.format(
-            entity_types=", ".join(entity_types),
-            context=context
-        )
+        # The default entity types are keyed by None, so the common case builds no tuple per call
+        key = (data_type, None if entity_types is None else tuple(entity_types))
+        parts = self._specialized.get(key)
+        if parts is None:
+            if entity_types is None:
+                entity_types = DEFAULT_ENTITY_TYPES
+            template = self.get_extraction_template(data_type)
+            before, _, after = template.format(
+                entity_types=", ".join(entity_types),
+                context=_CONTEXT_MARKER
+            ).partition(_CONTEXT_MARKER)
+            parts = self._specialized[key] = (before, after)
+        return parts[0] + context + parts[1]
     
     def detect_data_type(self, data: Dict) -> DataType:
         """Auto-detect data type based on data structure and content"""
@@ -54,21 +76,11 @@ class PromptFactory:
             except ValueError:
                 pass
         
-        # Check for email-specific fields
-        if any(field in data for field in ['from', 'to', 'subject', 'sender', 'recipient']):
-            return DataType.EMAIL
-        
-        # Check for code-specific fields
-        if any(field in data for field in ['repository', 'commit', 'pull_request', 'code', 'file_path']):
-            return DataType.CODE
-        
-        # Check for meeting-specific fields
-        if any(field in data for field in ['meeting_title', 'attendees', 'transcript', 'agenda']):
-            return DataType.MEETING
-        
-        # Check for chat-specific fields
-        if any(field in data for field in ['channel', 'thread', 'message_thread', 'chat_id']):
-            return DataType.CHAT
+        # Check for type-specific fields
+        keys = data.keys()
+        for fields, data_type in _DATA_TYPE_FIELDS:
+            if not fields.isdisjoint(keys):
+                return data_type
         
         # Default to email for backward compatibility
         return DataType.EMAIL
@@ -7,9 +7,12 @@ and prepare it for entity extraction and knowledge graph integration.
 
 import asyncio
 import aiohttp
-import json
+import gzip
+import random
+import ijson
+import orjson
 import logging
-from typing import Dict, List, Optional, Any, Union
+from typing import Dict, List, Optional, Any, Union, AsyncIterator, Callable, ClassVar, Iterable, Iterator, Tuple
 from dataclasses import dataclass, asdict
 from datetime import datetime
 import os
@@ -20,7 +23,98 @@ from pathlib import Path
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-@dataclass
+# Exports are written as UTF-8 bytes; indented like the previous json.dump(..., indent=2) output
+_PRETTY_JSON = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+
+# Export files get a 1 MiB write buffer, so per-document writes reach the OS in large chunks
+_EXPORT_BUFFER_SIZE = 1 << 20
+
+# Mail fields _parse_visit_document maps explicitly; everything else is carried over into metadata
+_VISIT_HANDLED_FIELDS = frozenset({'docId', 'id', 'subject', 'chunks', 'from', 'to', 'cc', 'bcc',
+                                   'timestamp', 'attachmentFilenames', 'labels'})
+
+# Fields promoted to VespaDocument attributes by the search-result parsers; the rest become metadata
+_CHILD_EXCLUDED = frozenset({'id', 'title', 'content', 'doc_type', 'timestamp'})
+
+# Backoff between Vespa request retries: uniform in [0, min(cap, base * 2**attempt)] seconds
+_RETRY_BACKOFF_BASE = 0.05
+_RETRY_BACKOFF_CAP = 2.0
+
+
+def _open_export(output_path: Path, compress: bool):
+    """Open an export file for binary writing, gzipped in-flight when `compress` is set"""
+    if compress:
+        # Level 1 keeps compression ahead of the visit rate; repeated field names still shrink well
+        return gzip.open(output_path, 'wb', compresslevel=1)
+    return open(output_path, 'wb', buffering=_EXPORT_BUFFER_SIZE)
+
+
+async def _write_pages(pages: AsyncIterator[List[Any]], write_page: Callable[[List[Any]], int]) -> int:
+    """
+    Run `write_page` on each page in a worker thread while the next page is fetched.
+    Pages are written one at a time in order; returns the sum of `write_page`'s counts.
+    """
+    total = 0
+    pending: Optional[asyncio.Future] = None
+    try:
+        async for page in pages:
+            if pending is not None:
+                total += await pending
+            pending = asyncio.ensure_future(asyncio.to_thread(write_page, page))
+    finally:
+        # The file must stay open until the in-flight page is written, even if fetching failed
+        if pending is not None:
+            total += await pending
+    return total
+
+
+class _JSONDocumentWriter:
+    """
+    Incrementally writes `{"documents": [...], **trailer}` to a binary file, so an export
+    never holds more than one page of encoded documents. The trailer is written last
+    because it carries totals only known once every document has been written.
+    `size` counts the bytes written so far, so callers need not stat the file.
+    """
+
+    def __init__(self, f, pretty: bool):
+        self._f = f
+        self._pretty = pretty
+        self._option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if pretty else 0)
+        self.count = 0
+        self.size = 0
+        self._write([b'{\n  "documents": [' if pretty else b'{"documents":['])
+
+    def _write(self, parts: List[bytes]):
+        self.size += sum(map(len, parts))
+        self._f.writelines(parts)
+
+    def _encode(self, value: Any, indent: bytes) -> bytes:
+        encoded = orjson.dumps(value, option=self._option)
+        # JSON strings never contain raw newlines, so re-indenting nests the value safely
+        return encoded.replace(b'\n', b'\n' + indent) if self._pretty else encoded
+
+    def write_documents(self, documents: List[Any]):
+        separator = b'\n    ' if self._pretty else b''
+        parts = []
+        for doc in documents:
+            parts.append((b',' if self.count else b'') + separator + self._encode(doc, b'    '))
+            self.count += 1
+        self._write(parts)
+
+    def close(self, trailer: Dict[str, Any]):
+        parts = [b'\n  ]' if self._pretty and self.count else b']']
+        for key, value in trailer.items():
+            prefix = b',\n  ' if self._pretty else b','
+            parts.append(prefix + orjson.dumps(key) + (b': ' if self._pretty else b':') + self._encode(value, b'  '))
+        parts.append(b'\n}' if self._pretty else b'}')
+        self._write(parts)
+
+
+def _as_list(value: Any) -> List[Any]:
+    """Wrap a single recipient in a list; empty values become an empty list"""
+    return value if isinstance(value, list) else [value] if value else []
+
+@dataclass(slots=True)
 class VespaDocument:
     """Represents a document retrieved from Vespa"""
     id: str
@@ -42,10 +136,35 @@ class VespaDocument:
             'metadata': self.metadata or {},
             'source': self.source
         }
+
+    def to_dict_subset(self, fields: List[str]) -> Dict[str, Any]:
+        """Like `to_dict` restricted to `fields`, without building the rest; unknown names are skipped"""
+        subset = {}
+        for field in fields:
+            if field == 'timestamp':
+                subset[field] = self.timestamp.isoformat() if self.timestamp else None
+            elif field == 'metadata':
+                subset[field] = self.metadata or {}
+            elif field in self.__slots__:
+                subset[field] = getattr(self, field)
+        return subset
+
+    def to_encodable(self, include_metadata: bool = True) -> Any:
+        """
+        What to hand orjson for an export: the dataclass itself, which orjson encodes natively
+        with the same keys and timestamp format as `to_dict` but without building the dict.
+        Falls back to `to_dict` when metadata is unset (exported as {}) or excluded.
+        """
+        if include_metadata and self.metadata is not None:
+            return self
+        doc_dict = self.to_dict()
+        if not include_metadata:
+            doc_dict.pop('metadata', None)
+        return doc_dict
     
     def to_json(self) -> str:
         """Convert to JSON string"""
-        return json.dumps(self.to_dict(), ensure_ascii=False, indent=2)
+        return orjson.dumps(self.to_dict(), option=_PRETTY_JSON).decode('utf-8')
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'VespaDocument':
@@ -70,7 +189,7 @@ class VespaDocument:
     @classmethod
     def from_json(cls, json_str: str) -> 'VespaDocument':
         """Create VespaDocument from JSON string"""
-        data = json.loads(json_str)
+        data = orjson.loads(json_str)
         return cls.from_dict(data)
 
 @dataclass
@@ -83,8 +202,10 @@ class VisitOptions:
     field_set: Optional[str] = None
     concurrency: int = 1
     cluster: str = "my_content"
+    slices: int = 1
+    slice_id: Optional[int] = None
 
-@dataclass
+@dataclass(slots=True)
 class VisitResponse:
     """Response from Vespa visit API"""
     documents: List[Any]
@@ -100,6 +221,9 @@ class VespaConfig:
     namespace: str = "default"
     timeout: int = 30
     max_hits: int = 100
+    visit_slices: int = 1  # Independent visit continuation chains fetched concurrently
+    pool_size: int = 32  # Keep-alive connections held open to the endpoint
+    visit_jsonl: bool = False  # Ask the visit API for JSON Lines, one document per line
     
     @classmethod
     def from_env(cls) -> 'VespaConfig':
@@ -110,56 +234,173 @@ class VespaConfig:
             schema_name=os.getenv('VESPA_SCHEMA', 'document'),
             namespace=os.getenv('VESPA_NAMESPACE', 'default'),
             timeout=int(os.getenv('VESPA_TIMEOUT', '30')),
-            max_hits=int(os.getenv('VESPA_MAX_HITS', '100'))
+            max_hits=int(os.getenv('VESPA_MAX_HITS', '100')),
+            visit_slices=int(os.getenv('VESPA_VISIT_SLICES', '1')),
+            pool_size=int(os.getenv('VESPA_POOL_SIZE', '32')),
+            visit_jsonl=os.getenv('VESPA_VISIT_JSONL', 'false').lower() == 'true'
         )
 
 class VespaConnector:
     """Main connector class for Vespa data source integration"""
+
+    # Sessions shared by every open connector with the same pool settings on the same event loop,
+    # as [session, reference count]; the session closes when its last connector exits
+    _shared_sessions: ClassVar[Dict[Tuple[int, int, int], List[Any]]] = {}
     
     def __init__(self, config: VespaConfig):
         self.config = config
         self.session: Optional[aiohttp.ClientSession] = None
+        self._shared_key: Optional[Tuple[int, int, int]] = None
+        self._entered = 0
+        # The search URL base and default parameters only depend on the config
+        self._search_url = f"{config.endpoint}/search/"
+        self._default_query_params = {
+            'yql': f'select * from {config.schema_name} where true',
+            'hits': config.max_hits,
+            'format': 'json'
+        }
         
     async def __aenter__(self):
-        """Async context manager entry"""
-        self.session = aiohttp.ClientSession(
-            timeout=aiohttp.ClientTimeout(total=self.config.timeout)
-        )
+        """Async context manager entry; takes a reference on the shared session for this config"""
+        self._entered += 1
+        if self._shared_key is not None:
+            return self
+        self.session = self.shared_session(self.config)
+        self._shared_key = self._session_key(self.config)
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        """Async context manager exit"""
-        if self.session:
-            await self.session.close()
+        """Async context manager exit; the shared session is closed once no connector holds it"""
+        self._entered -= 1
+        if self._entered > 0:
+            return
+        key, self._shared_key = self._shared_key, None
+        entry = self._shared_sessions.get(key) if key is not None else None
+        if entry is not None and entry[0] is self.session:
+            entry[1] -= 1
+            if entry[1] <= 0:
+                del self._shared_sessions[key]
+                await entry[0].close()
+
+    @staticmethod
+    def _session_key(config: VespaConfig) -> Tuple[int, int, int]:
+        return (id(asyncio.get_running_loop()), config.pool_size, config.timeout)
+
+    @classmethod
+    def shared_session(cls, config: VespaConfig) -> aiohttp.ClientSession:
+        """
+        Return the session shared on the running event loop for `config`'s pool settings, creating it if needed.
+        Each call takes a reference that the caller's connector releases in `__aexit__`.
+        """
+        key = cls._session_key(config)
+        entry = cls._shared_sessions.get(key)
+        if entry is None or entry[0].closed:
+            # Every connector on this loop shares one pool of keep-alive connections and the DNS cache
+            connector = aiohttp.TCPConnector(
+                limit=config.pool_size,
+                limit_per_host=config.pool_size,
+                ttl_dns_cache=300,
+                keepalive_timeout=75
+            )
+            session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=config.timeout, sock_connect=5),
+                headers={'Accept': 'application/json'}
+            )
+            entry = cls._shared_sessions[key] = [session, 0]
+        entry[1] += 1
+        return entry[0]
     
-    async def _fetch_with_retry(self, url: str, options: Dict[str, Any], retries: int = 3) -> Dict[str, Any]:
-        """Fetch with retry logic similar to TypeScript implementation"""
+    async def _fetch_with_retry(self, url: str, options: Dict[str, Any], retries: int = 3,
+                                reader=None) -> Dict[str, Any]:
+        """
+        Fetch with retry logic similar to TypeScript implementation; `reader` parses a 200 response.
+        Only 429, 5xx and network errors are retried, after a jittered exponential backoff.
+        """
+        if not self.session:
+            raise RuntimeError("Session not initialized. Use async context manager.")
+
         for attempt in range(retries):
             try:
-                if not self.session:
-                    raise RuntimeError("Session not initialized. Use async context manager.")
-                
                 async with self.session.get(url, **options) as response:
                     if response.status == 200:
-                        return await response.json()
-                    else:
-                        error_text = await response.text()
-                        logger.warning(f"Request failed (attempt {attempt + 1}/{retries}): "
-                                     f"{response.status} {response.reason} - {error_text}")
-                        if attempt == retries - 1:
-                            raise aiohttp.ClientResponseError(
-                                request_info=response.request_info,
-                                history=response.history,
-                                status=response.status,
-                                message=f"Visit failed: {response.status} {response.reason} - {error_text}"
-                            )
-            except Exception as e:
-                if attempt == retries - 1:
-                    raise e
-                logger.warning(f"Request attempt {attempt + 1} failed: {e}, retrying...")
-                await asyncio.sleep(1)  # Wait before retry
-        
-        raise Exception("Max retries reached")
+                        return await (reader(response) if reader else self._read_json(response))
+                    error_text = await response.text()
+                    error = aiohttp.ClientResponseError(
+                        request_info=response.request_info,
+                        history=response.history,
+                        status=response.status,
+                        message=f"Visit failed: {response.status} {response.reason} - {error_text}"
+                    )
+                    retryable = response.status == 429 or response.status >= 500
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                error, retryable = e, True
+
+            if not retryable or attempt == retries - 1:
+                raise error
+            # Full jitter spreads retries from many concurrent requests instead of syncing them
+            delay = random.uniform(0, min(_RETRY_BACKOFF_CAP, _RETRY_BACKOFF_BASE * 2 ** attempt))
+            logger.warning(f"Request attempt {attempt + 1}/{retries} failed: {error}, retrying in {delay:.2f}s...")
+            await asyncio.sleep(delay)
+
+    @staticmethod
+    async def _read_json(response) -> Any:
+        """Decode a response body with orjson rather than aiohttp's stdlib json bridge"""
+        return orjson.loads(await response.read())
+
+    @classmethod
+    async def _read_visit_page(cls, response) -> Dict[str, Any]:
+        """
+        Parse a visit page as its bytes arrive, building each document on its own,
+        so the raw body and a second full copy of the page are never held together
+        """
+        if response.content_type == 'application/jsonl':
+            return await cls._read_visit_lines(response)
+        page = {'documents': [], 'continuation': None, 'documentCount': 0}
+        builder = None
+        async for prefix, event, value in ijson.parse_async(response.content, use_float=True):
+            if builder is not None:
+                if prefix == 'documents.item' and event in ('end_map', 'end_array'):
+                    builder.event(event, value)
+                    page['documents'].append(builder.value)
+                    builder = None
+                else:
+                    builder.event(event, value)
+            elif prefix == 'documents.item':
+                if event in ('start_map', 'start_array'):
+                    builder = ijson.ObjectBuilder()
+                    builder.event(event, value)
+                else:
+                    page['documents'].append(value)
+            elif prefix in ('continuation', 'documentCount'):
+                page[prefix] = value
+        return page
+
+    @staticmethod
+    async def _read_visit_lines(response) -> Dict[str, Any]:
+        """Parse a JSON Lines visit page, one record per line, into the same shape as the JSON page"""
+        page = {'documents': [], 'continuation': None, 'documentCount': 0}
+
+        def handle(line: bytes):
+            if not line.strip():
+                return
+            record = orjson.loads(line)
+            if 'put' in record:
+                page['documents'].append({'id': record['put'], 'fields': record.get('fields', {})})
+            elif 'continuation' in record:
+                continuation = record['continuation']
+                page['continuation'] = continuation.get('token') if isinstance(continuation, dict) else continuation
+            elif 'sessionStats' in record:
+                page['documentCount'] = record['sessionStats'].get('documentCount', 0)
+
+        # Lines are split by hand: a mail document can exceed aiohttp's readline limit
+        buffer = b''
+        async for chunk in response.content.iter_any():
+            *lines, buffer = (buffer + chunk).split(b'\n')
+            for line in lines:
+                handle(line)
+        handle(buffer)
+        return page
     
     async def visit(self, options: VisitOptions) -> VisitResponse:
         """
@@ -182,6 +423,11 @@ class VespaConnector:
             # Add continuation token if present
             if options.continuation:
                 params['continuation'] = options.continuation
+
+            # Restrict the visit to one slice of the corpus when visiting slices in parallel
+            if options.slices > 1:
+                params['slices'] = str(options.slices)
+                params['sliceId'] = str(options.slice_id)
             
             # Build URL
             url = f"{self.config.endpoint}/document/v1/?{urlencode(params)}"
@@ -189,11 +435,12 @@ class VespaConnector:
             logger.debug(f"Visiting Vespa documents: {url}")
             
             # Make request with retry logic
+            # Either response format is accepted; _read_visit_page dispatches on the content type
             data = await self._fetch_with_retry(url, {
                 'headers': {
-                    'Accept': 'application/json'
+                    'Accept': 'application/jsonl' if self.config.visit_jsonl else 'application/json'
                 }
-            })
+            }, reader=self._read_visit_page)
             
             return VisitResponse(
                 documents=data.get('documents', []),
@@ -216,70 +463,124 @@ class VespaConnector:
         """
         Visit all documents with pagination support - matches TypeScript pattern
         """
+        all_documents = []
+        async for documents in self.iter_visit_pages(schema, wanted_document_count, max_documents, cluster):
+            all_documents.extend(documents)
+        return all_documents
+
+    async def iter_visit_pages(
+        self,
+        schema: str = "mail",
+        wanted_document_count: int = 100,
+        max_documents: Optional[int] = None,
+        cluster: str = "my_content"
+    ) -> AsyncIterator[List[Any]]:
+        """
+        Yield the raw documents of each visit page as it is fetched, so callers can
+        convert a page before the next one arrives
+        """
         logger.info('🚀 Starting Vespa Document Visit Process')
         logger.info(f'📡 Vespa endpoint: {self.config.endpoint}')
         
-        all_documents = []
-        continuation = None
+        total_documents = 0
         page_count = 0
+        slices = max(1, self.config.visit_slices)
+        if slices == 1:
+            responses = self._visit_chain(schema, wanted_document_count, cluster)
+        else:
+            responses = self._visit_slices(schema, wanted_document_count, cluster, slices)
         
         try:
-            # Keep fetching until no more continuation token
-            while True:
-                visit_options = VisitOptions(
-                    namespace=self.config.namespace,
-                    schema=schema,
-                    continuation=continuation,
-                    wanted_document_count=wanted_document_count,
-                    cluster=cluster
-                )
-                
-                visit_response = await self.visit(visit_options)
-                
+            async for visit_response in responses:
                 page_count += 1
-                all_documents.extend(visit_response.documents)
-                continuation = visit_response.continuation
+                documents = visit_response.documents
+                reached_limit = bool(max_documents) and total_documents + len(documents) >= max_documents
+                if reached_limit:
+                    documents = documents[:max_documents - total_documents]
+                total_documents += len(documents)
                 
                 logger.info(f"📄 Page {page_count}: Fetched {len(visit_response.documents)} documents "
-                           f"(Total: {len(all_documents)})")
-                
-                # Check if we should stop
-                if not continuation:
-                    break
+                           f"(Total: {total_documents})")
+                yield documents
                 
                 # Check max documents limit
-                if max_documents and len(all_documents) >= max_documents:
+                if reached_limit:
                     logger.info(f"Reached max documents limit: {max_documents}")
-                    all_documents = all_documents[:max_documents]
                     break
-                
-                # Small delay between requests to avoid overwhelming the server
-                await asyncio.sleep(0.1)
             
-            logger.info(f"✅ Fetched total of {len(all_documents)} documents from Vespa")
-            return all_documents
+            logger.info(f"✅ Fetched total of {total_documents} documents from Vespa")
             
         except Exception as e:
             logger.error(f"❌ Error during document visit: {e}")
             raise
+        finally:
+            await responses.aclose()
+
+    async def _visit_chain(
+        self,
+        schema: str,
+        wanted_document_count: int,
+        cluster: str,
+        slices: int = 1,
+        slice_id: Optional[int] = None
+    ) -> AsyncIterator[VisitResponse]:
+        """Follow one continuation chain to its end, yielding each page"""
+        # Only the continuation changes from page to page, so the options are built once
+        visit_options = VisitOptions(
+            namespace=self.config.namespace,
+            schema=schema,
+            wanted_document_count=wanted_document_count,
+            cluster=cluster,
+            slices=slices,
+            slice_id=slice_id
+        )
+        while True:
+            visit_response = await self.visit(visit_options)
+            yield visit_response
+            visit_options.continuation = visit_response.continuation
+            if not visit_options.continuation:
+                return
+            # Small delay between requests to avoid overwhelming the server
+            await asyncio.sleep(0.1)
+
+    async def _visit_slices(self, schema: str, wanted_document_count: int, cluster: str,
+                            slices: int) -> AsyncIterator[VisitResponse]:
+        """Follow every slice's continuation chain concurrently, yielding pages as they arrive"""
+        # Bounded so the chains pause while the consumer is still converting earlier pages
+        queue: asyncio.Queue = asyncio.Queue(maxsize=slices)
+
+        async def produce(slice_id: int):
+            try:
+                async for visit_response in self._visit_chain(schema, wanted_document_count, cluster, slices, slice_id):
+                    await queue.put(visit_response)
+            except Exception as e:
+                await queue.put(e)
+                return
+            await queue.put(None)
+
+        tasks = [asyncio.create_task(produce(slice_id)) for slice_id in range(slices)]
+        remaining = slices
+        try:
+            while remaining:
+                item = await queue.get()
+                if item is None:
+                    remaining -= 1
+                elif isinstance(item, Exception):
+                    raise item
+                else:
+                    yield item
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
     
     def _build_query_url(self, query_params: Dict[str, Any]) -> str:
         """Build Vespa query URL"""
-        base_url = f"{self.config.endpoint}/search/"
-        
-        # Default query parameters
-        default_params = {
-            'yql': f'select * from {self.config.schema_name} where true',
-            'hits': self.config.max_hits,
-            'format': 'json'
-        }
-        
         # Merge with provided parameters
-        params = {**default_params, **query_params}
+        params = {**self._default_query_params, **query_params}
         
-        # Build query string
-        query_string = '&'.join([f"{k}={quote(str(v))}" for k, v in params.items()])
-        return f"{base_url}?{query_string}"
+        # Build query string; same escaping as quote(str(v)), done by urlencode in one call
+        return f"{self._search_url}?{urlencode(params, safe='/', quote_via=quote)}"
     
     async def test_connection(self) -> bool:
         """Test connection to Vespa"""
@@ -349,7 +650,7 @@ class VespaConnector:
                     logger.error(f"Vespa query failed: {response.status}")
                     return []
                 
-                data = await response.json()
+                data = await self._read_json(response)
                 return self._parse_documents(data)
                 
         except Exception as e:
@@ -366,7 +667,7 @@ class VespaConnector:
             
             async with self.session.get(url) as response:
                 if response.status == 200:
-                    data = await response.json()
+                    data = await self._read_json(response)
                     return self._parse_single_document(data)
                 elif response.status == 404:
                     logger.warning(f"Document not found: {doc_id}")
@@ -430,7 +731,7 @@ class VespaConnector:
             
             async with self.session.get(url) as response:
                 if response.status == 200:
-                    data = await response.json()
+                    data = await self._read_json(response)
                     return self._parse_documents(data)
                 else:
                     logger.error(f"Content search failed: {response.status}")
@@ -477,8 +778,7 @@ class VespaConnector:
                 except (ValueError, TypeError):
                     pass
             
-            metadata = {k: v for k, v in fields.items() 
-                       if k not in ['id', 'title', 'content', 'doc_type', 'timestamp']}
+            metadata = {k: v for k, v in fields.items() if k not in _CHILD_EXCLUDED}
             
             source = fields.get('source', fields.get('from', None))
             
@@ -508,8 +808,7 @@ class VespaConnector:
                 content=fields.get('content', ''),
                 doc_type=fields.get('doc_type', 'document'),
                 timestamp=datetime.fromtimestamp(fields['timestamp']) if 'timestamp' in fields else None,
-                metadata={k: v for k, v in fields.items() 
-                         if k not in ['id', 'title', 'content', 'doc_type', 'timestamp']},
+                metadata={k: v for k, v in fields.items() if k not in _CHILD_EXCLUDED},
                 source=fields.get('source', None)
             )
             
@@ -555,17 +854,16 @@ class VespaConnector:
             # Build metadata from additional fields
             metadata = {
                 'from': sender,
-                'to': recipients if isinstance(recipients, list) else [recipients] if recipients else [],
-                'cc': cc_recipients if isinstance(cc_recipients, list) else [cc_recipients] if cc_recipients else [],
-                'bcc': bcc_recipients if isinstance(bcc_recipients, list) else [bcc_recipients] if bcc_recipients else [],
+                'to': _as_list(recipients),
+                'cc': _as_list(cc_recipients),
+                'bcc': _as_list(bcc_recipients),
                 'attachmentFilenames': fields.get('attachmentFilenames', []),
                 'labels': fields.get('labels', [])
             }
             
             # Add any other fields not explicitly handled
             for key, value in fields.items():
-                if key not in ['docId', 'id', 'subject', 'chunks', 'from', 'to', 'cc', 'bcc', 
-                              'timestamp', 'attachmentFilenames', 'labels']:
+                if key not in _VISIT_HANDLED_FIELDS:
                     metadata[key] = value
             
             return VespaDocument(
@@ -609,20 +907,32 @@ class VespaConnector:
         """
         Visit all documents and return them as VespaDocument objects
         """
-        raw_documents = await self.visit_all_documents(
-            schema=schema,
-            wanted_document_count=wanted_document_count,
-            max_documents=max_documents,
-            cluster=cluster
-        )
-        
-        return self.convert_visit_documents_to_vespa_documents(raw_documents)
+        # Pages are converted as they arrive, so raw documents are only held one page at a time
+        vespa_documents = []
+        async for raw_documents in self.iter_visit_pages(schema, wanted_document_count, max_documents, cluster):
+            vespa_documents.extend(self.convert_visit_documents_to_vespa_documents(raw_documents))
+        return vespa_documents
 
 class VespaJSONExporter:
     """Export Vespa data to various JSON formats"""
     
     def __init__(self, connector: VespaConnector):
         self.connector = connector
+        # Directories already created by this exporter, so repeated exports skip the mkdir syscalls
+        self._ensured_dirs: set = set()
+
+    def _ensure_dir(self, directory: Path):
+        if directory not in self._ensured_dirs:
+            directory.mkdir(parents=True, exist_ok=True)
+            self._ensured_dirs.add(directory)
+
+    def _export_path(self, output_file: str, compress: bool = False) -> Path:
+        """Resolve an export path, adding a .gz suffix to compressed exports, and ensure its directory"""
+        output_path = Path(output_file)
+        if compress and output_path.suffix != '.gz':
+            output_path = output_path.with_name(output_path.name + '.gz')
+        self._ensure_dir(output_path.parent)
+        return output_path
     
     async def export_all_documents_to_json(
         self,
@@ -631,7 +941,8 @@ class VespaJSONExporter:
         max_documents: Optional[int] = None,
         wanted_document_count: int = 100,
         include_metadata: bool = True,
-        pretty_print: bool = True
+        pretty_print: bool = False,
+        compress: bool = False
     ) -> Dict[str, Any]:
         """
         Export all documents from Vespa to JSON file
@@ -642,64 +953,52 @@ class VespaJSONExporter:
             max_documents: Maximum number of documents to export
             wanted_document_count: Documents per page for visit API
             include_metadata: Whether to include document metadata
-            pretty_print: Whether to format JSON with indentation
+            pretty_print: Whether to indent the JSON; compact output is about half the size
+            compress: Gzip the output in-flight, adding a .gz suffix if missing
             
         Returns:
             Dictionary with export statistics
         """
         try:
             logger.info(f"🚀 Starting JSON export to {output_file}")
+            export_timestamp = datetime.now().isoformat()
             
-            # Fetch all documents
-            documents = await self.connector.visit_all_documents_as_vespa_docs(
-                schema=schema,
-                wanted_document_count=wanted_document_count,
-                max_documents=max_documents
-            )
-            
-            # Convert to dictionary format
-            export_data = {
-                "export_metadata": {
-                    "export_timestamp": datetime.now().isoformat(),
-                    "total_documents": len(documents),
-                    "schema": schema,
-                    "max_documents": max_documents,
-                    "vespa_endpoint": self.connector.config.endpoint
-                },
-                "documents": []
-            }
-            
-            # Process each document
-            for doc in documents:
-                doc_dict = doc.to_dict()
-                
-                if not include_metadata:
-                    # Remove metadata if not requested
-                    doc_dict.pop('metadata', None)
-                
-                export_data["documents"].append(doc_dict)
+            output_path = self._export_path(output_file, compress)
             
-            # Write to file
-            output_path = Path(output_file)
-            output_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            with open(output_path, 'w', encoding='utf-8') as f:
-                if pretty_print:
-                    json.dump(export_data, f, ensure_ascii=False, indent=2)
-                else:
-                    json.dump(export_data, f, ensure_ascii=False)
+            # Documents are written page by page as they are visited; the metadata trailer follows them
+            with _open_export(output_path, compress) as f:
+                writer = _JSONDocumentWriter(f, pretty_print)
+
+                def write_page(raw_documents: List[Any]) -> int:
+                    encodables = [doc.to_encodable(include_metadata) for doc in
+                                  self.connector.convert_visit_documents_to_vespa_documents(raw_documents)]
+                    writer.write_documents(encodables)
+                    return len(encodables)
+
+                await _write_pages(self.connector.iter_visit_pages(schema, wanted_document_count, max_documents),
+                                   write_page)
+                writer.close({
+                    "export_metadata": {
+                        "export_timestamp": export_timestamp,
+                        "total_documents": writer.count,
+                        "schema": schema,
+                        "max_documents": max_documents,
+                        "vespa_endpoint": self.connector.config.endpoint
+                    }
+                })
             
             stats = {
                 "success": True,
                 "output_file": str(output_path),
-                "total_documents": len(documents),
-                "file_size_bytes": output_path.stat().st_size,
-                "export_timestamp": export_data["export_metadata"]["export_timestamp"]
+                "total_documents": writer.count,
+                # Bytes on disk are only known after gzip has flushed, so compressed exports still stat the file
+                "file_size_bytes": output_path.stat().st_size if compress else writer.size,
+                "export_timestamp": export_timestamp
             }
             
             logger.info(f"✅ JSON export completed successfully:")
             logger.info(f"  - File: {output_path}")
-            logger.info(f"  - Documents: {len(documents)}")
+            logger.info(f"  - Documents: {writer.count}")
             logger.info(f"  - Size: {stats['file_size_bytes']} bytes")
             
             return stats
@@ -718,7 +1017,8 @@ class VespaJSONExporter:
         doc_types: List[str],
         output_dir: str = "vespa_exports",
         schema: str = "mail",
-        max_documents_per_type: Optional[int] = None
+        max_documents_per_type: Optional[int] = None,
+        pretty_print: bool = False
     ) -> Dict[str, Any]:
         """
         Export documents grouped by document type to separate JSON files
@@ -728,6 +1028,7 @@ class VespaJSONExporter:
             output_dir: Directory to save JSON files
             schema: Vespa schema to query
             max_documents_per_type: Maximum documents per type
+            pretty_print: Whether to indent the JSON; compact output is about half the size
             
         Returns:
             Dictionary with export statistics per document type
@@ -737,58 +1038,69 @@ class VespaJSONExporter:
             
             # Create output directory
             output_path = Path(output_dir)
-            output_path.mkdir(parents=True, exist_ok=True)
+            self._ensure_dir(output_path)
             
             results = {}
-            
-            # Get all documents first
-            all_documents = await self.connector.visit_all_documents_as_vespa_docs(
-                schema=schema,
-                max_documents=max_documents_per_type * len(doc_types) if max_documents_per_type else None
-            )
-            
-            # Group documents by type
-            docs_by_type = {}
-            for doc in all_documents:
-                doc_type = doc.doc_type or 'unknown'
-                if doc_type in doc_types:
-                    if doc_type not in docs_by_type:
-                        docs_by_type[doc_type] = []
-                    docs_by_type[doc_type].append(doc)
-            
-            # Export each document type
-            for doc_type in doc_types:
-                documents = docs_by_type.get(doc_type, [])
-                
-                if max_documents_per_type and len(documents) > max_documents_per_type:
-                    documents = documents[:max_documents_per_type]
-                
-                if documents:
-                    filename = f"{doc_type}_documents.json"
-                    file_path = output_path / filename
-                    
-                    export_data = {
+            export_timestamp = datetime.now().isoformat()
+            wanted_types = set(doc_types)
+            # Per-type files are opened on the first document of their type and filled as pages arrive
+            writers: Dict[str, Tuple[Any, _JSONDocumentWriter]] = {}
+
+            def write_page(raw_documents: List[Any]) -> int:
+                docs_by_type: Dict[str, List[Any]] = {}
+                for doc in self.connector.convert_visit_documents_to_vespa_documents(raw_documents):
+                    doc_type = doc.doc_type or 'unknown'
+                    if doc_type in wanted_types:
+                        docs_by_type.setdefault(doc_type, []).append(doc.to_encodable())
+                written = 0
+                for doc_type, doc_dicts in docs_by_type.items():
+                    entry = writers.get(doc_type)
+                    if entry is None:
+                        f = open(output_path / f"{doc_type}_documents.json", 'wb', buffering=_EXPORT_BUFFER_SIZE)
+                        entry = writers[doc_type] = (f, _JSONDocumentWriter(f, pretty_print))
+                    writer = entry[1]
+                    if max_documents_per_type:
+                        doc_dicts = doc_dicts[:max_documents_per_type - writer.count]
+                    writer.write_documents(doc_dicts)
+                    written += len(doc_dicts)
+                return written
+
+            # One visit feeds every type's file, so writing overlaps with fetching the next page
+            try:
+                await _write_pages(self.connector.iter_visit_pages(
+                    schema,
+                    max_documents=max_documents_per_type * len(doc_types) if max_documents_per_type else None
+                ), write_page)
+                for doc_type, (_, writer) in writers.items():
+                    writer.close({
                         "export_metadata": {
-                            "export_timestamp": datetime.now().isoformat(),
+                            "export_timestamp": export_timestamp,
                             "document_type": doc_type,
-                            "total_documents": len(documents),
+                            "total_documents": writer.count,
                             "schema": schema,
                             "vespa_endpoint": self.connector.config.endpoint
-                        },
-                        "documents": [doc.to_dict() for doc in documents]
-                    }
-                    
-                    with open(file_path, 'w', encoding='utf-8') as f:
-                        json.dump(export_data, f, ensure_ascii=False, indent=2)
+                        }
+                    })
+            finally:
+                for f, _ in writers.values():
+                    f.close()
+            
+            # Report each document type
+            for doc_type in doc_types:
+                entry = writers.get(doc_type)
+                
+                if entry is not None:
+                    filename = f"{doc_type}_documents.json"
+                    writer = entry[1]
                     
                     results[doc_type] = {
                         "success": True,
-                        "file_path": str(file_path),
-                        "document_count": len(documents),
-                        "file_size_bytes": file_path.stat().st_size
+                        "file_path": str(output_path / filename),
+                        "document_count": writer.count,
+                        "file_size_bytes": writer.size
                     }
                     
-                    logger.info(f"  ✅ Exported {len(documents)} {doc_type} documents to {filename}")
+                    logger.info(f"  ✅ Exported {writer.count} {doc_type} documents to {filename}")
                 else:
                     results[doc_type] = {
                         "success": False,
@@ -818,7 +1130,8 @@ class VespaJSONExporter:
         output_file: str = "vespa_documents_light.json",
         schema: str = "mail",
         max_documents: Optional[int] = None,
-        fields_to_include: List[str] = None
+        fields_to_include: List[str] = None,
+        pretty_print: bool = False
     ) -> Dict[str, Any]:
         """
         Export documents with only essential fields to reduce file size
@@ -828,6 +1141,7 @@ class VespaJSONExporter:
             schema: Vespa schema to query
             max_documents: Maximum number of documents
             fields_to_include: Specific fields to include (default: id, title, doc_type)
+            pretty_print: Whether to indent the JSON; compact output is about half the size
             
         Returns:
             Dictionary with export statistics
@@ -839,52 +1153,40 @@ class VespaJSONExporter:
             logger.info(f"🚀 Starting lightweight JSON export to {output_file}")
             logger.info(f"📝 Including fields: {fields_to_include}")
             
-            # Fetch documents
-            documents = await self.connector.visit_all_documents_as_vespa_docs(
-                schema=schema,
-                max_documents=max_documents
-            )
-            
-            # Create lightweight export data
-            export_data = {
-                "export_metadata": {
-                    "export_timestamp": datetime.now().isoformat(),
-                    "total_documents": len(documents),
-                    "included_fields": fields_to_include,
-                    "export_type": "lightweight"
-                },
-                "documents": []
-            }
+            export_timestamp = datetime.now().isoformat()
+            output_path = self._export_path(output_file)
             
-            # Process documents with only specified fields
-            for doc in documents:
-                doc_dict = doc.to_dict()
-                lightweight_doc = {}
-                
-                for field in fields_to_include:
-                    if field in doc_dict:
-                        lightweight_doc[field] = doc_dict[field]
-                
-                export_data["documents"].append(lightweight_doc)
-            
-            # Write to file
-            output_path = Path(output_file)
-            output_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(export_data, f, ensure_ascii=False, indent=2)
+            # Documents are written page by page with only the specified fields; the metadata trailer follows them
+            with open(output_path, 'wb', buffering=_EXPORT_BUFFER_SIZE) as f:
+                writer = _JSONDocumentWriter(f, pretty_print)
+
+                def write_page(raw_documents: List[Any]) -> int:
+                    lightweight_docs = [doc.to_dict_subset(fields_to_include) for doc in
+                                        self.connector.convert_visit_documents_to_vespa_documents(raw_documents)]
+                    writer.write_documents(lightweight_docs)
+                    return len(lightweight_docs)
+
+                await _write_pages(self.connector.iter_visit_pages(schema, max_documents=max_documents), write_page)
+                writer.close({
+                    "export_metadata": {
+                        "export_timestamp": export_timestamp,
+                        "total_documents": writer.count,
+                        "included_fields": fields_to_include,
+                        "export_type": "lightweight"
+                    }
+                })
             
             stats = {
                 "success": True,
                 "output_file": str(output_path),
-                "total_documents": len(documents),
-                "file_size_bytes": output_path.stat().st_size,
+                "total_documents": writer.count,
+                "file_size_bytes": writer.size,
                 "included_fields": fields_to_include
             }
             
             logger.info(f"✅ Lightweight JSON export completed:")
             logger.info(f"  - File: {output_path}")
-            logger.info(f"  - Documents: {len(documents)}")
+            logger.info(f"  - Documents: {writer.count}")
             logger.info(f"  - Size: {stats['file_size_bytes']} bytes")
             
             return stats
@@ -901,7 +1203,8 @@ class VespaJSONExporter:
     def documents_to_json_lines(
         self,
         documents: List[VespaDocument],
-        output_file: str = "vespa_documents.jsonl"
+        output_file: str = "vespa_documents.jsonl",
+        compress: bool = False
     ) -> Dict[str, Any]:
         """
         Export documents to JSON Lines format (one JSON object per line)
@@ -910,6 +1213,7 @@ class VespaJSONExporter:
         Args:
             documents: List of VespaDocument objects
             output_file: Path to output JSONL file
+            compress: Gzip the output in-flight, adding a .gz suffix if missing
             
         Returns:
             Dictionary with export statistics
@@ -917,20 +1221,23 @@ class VespaJSONExporter:
         try:
             logger.info(f"🚀 Starting JSON Lines export to {output_file}")
             
-            output_path = Path(output_file)
-            output_path.parent.mkdir(parents=True, exist_ok=True)
+            output_path = self._export_path(output_file, compress)
             
-            with open(output_path, 'w', encoding='utf-8') as f:
+            # orjson emits newline-terminated UTF-8 lines; the large buffer batches them into few writes
+            option = orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE
+            file_size = 0
+            with _open_export(output_path, compress) as f:
                 for doc in documents:
-                    json_line = json.dumps(doc.to_dict(), ensure_ascii=False)
-                    f.write(json_line + '\n')
+                    line = orjson.dumps(doc.to_encodable(), option=option)
+                    file_size += len(line)
+                    f.write(line)
             
             stats = {
                 "success": True,
                 "output_file": str(output_path),
                 "total_documents": len(documents),
-                "file_size_bytes": output_path.stat().st_size,
-                "format": "jsonl"
+                "file_size_bytes": output_path.stat().st_size if compress else file_size,
+                "format": "jsonl.gz" if compress else "jsonl"
             }
             
             logger.info(f"✅ JSON Lines export completed:")
@@ -949,6 +1256,76 @@ class VespaJSONExporter:
                 "output_file": output_file
             }
 
+    async def export_all_documents_to_json_lines(
+        self,
+        output_file: str = "vespa_documents.jsonl",
+        schema: str = "mail",
+        max_documents: Optional[int] = None,
+        wanted_document_count: int = 100,
+        include_metadata: bool = True,
+        compress: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Export all documents from Vespa to a JSON Lines file, writing each visit page
+        as it arrives so memory stays bounded by one page regardless of corpus size
+        
+        Args:
+            output_file: Path to output JSONL file
+            schema: Vespa schema to query
+            max_documents: Maximum number of documents to export
+            wanted_document_count: Documents per page for visit API
+            include_metadata: Whether to include document metadata
+            compress: Gzip the output in-flight, adding a .gz suffix if missing
+            
+        Returns:
+            Dictionary with export statistics
+        """
+        try:
+            logger.info(f"🚀 Starting streaming JSON Lines export to {output_file}")
+            
+            output_path = self._export_path(output_file, compress)
+            
+            option = orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE
+            uncompressed_size = 0
+            with _open_export(output_path, compress) as f:
+
+                def write_page(raw_documents: List[Any]) -> int:
+                    nonlocal uncompressed_size
+                    documents = self.connector.convert_visit_documents_to_vespa_documents(raw_documents)
+                    lines = [orjson.dumps(doc.to_encodable(include_metadata), option=option) for doc in documents]
+                    uncompressed_size += sum(map(len, lines))
+                    f.writelines(lines)
+                    return len(documents)
+
+                # Converting, encoding and writing a page runs in a worker thread, overlapped with the next fetch
+                total_documents = await _write_pages(
+                    self.connector.iter_visit_pages(schema, wanted_document_count, max_documents), write_page)
+            
+            stats = {
+                "success": True,
+                "output_file": str(output_path),
+                "total_documents": total_documents,
+                # Bytes on disk are only known after gzip has flushed, so compressed exports still stat the file
+                "file_size_bytes": output_path.stat().st_size if compress else uncompressed_size,
+                "format": "jsonl.gz" if compress else "jsonl"
+            }
+            
+            logger.info(f"✅ JSON Lines export completed:")
+            logger.info(f"  - File: {output_path}")
+            logger.info(f"  - Documents: {total_documents}")
+            logger.info(f"  - Size: {stats['file_size_bytes']} bytes")
+            
+            return stats
+            
+        except Exception as e:
+            error_msg = f"❌ JSON Lines export failed: {e}"
+            logger.error(error_msg)
+            return {
+                "success": False,
+                "error": str(e),
+                "output_file": output_file
+            }
+
 class VespaDataProcessor:
     """Process Vespa documents for KG integration"""
     
@@ -966,16 +1343,19 @@ class VespaDataProcessor:
         
         all_documents = []
         
-        for doc_type in doc_types:
-            try:
-                docs = await self.connector.query_documents(
-                    doc_type=doc_type,
-                    limit=limit // len(doc_types)
-                )
-                all_documents.extend(docs)
-                logger.info(f"Retrieved {len(docs)} documents of type {doc_type}")
-            except Exception as e:
-                logger.error(f"Error retrieving {doc_type} documents: {e}")
+        # The per-type queries are independent, so they run concurrently over the shared session
+        results = await asyncio.gather(
+            *(self.connector.query_documents(doc_type=doc_type, limit=limit // len(doc_types))
+              for doc_type in doc_types),
+            return_exceptions=True
+        )
+        
+        for doc_type, docs in zip(doc_types, results):
+            if isinstance(docs, Exception):
+                logger.error(f"Error retrieving {doc_type} documents: {docs}")
+                continue
+            all_documents.extend(docs)
+            logger.info(f"Retrieved {len(docs)} documents of type {doc_type}")
         
         return all_documents
     
@@ -1000,21 +1380,14 @@ class VespaDataProcessor:
             logger.error(f"Error retrieving documents via visit API: {e}")
             return []
     
-    def prepare_for_entity_extraction(self, documents: List[VespaDocument]) -> List[Dict[str, Any]]:
+    def prepare_for_entity_extraction(self, documents: Iterable[VespaDocument]) -> List[Dict[str, Any]]:
         """Prepare documents for entity extraction tools"""
         prepared_docs = []
         
         for doc in documents:
-            prepared_doc = {
-                'id': doc.id,
-                'title': doc.title,
-                'content': doc.content,
-                'doc_type': doc.doc_type,
-                'text': f"{doc.title}\n\n{doc.content}",  # Combined text for extraction
-                'metadata': doc.metadata or {},
-                'source': doc.source,
-                'timestamp': doc.timestamp.isoformat() if doc.timestamp else None
-            }
+            # to_dict already formats the timestamp and defaults metadata; each document gets its own dict
+            prepared_doc = doc.to_dict()
+            prepared_doc['text'] = f"{doc.title}\n\n{doc.content}"  # Combined text for extraction
             prepared_docs.append(prepared_doc)
         
         return prepared_docs
@@ -1061,7 +1434,9 @@ async def export_all_vespa_data_to_json(
     output_file: str = "vespa_export.json",
     schema: str = "mail",
     max_documents: Optional[int] = None,
-    include_metadata: bool = True
+    include_metadata: bool = True,
+    pretty_print: bool = False,
+    compress: bool = False
 ) -> Dict[str, Any]:
     """
     Utility function to export all Vespa data to JSON
@@ -1071,6 +1446,8 @@ async def export_all_vespa_data_to_json(
         schema: Vespa schema to query
         max_documents: Maximum number of documents to export
         include_metadata: Whether to include document metadata
+        pretty_print: Whether to indent the JSON
+        compress: Gzip the output in-flight
         
     Returns:
         Dictionary with export statistics
@@ -1081,14 +1458,17 @@ async def export_all_vespa_data_to_json(
             output_file=output_file,
             schema=schema,
             max_documents=max_documents,
-            include_metadata=include_metadata
+            include_metadata=include_metadata,
+            pretty_print=pretty_print,
+            compress=compress
         )
 
 async def export_vespa_data_by_type(
     doc_types: List[str],
     output_dir: str = "vespa_exports",
     schema: str = "mail",
-    max_documents_per_type: Optional[int] = None
+    max_documents_per_type: Optional[int] = None,
+    pretty_print: bool = False
 ) -> Dict[str, Any]:
     """
     Utility function to export Vespa data grouped by document type
@@ -1098,6 +1478,7 @@ async def export_vespa_data_by_type(
         output_dir: Directory to save JSON files
         schema: Vespa schema to query
         max_documents_per_type: Maximum documents per type
+        pretty_print: Whether to indent the JSON
         
     Returns:
         Dictionary with export statistics per document type
@@ -1108,14 +1489,16 @@ async def export_vespa_data_by_type(
             doc_types=doc_types,
             output_dir=output_dir,
             schema=schema,
-            max_documents_per_type=max_documents_per_type
+            max_documents_per_type=max_documents_per_type,
+            pretty_print=pretty_print
         )
 
 async def export_vespa_lightweight_json(
     output_file: str = "vespa_light.json",
     schema: str = "mail",
     max_documents: Optional[int] = None,
-    fields: List[str] = None
+    fields: List[str] = None,
+    pretty_print: bool = False
 ) -> Dict[str, Any]:
     """
     Utility function to export lightweight Vespa data (essential fields only)
@@ -1125,6 +1508,7 @@ async def export_vespa_lightweight_json(
         schema: Vespa schema to query
         max_documents: Maximum number of documents
         fields: Specific fields to include
+        pretty_print: Whether to indent the JSON
         
     Returns:
         Dictionary with export statistics
@@ -1135,13 +1519,15 @@ async def export_vespa_lightweight_json(
             output_file=output_file,
             schema=schema,
             max_documents=max_documents,
-            fields_to_include=fields
+            fields_to_include=fields,
+            pretty_print=pretty_print
         )
 
 async def convert_vespa_to_json_lines(
     output_file: str = "vespa_data.jsonl",
     schema: str = "mail",
-    max_documents: Optional[int] = None
+    max_documents: Optional[int] = None,
+    compress: bool = False
 ) -> Dict[str, Any]:
     """
     Utility function to export Vespa data to JSON Lines format
@@ -1150,45 +1536,53 @@ async def convert_vespa_to_json_lines(
         output_file: Path to output JSONL file
         schema: Vespa schema to query
         max_documents: Maximum number of documents
+        compress: Gzip the output in-flight
         
     Returns:
         Dictionary with export statistics
     """
     async with await get_vespa_connection() as connector:
-        # Fetch documents
-        documents = await connector.visit_all_documents_as_vespa_docs(
+        # Documents are written page by page as they are visited
+        exporter = VespaJSONExporter(connector)
+        return await exporter.export_all_documents_to_json_lines(
+            output_file=output_file,
             schema=schema,
-            max_documents=max_documents
+            max_documents=max_documents,
+            compress=compress
         )
-        
-        # Export to JSON Lines
-        exporter = VespaJSONExporter(connector)
-        return exporter.documents_to_json_lines(documents, output_file)
 
-def load_vespa_documents_from_json(json_file: str) -> List[VespaDocument]:
+def iter_vespa_documents_from_json(json_file: str) -> Iterator[VespaDocument]:
     """
-    Load VespaDocument objects from JSON file
+    Yield VespaDocument objects from a JSON file one at a time, so callers that
+    process documents individually never hold the whole export in memory
     
     Args:
         json_file: Path to JSON file created by export functions
-        
-    Returns:
-        List of VespaDocument objects
     """
-    try:
-        with open(json_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        documents = []
-        doc_dicts = data.get('documents', [])
-        
-        for doc_dict in doc_dicts:
+    # Documents are streamed out of the array one at a time, so the raw file and the
+    # full parsed tree are never held in memory together; gzipped exports (.gz) are read transparently
+    opener = gzip.open if json_file.endswith('.gz') else open
+    with opener(json_file, 'rb') as f:
+        for doc_dict in ijson.items(f, 'documents.item', use_float=True):
             try:
                 doc = VespaDocument.from_dict(doc_dict)
-                documents.append(doc)
             except Exception as e:
                 logger.warning(f"Failed to load document: {e}")
+                continue
+            yield doc
+
+def load_vespa_documents_from_json(json_file: str) -> List[VespaDocument]:
+    """
+    Load VespaDocument objects from JSON file; see `iter_vespa_documents_from_json` to stream them
+    
+    Args:
+        json_file: Path to JSON file created by export functions
         
+    Returns:
+        List of VespaDocument objects
+    """
+    try:
+        documents = list(iter_vespa_documents_from_json(json_file))
         logger.info(f"Loaded {len(documents)} documents from {json_file}")
         return documents
         
@@ -1196,9 +1590,37 @@ def load_vespa_documents_from_json(json_file: str) -> List[VespaDocument]:
         logger.error(f"Failed to load documents from {json_file}: {e}")
         return []
 
+def iter_vespa_documents_from_json_lines(jsonl_file: str) -> Iterator[VespaDocument]:
+    """
+    Yield VespaDocument objects from a JSON Lines file one at a time
+    
+    Args:
+        jsonl_file: Path to JSONL file
+    """
+    failed_lines = []
+    
+    # Gzipped exports (.gz) are read transparently
+    opener = gzip.open if jsonl_file.endswith('.gz') else open
+    with opener(jsonl_file, 'rb') as f:
+        for line_num, line in enumerate(f, 1):
+            if line.isspace():
+                continue
+            try:
+                doc = VespaDocument.from_dict(orjson.loads(line))
+            except Exception as e:
+                failed_lines.append((line_num, e))
+                continue
+            yield doc
+    
+    # One summary instead of a warning per bad line, which floods the log on damaged files
+    if failed_lines:
+        first_line, first_error = failed_lines[0]
+        logger.warning(f"Failed to load {len(failed_lines)} document(s) from {jsonl_file}, "
+                       f"first at line {first_line}: {first_error}")
+
 def load_vespa_documents_from_json_lines(jsonl_file: str) -> List[VespaDocument]:
     """
-    Load VespaDocument objects from JSON Lines file
+    Load VespaDocument objects from JSON Lines file; see `iter_vespa_documents_from_json_lines` to stream them
     
     Args:
         jsonl_file: Path to JSONL file
@@ -1207,19 +1629,7 @@ def load_vespa_documents_from_json_lines(jsonl_file: str) -> List[VespaDocument]
         List of VespaDocument objects
     """
     try:
-        documents = []
-        
-        with open(jsonl_file, 'r', encoding='utf-8') as f:
-            for line_num, line in enumerate(f, 1):
-                try:
-                    line = line.strip()
-                    if line:
-                        doc_dict = json.loads(line)
-                        doc = VespaDocument.from_dict(doc_dict)
-                        documents.append(doc)
-                except Exception as e:
-                    logger.warning(f"Failed to load document at line {line_num}: {e}")
-        
+        documents = list(iter_vespa_documents_from_json_lines(jsonl_file))
         logger.info(f"Loaded {len(documents)} documents from {jsonl_file}")
         return documents
         